@@ -0,0 +1,177 @@
+"""
+Open-model (arrival-rate) load
+------------------------------
+With `wait_time`, each simulated user waits for its response before sending the
+next request (a closed model): when the server slows down, the offered load
+drops with it and saturation stays hidden. Here requests are issued on a
+schedule instead, at the rate the configured profile asks for, whatever the
+response times:
+
+- `RateProfile`: target arrivals/sec over time (constant, ramp, step or spike).
+- `ArrivalScheduler`: sends each arrival from its own greenlet, with at most
+  `max_in_flight` outstanding. Arrivals beyond that are dropped, and requests
+  that start more than `late_after` seconds behind schedule count as late. Both
+  are counted (not reported as requests) and logged every 10 s and at test stop.
+- `ArrivalRateShape`: runs one scheduler user per load-generating process for
+  the profile's duration, then ends the test.
+
+In a distributed run each worker sends 1/N of the rate with 1/N of the budget
+(N = workers at test start, from partitioning.py).
+"""
+
+from locust import LoadTestShape, events
+from locust.runners import MasterRunner
+from config import (ARRIVAL_PROFILE, ARRIVAL_START_RPS, ARRIVAL_PEAK_RPS, ARRIVAL_DURATION, ARRIVAL_STEPS,
+                    ARRIVAL_SPIKE_START, ARRIVAL_SPIKE_DURATION)
+import gevent
+import gevent.pool
+import logging
+import time
+
+ARRIVAL_PROFILES = ("constant", "ramp", "step", "spike")
+IDLE_STEP = 0.1  # seconds to skip ahead while the target rate is zero
+REPORT_INTERVAL = 10.0  # seconds between progress logs
+STOP_GRACE = 5.0  # seconds the shape keeps running after the profile ends, so in-flight requests complete
+
+
+class RateProfile:
+    """Target arrivals per second at each point of the test."""
+
+    def __init__(self, kind="ramp", start_rps=10.0, peak_rps=500.0, duration=300.0, steps=10,
+                 spike_start=60.0, spike_duration=30.0):
+        if kind not in ARRIVAL_PROFILES:
+            raise ValueError(f"Unknown ARRIVAL_PROFILE '{kind}', expected one of {ARRIVAL_PROFILES}")
+        self.kind = kind
+        self.start_rps = start_rps
+        self.peak_rps = peak_rps
+        self.duration = duration
+        self.steps = max(1, steps)
+        self.spike_start = spike_start
+        self.spike_duration = spike_duration
+
+    def rate(self, t):
+        """Target rate ``t`` seconds into the test, or None once the profile is over."""
+        if t >= self.duration:
+            return None
+        if self.kind == "constant":
+            return self.start_rps
+        if self.kind == "ramp":
+            return self.start_rps + (self.peak_rps - self.start_rps) * t / self.duration
+        if self.kind == "step":
+            if self.steps == 1:
+                return self.peak_rps
+            step = min(int(t * self.steps / self.duration), self.steps - 1)
+            return self.start_rps + (self.peak_rps - self.start_rps) * step / (self.steps - 1)
+        in_spike = self.spike_start <= t < self.spike_start + self.spike_duration
+        return self.peak_rps if in_spike else self.start_rps
+
+    def describe(self):
+        if self.kind == "constant":
+            shape = f"{self.start_rps:g} rps"
+        elif self.kind == "spike":
+            shape = (f"{self.start_rps:g} rps, {self.peak_rps:g} rps from {self.spike_start:g}s "
+                     f"for {self.spike_duration:g}s")
+        else:
+            steps = f" in {self.steps} steps" if self.kind == "step" else ""
+            shape = f"{self.start_rps:g} -> {self.peak_rps:g} rps{steps}"
+        return f"{self.kind}: {shape} over {self.duration:g}s"
+
+
+arrival_profile = RateProfile(ARRIVAL_PROFILE, ARRIVAL_START_RPS, ARRIVAL_PEAK_RPS, ARRIVAL_DURATION,
+                              ARRIVAL_STEPS, ARRIVAL_SPIKE_START, ARRIVAL_SPIKE_DURATION)
+
+
+schedulers = []  # created in this process during the current test
+
+
+class ArrivalScheduler:
+    """Calls ``send`` at ``share`` x the profile's rate from a bounded pool of greenlets."""
+
+    def __init__(self, profile, send, max_in_flight, share=1.0, late_after=0.05,
+                 clock=time.monotonic, sleep=gevent.sleep):
+        self.profile = profile
+        self.send = send
+        self.share = share
+        self.late_after = late_after
+        self.pool = gevent.pool.Pool(max(1, max_in_flight))
+        self._clock = clock
+        self._sleep = sleep
+        self.scheduled = 0
+        self.sent = 0
+        self.dropped = 0
+        self.late = 0
+        self.max_lag = 0.0
+        schedulers.append(self)
+
+    def run(self):
+        """Issue arrivals until the profile ends, then wait for the requests still in flight."""
+        start = self._clock()
+        offset = 0.0  # seconds into the profile of the next arrival
+        last_report = (start, 0)
+        while True:
+            rate = self.profile.rate(offset)
+            if rate is None:
+                break
+            rate *= self.share
+            if rate <= 0:
+                offset += IDLE_STEP
+                continue
+
+            due = start + offset
+            delay = due - self._clock()
+            # Yield even when behind schedule, so requests in flight can finish and free their slots;
+            # catching up then shows as late starts rather than as drops from a pool nobody drained
+            self._sleep(max(delay, 0))
+
+            self.scheduled += 1
+            if self.pool.full():
+                self.dropped += 1
+            else:
+                self.pool.spawn(self._send, due)
+            offset += 1 / rate
+
+            now = self._clock()
+            if now - last_report[0] >= REPORT_INTERVAL:
+                achieved = (self.sent - last_report[1]) / (now - last_report[0])
+                logging.info(f"🎯 ARRIVALS: target {rate:.1f} rps, sent {achieved:.1f} rps, "
+                             f"{len(self.pool)} in flight, {self.dropped} dropped, {self.late} late")
+                last_report = (now, self.sent)
+        self.pool.join()
+
+    def _send(self, due):
+        lag = self._clock() - due
+        if lag > self.late_after:
+            self.late += 1
+            self.max_lag = max(self.max_lag, lag)
+        self.sent += 1
+        self.send()
+
+    def log_summary(self):
+        logging.info(f"🎯 ARRIVALS DONE: {self.scheduled} scheduled, {self.sent} sent, {self.dropped} dropped, "
+                     f"{self.late} late (max {self.max_lag * 1000:.0f} ms behind schedule)")
+        if self.dropped or self.late:
+            logging.warning("⚠️ The offered load was not fully delivered: raise ARRIVAL_MAX_IN_FLIGHT if requests "
+                            "were dropped, or add workers if the load generator fell behind")
+
+
+class ArrivalRateShape(LoadTestShape):
+    """One scheduler user per load-generating process for the profile's duration, then stop."""
+
+    def tick(self):
+        if self.get_run_time() >= arrival_profile.duration + STOP_GRACE:
+            return None
+        processes = max(1, self.runner.worker_count) if isinstance(self.runner, MasterRunner) else 1
+        return processes, processes
+
+
+def on_test_start(environment, **kwargs):
+    schedulers.clear()
+
+
+def on_test_stop(environment, **kwargs):
+    for scheduler in schedulers:
+        scheduler.log_summary()
+
+
+events.test_start.add_listener(on_test_start)
+events.test_stop.add_listener(on_test_stop)
@@ -0,0 +1,166 @@
+"""
+Shared base users for the Locust tests
+--------------------------------------
+- `DataHttpUser` / `DataUserMixin`: assigns each simulated user its own record(s)
+  from data.json via the (distributed-aware) partitioner, and hands the slot back
+  when the user stops so the next user started takes it over.
+- `AuthenticatedHttpUser`: additionally authenticates in `on_start`, reusing the
+  token cached for that slot's username when a replacement user takes it over,
+  and re-authenticates once when the API rejects the token (e.g. it expired).
+- Both run on `HttpUser` or, with `LOCUST_HTTP_BACKEND=fast`, on `FastHttpUser`
+  (geventhttpclient) with the keep-alive pool settings from config.py.
+- `on_locust_init`: loads and validates data.json once per process, checking for
+  bookings only when a selected user class needs them.
+- Importing this module also enables the latency time series (latency_histogram.py)
+  for every test when `LATENCY_TIMESERIES_FILE` is set.
+"""
+
+from locust import HttpUser, FastHttpUser, events
+from config import (ENDPOINTS, HTTP_BACKEND, FAST_HTTP_CONCURRENCY, FAST_HTTP_CONNECTION_TIMEOUT,
+                    FAST_HTTP_NETWORK_TIMEOUT)
+from data_loader import load_data
+from partitioning import next_user_index, release_user_index
+import latency_histogram  # noqa: F401 - registers its event listeners when LATENCY_TIMESERIES_FILE is set
+import logging
+
+# username -> token, shared by every simulated user in this process. Users stopping release their
+# partition slot, so a replacement user gets the same username; the cache is bounded by the users in data.json
+auth_tokens = {}
+
+HTTP_BACKENDS = ("requests", "fast")
+if HTTP_BACKEND not in HTTP_BACKENDS:
+    raise ValueError(f"Unknown LOCUST_HTTP_BACKEND '{HTTP_BACKEND}', expected one of {HTTP_BACKENDS}")
+
+
+class PooledFastHttpUser(FastHttpUser):
+    """FastHttpUser with keep-alive pool settings taken from config.py."""
+
+    abstract = True
+    concurrency = FAST_HTTP_CONCURRENCY
+    connection_timeout = FAST_HTTP_CONNECTION_TIMEOUT
+    network_timeout = FAST_HTTP_NETWORK_TIMEOUT
+
+
+# Client backend shared by every HTTP scenario
+BackendHttpUser = PooledFastHttpUser if HTTP_BACKEND == "fast" else HttpUser
+
+
+class DataUserMixin:
+    """Gives each simulated user a unique ``self.user`` (and ``self.booking``)."""
+
+    requires_bookings = False  # Also assign ``self.booking`` with the same index
+
+    def assign_user(self):
+        """Assign the next user (and booking). Stops the test and returns False if unavailable."""
+        shared_data = load_data()
+        if shared_data is None:
+            logging.error("❌ ERROR: Shared data is not loaded. Test will stop.")
+            self.environment.runner.quit()
+            return False
+
+        available = len(shared_data["users"])
+        if self.requires_bookings:
+            available = min(available, len(shared_data["bookings"]))
+        self.user_index = next_user_index(available)
+        if self.user_index >= available:
+            logging.error(f"❌ ERROR: More users requested ({self.user_index}) than available.")
+            self.environment.runner.quit()
+            return False
+
+        self.user = shared_data["users"][self.user_index]
+        if self.requires_bookings:
+            self.booking = shared_data["bookings"][self.user_index]
+        return True
+
+    def release_user(self):
+        """Hand this user's slot to the next user that starts (call from ``on_stop``)."""
+        index = vars(self).pop("user_index", None)
+        if index is not None and hasattr(self, "user"):  # not when assign_user ran out of data
+            release_user_index(index)
+
+
+class DataHttpUser(DataUserMixin, BackendHttpUser):
+    """HTTP user that is assigned its own record from data.json."""
+
+    abstract = True
+
+    def on_start(self):
+        self.assign_user()
+
+    def on_stop(self):
+        self.release_user()
+
+
+class AuthenticatedHttpUser(DataHttpUser):
+    """HTTP user that is assigned its own record and holds a bearer token."""
+
+    abstract = True
+
+    def on_start(self):
+        self.token = None
+        if not self.assign_user():
+            return
+
+        self.token = self.authenticate()
+        if not self.token:
+            self.environment.runner.quit()
+
+    def authenticate(self, refresh=False):
+        """Return a token for ``self.user``, reusing the cached one unless ``refresh`` is set."""
+        username = self.user["username"]
+        if not refresh and username in auth_tokens:
+            return auth_tokens[username]
+
+        response = self.client.post(
+            f"{self.environment.host}{ENDPOINTS['auth']}",
+            json={"username": username, "password": self.user["password"]},
+        )
+
+        if response.status_code != 200:
+            logging.error(f"❌ AUTHENTICATION FAILED: User '{username}' - Status {response.status_code}")
+            auth_tokens.pop(username, None)
+            return None
+
+        token = response.json().get("token", "")
+        auth_tokens[username] = token
+        return token
+
+    def request_with_auth(self, method, url, headers=None, **kwargs):
+        """Send a request with the bearer token, refreshing the token and retrying once on 401."""
+        headers = dict(headers or {})
+        headers["Authorization"] = f"Bearer {self.token}"
+        response = self.client.request(method, url, headers=headers, **kwargs)
+        if response.status_code != 401:
+            return response
+
+        logging.warning(f"🔑 TOKEN REJECTED: Re-authenticating user '{self.user['username']}'")
+        token = self.authenticate(refresh=True)
+        if not token:
+            return response
+        self.token = token
+        headers["Authorization"] = f"Bearer {token}"
+        return self.client.request(method, url, headers=headers, **kwargs)
+
+
+# Load data.json **ONCE** before tests start
+def on_locust_init(environment, **kwargs):
+    """Load and validate user (and booking) data once before the test starts"""
+    try:
+        shared_data = load_data()
+    except Exception as e:
+        logging.error(f"❌ ERROR: Failed to load data.json: {e}")
+        environment.runner.quit()
+        return
+
+    required_keys = ["users"]
+    if any(getattr(user_class, "requires_bookings", False) for user_class in environment.user_classes):
+        required_keys.append("bookings")
+
+    if not shared_data or any(key not in shared_data for key in required_keys):
+        logging.error("❌ ERROR: Invalid data.json content")
+        environment.runner.quit()
+    else:
+        logging.info("✅ Data loaded successfully")
+
+
+events.init.add_listener(on_locust_init)
@@ -0,0 +1,90 @@
+"""
+Side-by-side benchmark of the Locust HTTP client backends
+---------------------------------------------------------
+Runs the same locustfile headless once per backend (`requests` = HttpUser,
+`fast` = FastHttpUser) in a single Locust process against a running Mock API,
+and reports requests/sec together with requests/sec per CPU core actually used
+by the load generator.
+
+Usage (from `locust_tests/`, with the Mock API running):
+    python benchmark_http_backends.py --locustfile locustfile_auth.py --users 200 --run-time 30s
+"""
+
+import argparse
+import csv
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKENDS = ("requests", "fast")
+
+
+def run_backend(backend, args, workdir):
+    """Run one headless Locust process and return its aggregated stats."""
+    csv_prefix = os.path.join(workdir, backend)
+    env = dict(os.environ, LOCUST_HTTP_BACKEND=backend, LOG_PROFILE="perf")
+    command = [
+        sys.executable, "-m", "locust", "-f", args.locustfile, "--headless",
+        "--host", args.host, "--users", str(args.users), "--spawn-rate", str(args.spawn_rate),
+        "--run-time", args.run_time, "--csv", csv_prefix, "--only-summary", "--loglevel", "WARNING",
+    ]
+
+    usage_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    started = time.monotonic()
+    result = subprocess.run(command, env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    wall_time = time.monotonic() - started
+    usage_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    if not os.path.exists(f"{csv_prefix}_stats.csv"):
+        sys.exit(f"❌ ERROR: Locust run for backend '{backend}' failed:\n{result.stderr}")
+    cpu_time = (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime)
+
+    with open(f"{csv_prefix}_stats.csv", newline="") as f:
+        aggregated = next(row for row in csv.DictReader(f) if row["Name"] == "Aggregated")
+
+    requests_count = int(aggregated["Request Count"])
+    cores_used = cpu_time / wall_time if wall_time else 0.0
+    rps = float(aggregated["Requests/s"])
+    return {
+        "backend": backend,
+        "requests": requests_count,
+        "failures": int(aggregated["Failure Count"]),
+        "rps": round(rps, 1),
+        "cpu_seconds": round(cpu_time, 2),
+        "cores_used": round(cores_used, 2),
+        "rps_per_core": round(rps / cores_used, 1) if cores_used else 0.0,
+        "median_ms": float(aggregated["Median Response Time"]),
+        "p95_ms": float(aggregated["95%"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Locust HTTP client backends against the Mock API")
+    parser.add_argument("--locustfile", default="locustfile_auth.py")
+    parser.add_argument("--host", default=os.getenv("LOCUST_HOST", "http://localhost:8000"))
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--spawn-rate", type=float, default=50)
+    parser.add_argument("--run-time", default="30s")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="backend_bench_") as workdir:
+        results = [run_backend(backend, args, workdir) for backend in args.backends]
+
+    print(f"\n{'Backend':<10}{'Requests':>10}{'Fails':>8}{'RPS':>10}{'Cores':>8}{'RPS/core':>10}{'Median':>9}{'p95':>8}")
+    for r in results:
+        print(f"{r['backend']:<10}{r['requests']:>10}{r['failures']:>8}{r['rps']:>10}{r['cores_used']:>8}"
+              f"{r['rps_per_core']:>10}{r['median_ms']:>9}{r['p95_ms']:>8}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Micro-benchmark: booking mutation engine vs the original recursive modify_booking
+--------------------------------------------------------------------------------
+Times single mutations and batches on a booking whose values are inside the
+engine's tables (the steady state during a test), and checks that every call
+really changes the booking.
+
+Usage (from `locust_tests/`):
+    python benchmark_mutations.py --count 200000
+"""
+
+import argparse
+import random
+import time
+
+from mutations import booking_mutator
+
+
+def legacy_modify_booking(booking, rng=random):
+    """The original implementation: rebuilds its lists per call and recurses until the value changes."""
+    fields_to_update = ["firstname", "lastname", "totalprice", "depositpaid", "checkin", "checkout", "additionalneeds"]
+    field_to_modify = rng.choice(fields_to_update)
+    original_value = booking[field_to_modify]
+
+    if field_to_modify == "firstname":
+        booking["firstname"] = rng.choice(["Alice", "Bob", "Charlie", "David"])
+    elif field_to_modify == "lastname":
+        booking["lastname"] = rng.choice(["Johnson", "Williams", "Brown", "Davis"])
+    elif field_to_modify == "totalprice":
+        booking["totalprice"] = rng.randint(100, 1000)
+    elif field_to_modify == "depositpaid":
+        booking["depositpaid"] = not booking["depositpaid"]
+    elif field_to_modify == "checkin":
+        booking["checkin"] = f"2025-01-{rng.randint(1, 28):02d}"
+    elif field_to_modify == "checkout":
+        booking["checkout"] = f"2025-02-{rng.randint(1, 28):02d}"
+    elif field_to_modify == "additionalneeds":
+        booking["additionalneeds"] = rng.choice(["Breakfast", "Lunch", "Dinner", "None"])
+
+    if booking[field_to_modify] != original_value:
+        return field_to_modify, booking[field_to_modify]
+    else:
+        return legacy_modify_booking(booking, rng)
+
+
+def sample_booking():
+    return {"id": 1, "firstname": "Alice", "lastname": "Brown", "totalprice": 500, "depositpaid": True,
+            "checkin": "2025-01-10", "checkout": "2025-02-12", "additionalneeds": "Lunch"}
+
+
+def check_changes(label, func, count):
+    booking = sample_booking()
+    rng = random.Random(0)
+    for _ in range(count):
+        before = dict(booking)
+        field, value = func(booking, rng)
+        if before[field] == value or booking[field] != value:
+            raise AssertionError(f"{label}: {field} did not change")
+
+
+def time_it(func, count):
+    booking = sample_booking()
+    rng = random.Random(0)
+    started = time.perf_counter()
+    for _ in range(count):
+        func(booking, rng)
+    return (time.perf_counter() - started) / count * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark booking mutation strategies")
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    check_changes("legacy", legacy_modify_booking, 10_000)
+    check_changes("engine", booking_mutator.mutate, 10_000)
+
+    legacy_ns = time_it(legacy_modify_booking, args.count)
+    engine_ns = time_it(booking_mutator.mutate, args.count)
+
+    rng = random.Random(0)
+    booking = sample_booking()
+    batches = max(1, args.count // args.batch)
+    started = time.perf_counter()
+    for _ in range(batches):
+        booking_mutator.batch(booking, args.batch, rng)
+    batch_ns = (time.perf_counter() - started) / (batches * args.batch) * 1e9
+
+    print(f"\n{'Strategy':<28}{'ns/mutation':>12}{'speed-up':>10}")
+    print(f"{'legacy (recursive)':<28}{legacy_ns:>12.0f}{1.0:>10.2f}")
+    print(f"{'engine.mutate':<28}{engine_ns:>12.0f}{legacy_ns / engine_ns:>10.2f}")
+    print(f"{f'engine.batch({args.batch})':<28}{batch_ns:>12.0f}{legacy_ns / batch_ns:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
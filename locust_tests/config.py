@@ -9,10 +9,65 @@ ENDPOINTS = {
     "auth": "/auth",
     "booking": "/booking/{id}",
     "update_profile": "/update-profile/{id}",
+    "clear_booking_cache": "/clear-booking-cache",
+    "booking_cache_stats": "/booking-cache/stats",
 }
 
+# Minimum cache-hit ratio the booking cache test expects the API to report
+MIN_CACHE_HIT_RATIO = float(os.getenv("MIN_CACHE_HIT_RATIO", 0.9))
+
+# HTTP client backend: "requests" (HttpUser) or "fast" (FastHttpUser, geventhttpclient)
+HTTP_BACKEND = os.getenv("LOCUST_HTTP_BACKEND", "requests")
+# Connection pooling / keep-alive settings for the "fast" backend
+FAST_HTTP_CONCURRENCY = int(os.getenv("FAST_HTTP_CONCURRENCY", 10))  # pooled keep-alive connections per user
+FAST_HTTP_CONNECTION_TIMEOUT = float(os.getenv("FAST_HTTP_CONNECTION_TIMEOUT", 60.0))
+FAST_HTTP_NETWORK_TIMEOUT = float(os.getenv("FAST_HTTP_NETWORK_TIMEOUT", 60.0))
+
 # WebSocket Configuration
 WEBSOCKET_URL = os.getenv("WEBSOCKET_URL", "ws://localhost:8000/ws")
+WS_CONNECTIONS_PER_USER = int(os.getenv("WS_CONNECTIONS_PER_USER", 1))  # sockets multiplexed by each simulated user
+WS_PIPELINE_DEPTH = int(os.getenv("WS_PIPELINE_DEPTH", 1))  # pings in flight per socket per task
+WS_RESPONSE_TIMEOUT = float(os.getenv("WS_RESPONSE_TIMEOUT", 10))  # seconds before an unanswered ping fails
+
+# Reproducible workloads: each simulated user draws from random.Random(f"{RUN_SEED}:{user index}"), so two runs
+# with the same RUN_SEED send the same request stream (unset = a fresh seed per run, logged at start).
+# WORKLOAD_PREGENERATE > 0 builds that many request bodies per user at a time, off the request path
+RUN_SEED = os.getenv("RUN_SEED")
+WORKLOAD_PREGENERATE = int(os.getenv("WORKLOAD_PREGENERATE", 0))
+
+# Open-model auth test (locustfile_auth_open.py): requests arrive at a target rate whatever the response times.
+# ARRIVAL_PROFILE over ARRIVAL_DURATION seconds: "constant" (START_RPS), "ramp" (START_RPS -> PEAK_RPS linearly),
+# "step" (ARRIVAL_STEPS equal steps from START_RPS to PEAK_RPS) or "spike" (START_RPS, with PEAK_RPS from
+# ARRIVAL_SPIKE_START for ARRIVAL_SPIKE_DURATION seconds). Rates and the in-flight budget are totals across workers;
+# arrivals while ARRIVAL_MAX_IN_FLIGHT requests are outstanding are dropped, and requests starting more than
+# ARRIVAL_LATE_AFTER seconds behind schedule count as late
+ARRIVAL_PROFILE = os.getenv("ARRIVAL_PROFILE", "ramp")
+ARRIVAL_START_RPS = float(os.getenv("ARRIVAL_START_RPS", 10))
+ARRIVAL_PEAK_RPS = float(os.getenv("ARRIVAL_PEAK_RPS", 500))
+ARRIVAL_DURATION = float(os.getenv("ARRIVAL_DURATION", 300))
+ARRIVAL_STEPS = int(os.getenv("ARRIVAL_STEPS", 10))
+ARRIVAL_SPIKE_START = float(os.getenv("ARRIVAL_SPIKE_START", 60))
+ARRIVAL_SPIKE_DURATION = float(os.getenv("ARRIVAL_SPIKE_DURATION", 30))
+ARRIVAL_MAX_IN_FLIGHT = int(os.getenv("ARRIVAL_MAX_IN_FLIGHT", 200))
+ARRIVAL_LATE_AFTER = float(os.getenv("ARRIVAL_LATE_AFTER", 0.05))
+
+# Traffic replay (locustfile_replay.py): trace captured by the Mock API with CAPTURE_TRACE_FILE.
+# REPLAY_SPEED scales the original timing (2 = twice as fast, 0 = as fast as possible);
+# REPLAY_LOOP=1 starts over at the end of the trace; lines up to REPLAY_REORDER_WINDOW seconds out of
+# order (requests are captured when they complete) are put back in start-time order
+REPLAY_TRACE_FILE = os.getenv("REPLAY_TRACE_FILE", "../mock_api/trace.jsonl")
+REPLAY_SPEED = float(os.getenv("REPLAY_SPEED", 1.0))
+REPLAY_LOOP = os.getenv("REPLAY_LOOP", "0") == "1"
+REPLAY_REORDER_WINDOW = float(os.getenv("REPLAY_REORDER_WINDOW", 5.0))
+
+# High-resolution latency time series (latency_histogram.py): when set, per-second p50/p90/p95/p99/p99.9/max per
+# request name are written to this binary file (read it back with `python latency_histogram.py <file>`)
+LATENCY_TIMESERIES_FILE = os.getenv("LATENCY_TIMESERIES_FILE", "")
 
 # Data File Location
 DATA_FILE = os.getenv("DATA_FILE", "../mock_api/data.json")
+
+# Logging: "debug" logs every event, "perf" keeps only warnings/errors plus aggregate counts.
+# LOG_SAMPLE_RATES overrides per event, e.g. "auth_success=0.01,booking_fetch=0.1"
+LOG_PROFILE = os.getenv("LOG_PROFILE", "debug")
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
@@ -1,23 +1,124 @@
 import json
+import mmap
 import os
+import struct
+import sys
+import tempfile
+from array import array
 from threading import Lock
 from config import DATA_FILE
 
 data_lock = Lock()
 shared_data = None
 
+# Compact dataset layout (".lcds"):
+#   header   8-byte magic + <QQ> user/booking counts
+#   index    (users + 1) then (bookings + 1) little-endian uint64 offsets into the records section
+#   records  compact JSON, one record after another
+COMPACT_EXTENSION = ".lcds"
+COMPACT_MAGIC = b"LCDS0001"
+COMPACT_HEADER = struct.Struct("<8sQQ")
+
+
+class RecordView:
+    """Read-only sequence over records in a memory-mapped compact dataset.
+
+    Records are decoded only when indexed, so each worker process shares the
+    file through the page cache instead of holding its own copy on the heap.
+    """
+
+    def __init__(self, buffer, offsets, records_start):
+        self._buffer = buffer
+        self._offsets = offsets
+        self._records_start = records_start
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("record index out of range")
+        start = self._records_start + self._offsets[index]
+        end = self._records_start + self._offsets[index + 1]
+        return json.loads(self._buffer[start:end])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
+class CompactDataset:
+    """Memory-mapped compact dataset with lazy ``users`` and ``bookings`` views."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, num_users, num_bookings = COMPACT_HEADER.unpack_from(self._mmap, 0)
+        if magic != COMPACT_MAGIC:
+            raise ValueError(f"{path} is not a compact dataset")
+
+        records_start = COMPACT_HEADER.size + (num_users + num_bookings + 2) * 8
+        index = memoryview(self._mmap)[COMPACT_HEADER.size:records_start].cast("Q")
+        if sys.byteorder != "little":
+            index = array("Q", index)
+            index.byteswap()
+        user_offsets = index[:num_users + 1]
+        booking_offsets = index[num_users + 1:]
+
+        self.users = RecordView(self._mmap, user_offsets, records_start)
+        self.bookings = RecordView(self._mmap, booking_offsets, records_start)
+
+    def as_dict(self):
+        return {"users": self.users, "bookings": self.bookings}
+
+
+def write_compact_dataset(path, users, bookings):
+    """Write ``users`` and ``bookings`` (any iterables of dicts) as a compact dataset."""
+    offsets = {"users": array("Q"), "bookings": array("Q")}
+    directory = os.path.dirname(os.path.abspath(path))
+
+    # Stream records to a scratch file first; the index has to precede them
+    with tempfile.TemporaryFile(dir=directory) as records:
+        position = 0
+        for key, items in (("users", users), ("bookings", bookings)):
+            offsets[key].append(position)
+            for item in items:
+                encoded = json.dumps(item, separators=(",", ":")).encode()
+                records.write(encoded)
+                position += len(encoded)
+                offsets[key].append(position)
+
+        if sys.byteorder != "little":
+            offsets["users"].byteswap()
+            offsets["bookings"].byteswap()
+
+        with open(path, "wb") as out:
+            out.write(COMPACT_HEADER.pack(COMPACT_MAGIC, len(offsets["users"]) - 1, len(offsets["bookings"]) - 1))
+            offsets["users"].tofile(out)
+            offsets["bookings"].tofile(out)
+            records.seek(0)
+            while chunk := records.read(1024 * 1024):
+                out.write(chunk)
+
 
 def load_data():
-    """Load user and booking data from JSON once."""
+    """Load user and booking data once (JSON, or a memory-mapped compact dataset)."""
     global shared_data
     if shared_data is None:
         with data_lock:
             if shared_data is None:
+                path = os.path.join(os.path.dirname(__file__), DATA_FILE)
                 try:
-                    with open(os.path.join(os.path.dirname(__file__), DATA_FILE), "r") as f:
-                        shared_data = json.load(f)
-                except (json.JSONDecodeError, FileNotFoundError) as e:
-                    print(f"ERROR: Failed to load data.json - {e}")
+                    if path.endswith(COMPACT_EXTENSION):
+                        shared_data = CompactDataset(path).as_dict()
+                    else:
+                        with open(path, "r") as f:
+                            shared_data = json.load(f)
+                except (json.JSONDecodeError, FileNotFoundError, ValueError) as e:
+                    print(f"ERROR: Failed to load {os.path.basename(path)} - {e}")
                     return None
     return shared_data
 
@@ -32,3 +133,15 @@ def get_bookings():
     """Fetch bookings from loaded data."""
     data = load_data()
     return data.get("bookings", []) if data else []
+
+
+if __name__ == "__main__":
+    # Convert data.json into the compact format: python data_loader.py <data.json> <data.lcds>
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python data_loader.py <input.json> <output.lcds>")
+
+    with open(sys.argv[1], "r") as f:
+        source = json.load(f)
+    write_compact_dataset(sys.argv[2], source.get("users", []), source.get("bookings", []))
+    print(f"✅ Compact dataset written to {sys.argv[2]} "
+          f"({len(source.get('users', []))} users, {len(source.get('bookings', []))} bookings)")
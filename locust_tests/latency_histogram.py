@@ -0,0 +1,419 @@
+"""
+High-resolution latency histograms and per-second percentile time series
+------------------------------------------------------------------------
+Locust's own stats round response times to two significant digits, which hides
+tail regressions in long soak runs. With `LATENCY_TIMESERIES_FILE` set, every
+request is also recorded here, at microsecond resolution with under 0.4% error
+(an HDR-style log-linear histogram: 128 linear sub-buckets per power of two).
+
+- Each process records into small sparse per-second histograms.
+- Workers ship them to the master on every stats report (`report_to_master` /
+  `worker_report`), plus a final batch when they stop.
+- The master (or a standalone run) merges them and closes each second once all
+  workers have reported it. It appends one row per second and request name to
+  the time-series file: count, p50, p90, p95, p99, p99.9 and max.
+- The file is a compact binary format written column by column in blocks.
+
+Memory stays constant over multi-hour runs. Only the last few seconds are kept
+open, plus one fixed-size whole-run histogram per request name, and those
+histograms are appended to the file at test stop so runs can be merged later.
+
+Read a file back with:
+    python latency_histogram.py soak.lats                # whole-run + worst-second summary
+    python latency_histogram.py soak.lats --csv soak.csv # per-second rows as CSV
+"""
+
+import argparse
+import array
+import csv
+import json
+import logging
+import math
+import struct
+import sys
+import time
+
+from locust import events
+from locust.runners import MasterRunner, WorkerRunner, WORKER_REPORT_INTERVAL
+import gevent
+
+from config import LATENCY_TIMESERIES_FILE
+
+SUB_BUCKET_BITS = 8  # 256 sub-buckets: values below 256 µs are exact, larger ones within 1/256
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT >> 1
+MAX_VALUE_US = (1 << 32) - 1  # ~71 minutes; slower responses are clamped
+BUCKET_COUNT = (32 - SUB_BUCKET_BITS + 2) * SUB_BUCKET_HALF
+
+PERCENTILES = (50, 90, 95, 99, 99.9)
+STAT_COLUMNS = ("p50", "p90", "p95", "p99", "p999", "max")
+
+FILE_MAGIC = b"LATS"
+FILE_VERSION = 1
+ROWS_PER_BLOCK = 1024
+BLOCK_FLUSH_INTERVAL = 10.0  # seconds; bounds what a crash can lose
+
+HDR_MESSAGE = "latency_hdr"
+SETTLE_SECONDS = WORKER_REPORT_INTERVAL + 2  # a second is closed once every worker has reported it
+
+
+def bucket_index(value_us):
+    """Histogram slot for a latency in whole microseconds."""
+    if value_us < SUB_BUCKET_COUNT:
+        return max(value_us, 0)
+    if value_us > MAX_VALUE_US:
+        value_us = MAX_VALUE_US
+    shift = value_us.bit_length() - SUB_BUCKET_BITS
+    return (shift << (SUB_BUCKET_BITS - 1)) + (value_us >> shift)
+
+
+def bucket_value_ms(index):
+    """Midpoint of a slot's value range, in milliseconds."""
+    if index < SUB_BUCKET_COUNT:
+        return index / 1000
+    shift = index // SUB_BUCKET_HALF - 1
+    low = (index - shift * SUB_BUCKET_HALF) << shift
+    return (low + ((1 << shift) - 1) / 2) / 1000
+
+
+def summarize(items):
+    """Count, percentiles and max from ``(index, count)`` pairs sorted by index."""
+    total = sum(count for _, count in items)
+    ranks = [max(1, math.ceil(p / 100 * total)) for p in PERCENTILES]
+    values = []
+    seen = 0
+    for index, count in items:
+        seen += count
+        while len(values) < len(ranks) and seen >= ranks[len(values)]:
+            values.append(bucket_value_ms(index))
+    values.append(bucket_value_ms(items[-1][0]))
+    return total, values
+
+
+class LatencyHistogram:
+    """Whole-run histogram for one request name: a fixed array of counts, mergeable by addition."""
+
+    def __init__(self):
+        self.counts = array.array("Q", bytes(8 * BUCKET_COUNT))
+        self.count = 0
+
+    def add(self, items):
+        counts = self.counts
+        for index, count in items:
+            counts[index] += count
+            self.count += count
+
+    def items(self):
+        return [(index, count) for index, count in enumerate(self.counts) if count]
+
+    def summary(self):
+        return summarize(self.items()) if self.count else (0, [0.0] * len(STAT_COLUMNS))
+
+
+class LatencyRecorder:
+    """Per-process recording into sparse ``{slot: count}`` dicts, one per second and request name."""
+
+    def __init__(self):
+        self.pending = {}  # second -> name -> {index: count}
+
+    def record(self, name, response_time_ms):
+        second = int(time.time())
+        by_name = self.pending.get(second)
+        if by_name is None:
+            by_name = self.pending[second] = {}
+        counts = by_name.get(name)
+        if counts is None:
+            counts = by_name[name] = {}
+        index = bucket_index(int(response_time_ms * 1000))
+        counts[index] = counts.get(index, 0) + 1
+
+    def drain(self):
+        """Hand over everything recorded so far as ``[second, name, [[index, count], ...]]`` entries."""
+        pending, self.pending = self.pending, {}
+        return [[second, name, list(counts.items())]
+                for second, by_name in pending.items() for name, counts in by_name.items()]
+
+
+class TimeSeriesWriter:
+    """Appends per-second rows to a block-columnar binary file.
+
+    Layout (little-endian): ``LATS``, u8 version, u32 length + JSON metadata, then
+    chunks of 4-byte tag + u32 length + payload:
+    - ``NAME``: u16 id, UTF-8 request name
+    - ``ROWS``: u32 n, then u32[n] unix second, u16[n] name id, u32[n] count and
+      one f32[n] column (milliseconds) per entry in ``STAT_COLUMNS``
+    - ``HIST``: u16 name id, u32 n, u16[n] slot, u64[n] count (whole-run histogram)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "wb")
+        self.names = {}
+        self._rows = self._empty_rows()
+        self._last_flush = time.monotonic()
+        meta = json.dumps({"version": FILE_VERSION, "unit": "ms", "stats": STAT_COLUMNS,
+                           "percentiles": PERCENTILES, "sub_bucket_bits": SUB_BUCKET_BITS,
+                           "created": int(time.time())}).encode()
+        self.file.write(FILE_MAGIC + struct.pack("<BI", FILE_VERSION, len(meta)) + meta)
+
+    @staticmethod
+    def _empty_rows():
+        return {"second": array.array("I"), "name": array.array("H"), "count": array.array("I"),
+                **{stat: array.array("f") for stat in STAT_COLUMNS}}
+
+    def _chunk(self, tag, payload):
+        self.file.write(tag + struct.pack("<I", len(payload)) + payload)
+
+    def _name_id(self, name):
+        name_id = self.names.get(name)
+        if name_id is None:
+            name_id = self.names[name] = len(self.names)
+            self._chunk(b"NAME", struct.pack("<H", name_id) + name.encode())
+        return name_id
+
+    def add_row(self, second, name, count, values):
+        rows = self._rows
+        rows["second"].append(second)
+        rows["name"].append(self._name_id(name))
+        rows["count"].append(count)
+        for stat, value in zip(STAT_COLUMNS, values):
+            rows[stat].append(value)
+        if len(rows["second"]) >= ROWS_PER_BLOCK or time.monotonic() - self._last_flush >= BLOCK_FLUSH_INTERVAL:
+            self.flush()
+
+    def add_histogram(self, name, histogram):
+        items = histogram.items()
+        payload = struct.pack("<HI", self._name_id(name), len(items))
+        payload += _le_bytes(array.array("H", (index for index, _ in items)))
+        payload += _le_bytes(array.array("Q", (count for _, count in items)))
+        self._chunk(b"HIST", payload)
+
+    def flush(self):
+        rows = self._rows
+        if len(rows["second"]):
+            self._chunk(b"ROWS", struct.pack("<I", len(rows["second"])) +
+                        b"".join(_le_bytes(column) for column in rows.values()))
+            self._rows = self._empty_rows()
+        self.file.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+def _le_bytes(values):
+    if sys.byteorder == "big":
+        values = array.array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_le(typecode, payload):
+    values = array.array(typecode)
+    values.frombytes(payload)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def read_timeseries(path):
+    """Load a time-series file: ``(meta, rows, histograms)`` with rows as a dict of columns."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] != FILE_MAGIC:
+        raise ValueError(f"{path} is not a latency time-series file")
+    _, meta_length = struct.unpack_from("<BI", data, 4)
+    meta = json.loads(data[9:9 + meta_length])
+    offset = 9 + meta_length
+
+    names = {}
+    rows = {"second": [], "name": [], "count": [], **{stat: [] for stat in STAT_COLUMNS}}
+    histograms = {}
+    while offset < len(data):
+        tag = data[offset:offset + 4]
+        (length,) = struct.unpack_from("<I", data, offset + 4)
+        payload = data[offset + 8:offset + 8 + length]
+        offset += 8 + length
+        if tag == b"NAME":
+            names[struct.unpack_from("<H", payload)[0]] = payload[2:].decode()
+        elif tag == b"ROWS":
+            (n,) = struct.unpack_from("<I", payload)
+            position = 4
+            for column, typecode, size in (("second", "I", 4), ("name", "H", 2), ("count", "I", 4),
+                                           *((stat, "f", 4) for stat in STAT_COLUMNS)):
+                values = _from_le(typecode, payload[position:position + n * size])
+                rows[column].extend([names[v] for v in values] if column == "name" else values)
+                position += n * size
+        elif tag == b"HIST":
+            name_id, n = struct.unpack_from("<HI", payload)
+            indexes = _from_le("H", payload[6:6 + 2 * n])
+            counts = _from_le("Q", payload[6 + 2 * n:6 + 10 * n])
+            histogram = histograms.setdefault(names[name_id], LatencyHistogram())
+            histogram.add(zip(indexes, counts))
+    return meta, rows, histograms
+
+
+class LatencyTimeSeries:
+    """Merges recorded histograms (from this process or from workers) and writes each second once it is complete."""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.open = {}  # second -> name -> {index: count}
+        self.totals = {}  # name -> LatencyHistogram
+        self.closed_before = 0
+        self.late = 0
+
+    def merge(self, entries):
+        for second, name, items in entries:
+            total = self.totals.get(name)
+            if total is None:
+                total = self.totals[name] = LatencyHistogram()
+            total.add(items)
+            if second < self.closed_before:
+                self.late += sum(count for _, count in items)  # in the whole-run histogram only
+                continue
+            counts = self.open.setdefault(second, {}).setdefault(name, {})
+            for index, count in items:
+                counts[index] = counts.get(index, 0) + count
+
+    def close_seconds(self, before):
+        for second in sorted(s for s in self.open if s < before):
+            for name, counts in sorted(self.open.pop(second).items()):
+                count, values = summarize(sorted(counts.items()))
+                self.writer.add_row(second, name, count, values)
+        self.closed_before = max(self.closed_before, before)
+
+    def finish(self):
+        self.close_seconds(float("inf"))
+        for name, histogram in sorted(self.totals.items()):
+            self.writer.add_histogram(name, histogram)
+        self.writer.close()
+
+
+recorder = LatencyRecorder()
+timeseries = None
+_closer = None
+
+
+def on_request(request_type, name, response_time, response_length, exception=None, **kwargs):
+    if response_time is not None:
+        recorder.record(f"{request_type} {name}", response_time)
+
+
+def on_report_to_master(client_id, data, **kwargs):
+    data[HDR_MESSAGE] = recorder.drain()
+
+
+def on_worker_report(client_id, data, **kwargs):
+    if timeseries is not None and data.get(HDR_MESSAGE):
+        timeseries.merge(data[HDR_MESSAGE])
+
+
+def on_hdr_message(environment, msg, **kwargs):
+    """Final batch a worker sends as it stops, so it lands before the master's test_stop"""
+    if timeseries is not None:
+        timeseries.merge(msg.data)
+
+
+def close_completed_seconds(runner):
+    local = not isinstance(runner, MasterRunner)
+    while True:
+        gevent.sleep(1)
+        if local:
+            timeseries.merge(recorder.drain())
+        timeseries.close_seconds(int(time.time()) - (1 if local else SETTLE_SECONDS))
+
+
+def on_locust_init(environment, **kwargs):
+    if isinstance(environment.runner, MasterRunner):
+        environment.runner.register_message(HDR_MESSAGE, on_hdr_message)
+
+
+def on_test_start(environment, **kwargs):
+    global timeseries, _closer
+    recorder.drain()  # drop anything recorded before this run
+    if isinstance(environment.runner, WorkerRunner):
+        return
+    finish(environment.runner)  # a previous run in this process that was never finished
+    timeseries = LatencyTimeSeries(TimeSeriesWriter(LATENCY_TIMESERIES_FILE))
+    _closer = gevent.spawn(close_completed_seconds, environment.runner)
+    logging.info(f"📈 LATENCY TIME SERIES: writing per-second percentiles to {LATENCY_TIMESERIES_FILE}")
+
+
+def on_test_stop(environment, **kwargs):
+    runner = environment.runner
+    if isinstance(runner, WorkerRunner):
+        runner.send_message(HDR_MESSAGE, recorder.drain())
+    elif isinstance(runner, MasterRunner) and runner.user_count:
+        # Quitting rather than stopping: workers still hold users and send their last samples
+        # while the master quits, so the file is finished on `quitting` instead
+        return
+    else:
+        finish(runner)
+
+
+def on_quitting(environment, **kwargs):
+    if not isinstance(environment.runner, WorkerRunner):
+        finish(environment.runner)
+
+
+def finish(runner):
+    global timeseries
+    if timeseries is None:
+        return
+    _closer.kill()
+    if not isinstance(runner, MasterRunner):
+        timeseries.merge(recorder.drain())
+    timeseries.finish()
+    log_summary(timeseries.totals)
+    if timeseries.late:
+        logging.warning(f"⚠️ {timeseries.late} samples arrived after their second was written "
+                        f"(counted in the whole-run histograms only)")
+    timeseries = None
+
+
+def log_summary(histograms):
+    for name, histogram in sorted(histograms.items()):
+        count, values = histogram.summary()
+        stats = ", ".join(f"{stat} {value:.3f}" for stat, value in zip(STAT_COLUMNS, values))
+        logging.info(f"📈 {name}: {count} requests - {stats} ms")
+
+
+if LATENCY_TIMESERIES_FILE:
+    events.init.add_listener(on_locust_init)
+    events.request.add_listener(on_request)
+    events.report_to_master.add_listener(on_report_to_master)
+    events.worker_report.add_listener(on_worker_report)
+    events.test_start.add_listener(on_test_start)
+    events.test_stop.add_listener(on_test_stop)
+    events.quitting.add_listener(on_quitting)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise or export a latency time-series file")
+    parser.add_argument("path")
+    parser.add_argument("--csv", help="Write the per-second rows to this CSV file")
+    args = parser.parse_args()
+
+    meta, rows, histograms = read_timeseries(args.path)
+    seconds = len(set(rows["second"]))
+    print(f"{args.path}: {len(rows['second'])} rows over {seconds} seconds, {len(histograms)} request names")
+
+    print(f"\n{'Name':<40}{'Requests':>10}" + "".join(f"{stat:>10}" for stat in STAT_COLUMNS) + f"{'worst p99':>11}")
+    for name, histogram in sorted(histograms.items()):
+        count, values = histogram.summary()
+        worst = max((p99 for n, p99 in zip(rows["name"], rows["p99"]) if n == name), default=0.0)
+        print(f"{name:<40}{count:>10}" + "".join(f"{value:>10.3f}" for value in values) + f"{worst:>11.3f}")
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            out = csv.writer(f)
+            out.writerow(rows.keys())
+            for row in zip(*rows.values()):
+                out.writerow([round(value, 3) if isinstance(value, float) else value for value in row])
+        print(f"\n✅ Per-second rows written to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
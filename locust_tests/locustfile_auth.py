@@ -10,45 +10,19 @@ Locust Scalability & Stress Test for Authentication (/auth endpoint)
 - **Duration (run-time):** 10 minutes
 """
 
-from locust import HttpUser, task, between, events
-import threading
+from locust import task, between
+from base_user import DataHttpUser
 from config import MOCK_API_BASE_URL, ENDPOINTS
-from data_loader import load_data
 from utils import log_auth_response
 import logging
 
 logging.basicConfig(level=logging.INFO)
 
-# Global storage for shared data.json content
-data_lock = threading.Lock()
-shared_data = None  # This will store the user data
-global_user_index = -1  # Ensure correct user indexing across all threads
 
-
-class AuthUser(HttpUser):
+class AuthUser(DataHttpUser):
     host = MOCK_API_BASE_URL  # Uses default from config, overridden by --host
     wait_time = between(0, 1)  # Minimal delay between requests for stress testing
 
-    def on_start(self):
-        """Load users from shared memory instead of reading file per user"""
-        global global_user_index, shared_data
-
-        if shared_data is None:
-            logging.error("❌ ERROR: Shared data is not loaded. Test will stop.")
-            self.environment.runner.quit()
-            return
-
-        with data_lock:
-            global_user_index += 1
-            self.user_index = global_user_index  # Assign unique index
-
-        if self.user_index >= len(shared_data["users"]):
-            logging.error(f"❌ ERROR: More users requested ({self.user_index}) than available")
-            self.environment.runner.quit()
-            return
-
-        self.user = shared_data["users"][self.user_index]
-
     @task
     def authenticate_user(self):
         """Perform authentication request for the assigned user"""
@@ -58,23 +32,3 @@ class AuthUser(HttpUser):
         )
 
         log_auth_response(self.user["username"], response)
-
-
-# Load data.json **ONCE** before tests start
-def on_locust_init(environment, **kwargs):
-    """Load user data once before the test starts"""
-    global shared_data
-    try:
-        shared_data = load_data()
-    except Exception as e:
-        logging.error(f"❌ ERROR: Failed to load data.json: {e}")
-        environment.runner.quit()
-
-    if not shared_data or "users" not in shared_data:
-        logging.error("❌ ERROR: Invalid data.json content")
-        environment.runner.quit()
-    else:
-        logging.info("✅ Data loaded successfully")
-
-
-events.init.add_listener(on_locust_init)
@@ -0,0 +1,73 @@
+"""
+Locust Open-Model Capacity Test for Authentication (/auth endpoint)
+-------------------------------------------------------------------
+- **Test Type:** Capacity / Stress Test (open model, arrival rate)
+- **Purpose:** Finds the knee of the `/auth` throughput curve. Requests arrive at the rate set by
+  `ARRIVAL_PROFILE` (constant, ramp, step or spike) regardless of how slowly the server answers,
+  so saturation shows up as growing latency, dropped arrivals and late starts instead of being
+  hidden by users that wait for their responses.
+- **Endpoint:** `/auth` (POST)
+- **Concurrent Users:** One scheduler user per Locust process (set by `ArrivalRateShape`); concurrency
+  comes from up to `ARRIVAL_MAX_IN_FLIGHT` outstanding requests
+- **Wait Time:** None - pacing comes from the arrival schedule
+- **Duration (run-time):** `ARRIVAL_DURATION`
+"""
+
+from locust import task, constant
+from locust.exception import StopUser
+from arrival_rate import ArrivalRateShape, ArrivalScheduler, arrival_profile  # noqa: F401 - Locust picks up the shape
+from base_user import PooledFastHttpUser
+from config import MOCK_API_BASE_URL, ENDPOINTS, ARRIVAL_MAX_IN_FLIGHT, ARRIVAL_LATE_AFTER
+from data_loader import load_data
+from partitioning import user_partitioner
+from utils import log_auth_response
+import itertools
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+
+class OpenModelAuthUser(PooledFastHttpUser):
+    """Runs this process's arrival schedule; FastHttpUser so one user can keep many requests in flight."""
+
+    host = MOCK_API_BASE_URL  # Uses default from config, overridden by --host
+    wait_time = constant(0)
+    concurrency = ARRIVAL_MAX_IN_FLIGHT  # keep-alive connections, enough for the whole in-flight budget
+
+    def on_start(self):
+        shared_data = load_data()
+        if shared_data is None:
+            self.users = None
+            logging.error("❌ ERROR: Shared data is not loaded. Test will stop.")
+            self.environment.runner.quit()
+            return
+        self.users = shared_data["users"]
+        # Cycle through this worker's partition of data.json (wrapping around when the rate outgrows it)
+        self.user_indexes = itertools.count(user_partitioner.offset, user_partitioner.stride)
+
+    @task
+    def run_arrivals(self):
+        if not self.users:
+            raise StopUser()
+        workers = user_partitioner.stride
+        logging.info(f"🎯 OPEN MODEL: {arrival_profile.describe()}"
+                     + (f", this worker sends 1/{workers} of it" if workers > 1 else ""))
+        scheduler = ArrivalScheduler(
+            arrival_profile,
+            self.authenticate_user,
+            max_in_flight=ARRIVAL_MAX_IN_FLIGHT // workers,
+            share=1 / workers,
+            late_after=ARRIVAL_LATE_AFTER,
+        )
+        scheduler.run()
+        raise StopUser()  # the summary is logged at test stop
+
+    def authenticate_user(self):
+        """Perform one authentication request for the next user in this worker's partition"""
+        user = self.users[next(self.user_indexes) % len(self.users)]
+        response = self.client.post(
+            f"{self.environment.host}{ENDPOINTS['auth']}",
+            json={"username": user["username"], "password": user["password"]},
+            name=ENDPOINTS["auth"],
+        )
+        log_auth_response(user["username"], response)
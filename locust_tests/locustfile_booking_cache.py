@@ -4,60 +4,30 @@ Locust Load Test for Booking Retrieval with Caching (/booking/{id} endpoint)
 - **Test Type:** Load Test to Assess Caching Impact on Booking Retrieval
 - **Purpose:** Simulates users repeatedly retrieving the same booking to test cache efficiency.
 - **Endpoint:** `/booking/{id}` (GET)
-- **Caching:** Assumes the API uses in-memory caching for booking retrieval.
+- **Caching:** Reports the API's measured cache-hit ratio (`/booking-cache/stats`) at test stop.
 - **Concurrent Users:** [200 - 500]
 - **spawn-rate:** [10/sec]
 - **Wait Time:** 1 - 3 sec
 - **Duration (run-time):** [3 - 5 minutes]
 """
 
-from locust import HttpUser, task, between, events
-import threading
-from config import MOCK_API_BASE_URL, ENDPOINTS
-from data_loader import load_data
+from locust import task, between, events
+from locust.runners import WorkerRunner
+from config import MOCK_API_BASE_URL, ENDPOINTS, MIN_CACHE_HIT_RATIO
+from base_user import AuthenticatedHttpUser
+from utils import fetch_cache_stats, log_cache_hit_ratio
+from perf_logging import log_event
 import logging
 
 logging.basicConfig(level=logging.INFO)
 
-data_lock = threading.Lock()
-shared_data = None
-global_user_index = -1
+cache_stats_before = None  # API cache counters at test start
 
 
-class BookingCacheUser(HttpUser):
+class BookingCacheUser(AuthenticatedHttpUser):
     host = MOCK_API_BASE_URL
     wait_time = between(1, 3)
-
-    def on_start(self):
-        global global_user_index, shared_data
-        if shared_data is None:
-            logging.error("❌ ERROR: Shared data is not loaded. Test will stop.")
-            self.environment.runner.quit()
-            return
-
-        with data_lock:
-            global_user_index += 1
-            self.user_index = global_user_index
-
-        if self.user_index >= len(shared_data["users"]):
-            logging.error(f"❌ ERROR: More users requested ({self.user_index}) than available.")
-            self.environment.runner.quit()
-            return
-
-        self.user = shared_data["users"][self.user_index]
-        self.booking = shared_data["bookings"][self.user_index]
-
-        response = self.client.post(
-            f"{self.environment.host}{ENDPOINTS['auth']}",
-            json={"username": self.user["username"], "password": self.user["password"]},
-        )
-
-        if response.status_code == 200:
-            self.token = response.json().get("token", "")
-        else:
-            logging.error(f"❌ ERROR: Authentication failed for user {self.user['username']}")
-            self.environment.runner.quit()
-            return
+    requires_bookings = True  # One booking per user, same index
 
     @task
     def get_booking_with_cache(self):
@@ -65,35 +35,29 @@ class BookingCacheUser(HttpUser):
             logging.error(f"❌ ERROR: No authentication token available for user {self.user['username']}")
             return
 
-        headers = {
-            "Authorization": f"Bearer {self.token}"
-        }
-
-        response = self.client.get(
-            f"{self.environment.host}{ENDPOINTS['booking'].format(id=self.booking['id'])}",
-            headers=headers
+        response = self.request_with_auth(
+            "GET",
+            f"{self.environment.host}{ENDPOINTS['booking'].format(id=self.booking['id'])}"
         )
 
         if response.status_code == 200:
-            logging.info(f"✅ Booking fetched successfully: {self.booking['id']}")
+            log_event("booking_fetch", logging.INFO, "✅ Booking fetched successfully: %s", self.booking['id'])
         else:
-            logging.error(f"❌ ERROR fetching booking: {response.status_code}")
+            log_event("booking_fetch_error", logging.ERROR, "❌ ERROR fetching booking: %s", response.status_code)
+
 
+# Measure the cache-hit ratio from the API's own counters instead of assuming it
+def on_test_start(environment, **kwargs):
+    global cache_stats_before
+    if not isinstance(environment.runner, WorkerRunner):
+        cache_stats_before = fetch_cache_stats(environment.host or MOCK_API_BASE_URL)
 
-# Load data.json **ONCE** before tests start
-def on_locust_init(environment, **kwargs):
-    global shared_data
-    try:
-        shared_data = load_data()
-    except Exception as e:
-        logging.error(f"❌ ERROR: Failed to load data.json: {e}")
-        environment.runner.quit()
 
-    if not shared_data or "users" not in shared_data or "bookings" not in shared_data:
-        logging.error("❌ ERROR: Invalid data.json content")
-        environment.runner.quit()
-    else:
-        logging.info("✅ Data loaded successfully")
+def on_test_stop(environment, **kwargs):
+    if not isinstance(environment.runner, WorkerRunner):
+        cache_stats_after = fetch_cache_stats(environment.host or MOCK_API_BASE_URL)
+        log_cache_hit_ratio(cache_stats_before, cache_stats_after, MIN_CACHE_HIT_RATIO)
 
 
-events.init.add_listener(on_locust_init)
+events.test_start.add_listener(on_test_start)
+events.test_stop.add_listener(on_test_stop)
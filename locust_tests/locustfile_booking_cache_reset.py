@@ -2,9 +2,12 @@
 Locust Load Test for Booking Retrieval with Cache Reset (/booking/{id} endpoint)
 --------------------------------------------------------------------------------
 - **Test Type:** Load Test to Evaluate Cache Reset Functionality and Performance
-- **Purpose:** Simulates users retrieving a booking, resetting the cache, and retrieving the booking again to measure the impact.
+- **Purpose:** Simulates users resetting the cache, then retrieving a booking cold and again warm to measure the impact.
+- **Phases:** Reported as `reset`, `cold GET` and `warm GET` (aggregated across booking ids). Each iteration's
+  paired cold - warm latency difference goes into a fixed-size histogram (workers ship theirs to the master with
+  every stats report) and its median is logged at test stop.
 - **Endpoint:** `/booking/{id}` (GET) and `/clear-booking-cache` (POST)
-- **Caching:** Assumes the API uses in-memory caching for booking retrieval.
+- **Caching:** Reports the API's measured cache-hit ratio (`/booking-cache/stats`) at test stop.
 - **Cache Reset:** Tests the `/clear-booking-cache` endpoint.
 - **Concurrent Users:** [200 - 500]
 - **spawn-rate:** [10/sec]
@@ -12,114 +15,222 @@ Locust Load Test for Booking Retrieval with Cache Reset (/booking/{id} endpoint)
 - **Duration (run-time):** [3 - 5 minutes]
 """
 
-from locust import HttpUser, task, between, events
-import threading
+from locust import task, between, events
+from locust.runners import MasterRunner, WorkerRunner
 from config import MOCK_API_BASE_URL, ENDPOINTS
-from data_loader import load_data
+from base_user import AuthenticatedHttpUser
+from utils import fetch_cache_stats, log_cache_hit_ratio
+from latency_histogram import bucket_index, bucket_value_ms
+from perf_logging import log_event
 import logging
+import math
 
 logging.basicConfig(level=logging.INFO)
 
-data_lock = threading.Lock()
-shared_data = None
-global_user_index = -1
+# Request names: one stats row per phase instead of one per booking id
+PHASE_RESET = "reset"
+PHASE_COLD_GET = "cold GET"
+PHASE_WARM_GET = "warm GET"
+PAIRS_MESSAGE = "cache_reset_pairs"
 
 
-class BookingCacheResetUser(HttpUser):
-    host = MOCK_API_BASE_URL
-    wait_time = between(1, 3)
+class DeltaHistogram:
+    """Signed latency differences in the log-linear slots of ``latency_histogram`` (under 0.4% error).
 
-    def on_start(self):
-        global global_user_index, shared_data
-        if shared_data is None:
-            logging.error("❌ ERROR: Shared data is not loaded. Test will stop.")
-            self.environment.runner.quit()
-            return
+    Holds at most one ``{slot: count}`` entry per slot and sign, however long the run, and merges by
+    addition, so workers can hand over what they recorded since their last report.
+    """
 
-        with data_lock:
-            global_user_index += 1
-            self.user_index = global_user_index
+    def __init__(self):
+        self.counts = {}  # slot -> count; negative differences use -(slot + 1)
 
-        if self.user_index >= len(shared_data["users"]):
-            logging.error(f"❌ ERROR: More users requested ({self.user_index}) than available.")
-            self.environment.runner.quit()
-            return
+    def record(self, delta_ms):
+        slot = bucket_index(int(abs(delta_ms) * 1000))
+        key = slot if delta_ms >= 0 else -slot - 1
+        self.counts[key] = self.counts.get(key, 0) + 1
 
-        self.user = shared_data["users"][self.user_index]
-        self.booking = shared_data["bookings"][self.user_index]
+    def merge(self, items):
+        for key, count in items:
+            self.counts[key] = self.counts.get(key, 0) + count
 
-        response = self.client.post(
-            f"{self.environment.host}{ENDPOINTS['auth']}",
-            json={"username": self.user["username"], "password": self.user["password"]},
-        )
+    def drain(self):
+        """Hand over everything recorded so far as ``[[slot, count], ...]``."""
+        counts, self.counts = self.counts, {}
+        return list(counts.items())
+
+    def count(self):
+        return sum(self.counts.values())
+
+    def percentile(self, p):
+        rank = max(1, math.ceil(p / 100 * self.count()))
+        seen = 0
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if seen >= rank:
+                return bucket_value_ms(key) if key >= 0 else -bucket_value_ms(-key - 1)
 
-        if response.status_code == 200:
-            self.token = response.json().get("token", "")
-        else:
-            logging.error(f"❌ ERROR: Authentication failed for user {self.user['username']}")
-            self.environment.runner.quit()
-            return
+
+cache_stats_before = None  # API cache counters at test start
+paired_deltas = DeltaHistogram()  # cold - warm ms, for iterations whose cold GET missed the cache and warm GET hit it
+unpaired = 0  # iterations left out, e.g. another user's reset landed between the cold and warm GET
+
+
+class BookingCacheResetUser(AuthenticatedHttpUser):
+    host = MOCK_API_BASE_URL
+    wait_time = between(1, 3)
+    requires_bookings = True  # One booking per user, same index
 
     @task
     def get_booking_with_reset(self):
+        """Reset the cache, then fetch the same booking twice: once cold (from the store), once warm (cached).
+
+        Each phase is reported under its own name, aggregated across booking ids. The cold - warm difference
+        is only kept when the API's ``X-Cache`` header confirms a miss then a hit: every user resets the
+        shared cache, so another user's reset often lands between the two GETs.
+        """
+        global unpaired
         if not hasattr(self, "token") or not self.token:
             logging.error(f"❌ ERROR: No authentication token available for user {self.user['username']}")
             return
 
-        headers = {
-            "Authorization": f"Bearer {self.token}"
-        }
+        booking_url = f"{self.environment.host}{ENDPOINTS['booking'].format(id=self.booking['id'])}"
 
-        # First get booking
-        response1 = self.client.get(
-            f"{self.environment.host}{ENDPOINTS['booking'].format(id=self.booking['id'])}",
-            headers=headers
+        # Reset cache
+        response_reset = self.request_with_auth(
+            "POST",
+            f"{self.environment.host}{ENDPOINTS['clear_booking_cache']}",
+            name=PHASE_RESET
         )
 
-        if response1.status_code == 200:
-            logging.info(f"✅ Booking fetched successfully (before reset): {self.booking['id']}")
+        if response_reset.status_code == 200:
+            log_event("cache_reset", logging.INFO, "✅ Booking cache reset successfully.")
         else:
-            logging.error(f"❌ ERROR fetching booking (before reset): {response1.status_code}")
+            log_event("cache_reset_error", logging.ERROR, "❌ ERROR resetting booking cache: %s", response_reset.status_code)
             return
 
-        # Reset cache
-        response_reset = self.client.post(
-            f"{self.environment.host}/clear-booking-cache",
-            headers=headers
-        )
+        # Cold GET: the cache was just cleared, so the booking comes from the store
+        response_cold, cold_ms = self.timed_get(booking_url, PHASE_COLD_GET)
 
-        if response_reset.status_code == 200:
-            logging.info("✅ Booking cache reset successfully.")
+        if response_cold.status_code == 200:
+            log_event("booking_fetch", logging.INFO, "✅ Booking fetched successfully (cold): %s", self.booking['id'])
         else:
-            logging.error(f"❌ ERROR resetting booking cache: {response_reset.status_code}")
+            log_event("booking_fetch_error", logging.ERROR, "❌ ERROR fetching booking (cold): %s",
+                      response_cold.status_code)
             return
 
-        # Get booking again (should be slower)
-        response2 = self.client.get(
-            f"{self.environment.host}{ENDPOINTS['booking'].format(id=self.booking['id'])}",
-            headers=headers
-        )
+        # Warm GET straight after, served from the cache the cold GET filled
+        response_warm, warm_ms = self.timed_get(booking_url, PHASE_WARM_GET)
+
+        if response_warm.status_code == 200:
+            log_event("booking_fetch", logging.INFO, "✅ Booking fetched successfully (warm): %s", self.booking['id'])
+        else:
+            log_event("booking_fetch_error", logging.ERROR, "❌ ERROR fetching booking (warm): %s",
+                      response_warm.status_code)
+            return
 
-        if response2.status_code == 200:
-            logging.info(f"✅ Booking fetched successfully (after reset): {self.booking['id']}")
+        if response_cold.headers.get("X-Cache") == "MISS" and response_warm.headers.get("X-Cache") == "HIT":
+            paired_deltas.record(cold_ms - warm_ms)
         else:
-            logging.error(f"❌ ERROR fetching booking (after reset): {response2.status_code}")
+            unpaired += 1
+
+    def timed_get(self, url, name):
+        """GET with the bearer token; returns the response and Locust's response time for this one request.
+
+        Unlike ``request_with_auth``, a 401 is not retried here (the token is refreshed for the next
+        iteration instead), so a re-authentication never counts towards a cold or warm timing.
+        """
+        headers = {"Authorization": f"Bearer {self.token}"}
+        with self.client.get(url, headers=headers, name=name, catch_response=True) as response:
+            if response.status_code != 200:
+                response.failure(f"Status {response.status_code}")
+            response_time = response.request_meta["response_time"]
+        if response.status_code == 401:
+            self.token = self.authenticate(refresh=True) or self.token
+        return response, response_time
+
+
+# Workers hand their paired deltas to the master with every stats report, plus a final batch when they stop
+def drain_pairs():
+    global unpaired
+    batch = {"deltas": paired_deltas.drain(), "unpaired": unpaired}
+    unpaired = 0
+    return batch
+
+
+def merge_pairs(batch):
+    global unpaired
+    paired_deltas.merge(batch["deltas"])
+    unpaired += batch["unpaired"]
+
+
+def on_report_to_master(client_id, data, **kwargs):
+    data[PAIRS_MESSAGE] = drain_pairs()
+
+
+def on_worker_report(client_id, data, **kwargs):
+    if PAIRS_MESSAGE in data:
+        merge_pairs(data[PAIRS_MESSAGE])
+
+
+def on_pairs_message(environment, msg, **kwargs):
+    merge_pairs(msg.data)
 
 
-# Load data.json **ONCE** before tests start
 def on_locust_init(environment, **kwargs):
-    global shared_data
-    try:
-        shared_data = load_data()
-    except Exception as e:
-        logging.error(f"❌ ERROR: Failed to load data.json: {e}")
-        environment.runner.quit()
-
-    if not shared_data or "users" not in shared_data or "bookings" not in shared_data:
-        logging.error("❌ ERROR: Invalid data.json content")
-        environment.runner.quit()
+    if isinstance(environment.runner, MasterRunner):
+        environment.runner.register_message(PAIRS_MESSAGE, on_pairs_message)
+
+
+# Measure the cache-hit ratio from the API's own counters instead of assuming it
+def on_test_start(environment, **kwargs):
+    global cache_stats_before
+    drain_pairs()
+    if not isinstance(environment.runner, WorkerRunner):
+        cache_stats_before = fetch_cache_stats(environment.host or MOCK_API_BASE_URL)
+
+
+def on_test_stop(environment, **kwargs):
+    runner = environment.runner
+    if isinstance(runner, WorkerRunner):
+        runner.send_message(PAIRS_MESSAGE, drain_pairs())
+    elif isinstance(runner, MasterRunner) and runner.user_count:
+        # Quitting rather than stopping: workers report while the master quits, so summarise on `quitting`
+        return
     else:
-        logging.info("✅ Data loaded successfully")
+        log_results(environment)
+
+
+def on_quitting(environment, **kwargs):
+    if isinstance(environment.runner, MasterRunner) and cache_stats_before is not None:
+        log_results(environment)
+
+
+def log_results(environment):
+    global cache_stats_before
+    cache_stats_after = fetch_cache_stats(environment.host or MOCK_API_BASE_URL)
+    log_cache_hit_ratio(cache_stats_before, cache_stats_after)
+    log_phase_summary(environment.stats)
+    cache_stats_before = None
+
+
+def log_phase_summary(stats):
+    """Log cold vs warm GET latency side by side, with the median of the paired per-booking deltas"""
+    cold = stats.get(PHASE_COLD_GET, "GET")
+    warm = stats.get(PHASE_WARM_GET, "GET")
+    if not cold.num_requests or not warm.num_requests:
+        return
+    pairs = paired_deltas.count()
+    paired = (f"paired delta median {paired_deltas.percentile(50):.3f} ms over {pairs} iterations"
+              if pairs else "no paired iterations")
+    logging.info(f"📊 CACHE EFFECT: cold GET median {cold.median_response_time} ms / p95 "
+                 f"{cold.get_response_time_percentile(0.95)} ms, warm GET median {warm.median_response_time} ms / "
+                 f"p95 {warm.get_response_time_percentile(0.95)} ms, {paired} "
+                 f"({unpaired} left out without a miss-then-hit, e.g. another user's reset in between)")
 
 
 events.init.add_listener(on_locust_init)
+events.report_to_master.add_listener(on_report_to_master)
+events.worker_report.add_listener(on_worker_report)
+events.test_start.add_listener(on_test_start)
+events.test_stop.add_listener(on_test_stop)
+events.quitting.add_listener(on_quitting)
@@ -0,0 +1,98 @@
+"""
+Locust Replay Test for Captured Traffic (all HTTP endpoints)
+------------------------------------------------------------
+- **Test Type:** Production-Shaped Load Test (record & replay)
+- **Purpose:** Replays a trace recorded by the Mock API (`CAPTURE_TRACE_FILE`) with its original
+  traffic mix and inter-arrival times, optionally sped up (`REPLAY_SPEED`) or as fast as possible (`0`).
+- **Endpoints:** Whatever the trace contains
+- **Concurrent Users:** Enough to keep up with the trace's peak concurrency (late requests are reported)
+- **Wait Time:** None - pacing comes from the trace's timestamps
+- **Duration (run-time):** Length of the trace / `REPLAY_SPEED`, or `--run-time` with `REPLAY_LOOP=1`
+"""
+
+from locust import task, constant, events
+from locust.exception import StopUser
+from base_user import BackendHttpUser, auth_tokens
+from config import MOCK_API_BASE_URL, ENDPOINTS
+from data_loader import load_data
+from photo_pool import photo_pool
+from replay import trace_feed
+from utils import generate_random_email
+import logging
+import re
+
+logging.basicConfig(level=logging.INFO)
+
+ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+passwords = None  # username -> password, built on first use
+
+
+def password_for(username):
+    global passwords
+    if passwords is None:
+        passwords = {user["username"]: user["password"] for user in load_data()["users"]}
+    return passwords.get(username)
+
+
+class ReplayUser(BackendHttpUser):
+    host = MOCK_API_BASE_URL  # Uses default from config, overridden by --host
+    wait_time = constant(0)  # The trace's timestamps set the pace
+
+    def token_for(self, username):
+        """Bearer token for a user seen in the trace, shared with every other simulated user"""
+        token = auth_tokens.get(username)
+        if token is None:
+            response = self.client.post(
+                f"{self.environment.host}{ENDPOINTS['auth']}",
+                json={"username": username, "password": password_for(username)},
+            )
+            if response.status_code != 200:
+                logging.error(f"❌ AUTHENTICATION FAILED: User '{username}' - Status {response.status_code}")
+                return None
+            token = auth_tokens[username] = response.json().get("token", "")
+        return token
+
+    @task
+    def replay_request(self):
+        """Send the next due request from the trace and expect the status it got when captured"""
+        record = trace_feed().next()
+        if record is None:
+            logging.info("🎬 Trace exhausted, stopping user")
+            raise StopUser()
+
+        headers = {}
+        kwargs = {}
+        if record.get("user"):
+            headers["Authorization"] = f"Bearer {self.token_for(record['user'])}"
+        if record.get("body") is not None:
+            headers["Content-Type"] = record["content_type"]
+            kwargs["data"] = record["body"].encode("utf-8")
+        elif record.get("content_type") == "multipart/form-data":
+            # Uploads are captured without their bytes; send a preloaded photo instead
+            photo_name, payload = photo_pool.next_photo("None")
+            kwargs["data"] = {"email": generate_random_email()}
+            kwargs["files"] = {"profile_photo": (photo_name, payload, "image/jpeg")}
+
+        url = f"{self.environment.host}{record['path']}" + (f"?{record['query']}" if record.get("query") else "")
+        with self.client.request(record["method"], url, name=ID_SEGMENT.sub("/{id}", record["path"]),
+                                 headers=headers, catch_response=True, **kwargs) as response:
+            if response.status_code == record.get("status", response.status_code):
+                response.success()
+            else:
+                if response.status_code == 401 and record.get("user"):
+                    auth_tokens.pop(record["user"], None)  # expired; log in again next time
+                response.failure(f"Expected status {record['status']}, got {response.status_code}")
+
+
+# Preload the profile photos once before tests start (for captured uploads)
+def on_locust_init(environment, **kwargs):
+    """Load profile photos into memory once before the test starts"""
+    try:
+        photo_pool.load()
+    except FileNotFoundError as e:
+        logging.error(f"❌ ERROR: {e}")
+        environment.runner.quit()
+
+
+events.init.add_listener(on_locust_init)
@@ -10,57 +10,26 @@ Locust Load Test for Updating User Profile (/update-profile/{id} endpoint)
 - **Duration (run-time):** 3 - 5 minutes
 """
 
-from locust import HttpUser, task, between, events
-import threading
+from locust import task, between, events
 from config import MOCK_API_BASE_URL, ENDPOINTS
-from data_loader import load_data
-from utils import log_profile_update, generate_random_email, select_random_photo
+from base_user import AuthenticatedHttpUser
+from photo_pool import photo_pool
+from utils import log_profile_update
+from workload import ProfileUpdateStream, user_rng
 import logging
 
 logging.basicConfig(level=logging.INFO)
 
-# Global variables
-data_lock = threading.Lock()
-shared_data = None  # Stores user data
-global_user_index = -1  # Ensures unique user indexing across all threads
 
-
-class UpdateProfileUser(HttpUser):
+class UpdateProfileUser(AuthenticatedHttpUser):
     host = MOCK_API_BASE_URL  # Uses default from config, overridden by --host
     wait_time = between(1, 3)  # Adds a delay between requests, common for load tests
 
     def on_start(self):
-        """Load users from shared memory instead of reading file per user"""
-        global global_user_index, shared_data
-
-        if shared_data is None:
-            logging.error("❌ ERROR: Shared data is not loaded. Test will stop.")
-            self.environment.runner.quit()
-            return
-
-        with data_lock:
-            global_user_index += 1
-            self.user_index = global_user_index
-
-        if self.user_index >= len(shared_data["users"]):
-            logging.error(f"❌ ERROR: More users requested ({self.user_index}) than available.")
-            self.environment.runner.quit()
-            return
-
-        self.user = shared_data["users"][self.user_index]
-
-        # Authenticate the user
-        response = self.client.post(
-            f"{self.environment.host}{ENDPOINTS['auth']}",
-            json={"username": self.user["username"], "password": self.user["password"]},
-        )
-
-        if response.status_code == 200:
-            self.token = response.json().get("token", "")
-        else:
-            logging.error(f"❌ AUTHENTICATION FAILED: User '{self.user['username']}' - Status {response.status_code}")
-            self.environment.runner.quit()
-            return
+        super().on_start()
+        if self.token:
+            # Seeded per user: emails, photos and multipart bodies come ready-made from preloaded photos
+            self.updates = ProfileUpdateStream(self.user, user_rng(self.user_index))
 
     @task
     def update_profile(self):
@@ -69,35 +38,16 @@ class UpdateProfileUser(HttpUser):
             logging.error(f"❌ ERROR: No authentication token available for user {self.user['username']}")
             return
 
-        headers = {
-            "Authorization": f"Bearer {self.token}"
-        }
-
-        new_email = generate_random_email()
-
-        # Ensure new photo is different from the old one
+        # Preloaded photo, already chosen to differ from the current one
         old_photo = self.user.get("profile_photo", "None")
-        attempts = 0  # Limit retries to prevent infinite loops
-        while attempts < 5:
-            try:
-                photo_path, photo_name = select_random_photo()
-                if photo_name != old_photo:
-                    break  # Successfully found a different photo
-            except FileNotFoundError as e:
-                logging.error(f"❌ ERROR: {e}")
-                return
-            attempts += 1
+        new_email, photo_name, body, content_type = self.updates.next()
 
-        with open(photo_path, 'rb') as photo_file:
-            files = {
-                "email": (None, new_email),
-                "profile_photo": (photo_name, photo_file, 'image/jpeg')
-            }
-            response = self.client.put(
-                f"{self.environment.host}{ENDPOINTS['update_profile'].format(id=self.user['id'])}",
-                headers=headers,
-                files=files
-            )
+        response = self.request_with_auth(
+            "PUT",
+            f"{self.environment.host}{ENDPOINTS['update_profile'].format(id=self.user['id'])}",
+            headers={"Content-Type": content_type},
+            data=body
+        )
 
         log_profile_update(
             user_id=self.user["id"],
@@ -113,21 +63,14 @@ class UpdateProfileUser(HttpUser):
         self.user["profile_photo"] = photo_name
 
 
-# Load data.json once before tests start
+# Preload the profile photos once before tests start
 def on_locust_init(environment, **kwargs):
-    """Load user data once before the test starts"""
-    global shared_data
+    """Load profile photos into memory once before the test starts"""
     try:
-        shared_data = load_data()
-    except Exception as e:
-        logging.error(f"❌ ERROR: Failed to load data.json: {e}")
-        environment.runner.quit()
-
-    if not shared_data or "users" not in shared_data:
-        logging.error("❌ ERROR: Invalid data.json content")
+        photo_pool.load()
+    except FileNotFoundError as e:
+        logging.error(f"❌ ERROR: {e}")
         environment.runner.quit()
-    else:
-        logging.info("✅ Data loaded successfully")
 
 
 events.init.add_listener(on_locust_init)
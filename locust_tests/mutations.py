@@ -0,0 +1,54 @@
+"""
+Booking mutation engine
+-----------------------
+Every mutable booking field has a precomputed table of the values it may take and
+a value -> position index. Picking a *different* value is then one random draw
+over the other ``n - 1`` slots (skipping the current value's slot), so a change is
+guaranteed in constant time, with no retries and no per-call list building. The
+distribution matches drawing uniformly from the table and retrying on repeats.
+"""
+
+import random
+
+FIRSTNAMES = ("Alice", "Bob", "Charlie", "David")
+LASTNAMES = ("Johnson", "Williams", "Brown", "Davis")
+ADDITIONAL_NEEDS = ("Breakfast", "Lunch", "Dinner", "None")
+
+
+class BookingMutator:
+    """Changes one booking field per call to a value guaranteed to differ from the current one."""
+
+    def __init__(self):
+        self.tables = {
+            "firstname": FIRSTNAMES,
+            "lastname": LASTNAMES,
+            "totalprice": tuple(range(100, 1001)),
+            "depositpaid": (False, True),
+            "checkin": tuple(f"2025-01-{day:02d}" for day in range(1, 29)),
+            "checkout": tuple(f"2025-02-{day:02d}" for day in range(1, 29)),
+            "additionalneeds": ADDITIONAL_NEEDS,
+        }
+        self.fields = tuple(self.tables)
+        self.positions = {field: {value: i for i, value in enumerate(values)} for field, values in self.tables.items()}
+
+    def mutate(self, booking, rng=random):
+        """Change one random field of ``booking`` in place and return ``(field, new_value)``."""
+        field = self.fields[int(rng.random() * len(self.fields))]
+        values = self.tables[field]
+        current = self.positions[field].get(booking[field])
+        if current is None:
+            # Value from outside the table (e.g. generated data): any entry is a change
+            new_value = values[int(rng.random() * len(values))]
+        else:
+            slot = int(rng.random() * (len(values) - 1))
+            new_value = values[slot + 1 if slot >= current else slot]
+        booking[field] = new_value
+        return field, new_value
+
+    def batch(self, booking, count, rng=random):
+        """Apply ``count`` successive mutations to ``booking``; returns the list of ``(field, new_value)``."""
+        mutate = self.mutate
+        return [mutate(booking, rng) for _ in range(count)]
+
+
+booking_mutator = BookingMutator()
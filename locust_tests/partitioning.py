@@ -0,0 +1,119 @@
+"""
+Distributed-aware user partitioning
+-----------------------------------
+Every simulated user needs its own index into data.json (one user, one booking).
+In `--master`/`--worker` mode each worker process would otherwise start counting
+at 0, so all workers would hammer the same first N users and bookings.
+
+At test start the master assigns every connected worker an offset and stride
+(worker k of N gets indexes k, k + N, k + 2N, ...), which keeps the ranges
+disjoint across workers. A standalone run keeps offset 0 and stride 1.
+
+Locust does not always spawn the same number of users on every worker (5 users
+on 2 workers is 3 + 2), so the busier worker can run past the end of the data
+before the others do. Its indexes then wrap around to the start of data.json
+and may reuse users from another worker's slice; a warning is logged when that
+happens.
+
+A stopping user releases its index, and the next user to start on that worker
+takes it over. Ramping down and back up (or a load shape that replaces users)
+therefore reuses the same slots, usernames and cached tokens instead of
+walking further into data.json.
+"""
+
+from locust import events
+from locust.runners import MasterRunner, WorkerRunner
+import itertools
+import logging
+
+PARTITION_MESSAGE = "assign_user_partition"
+
+
+class UserPartitioner:
+    """Hands out process-local user indexes mapped onto this worker's partition.
+
+    Numbering uses ``itertools.count``, whose ``next()`` is atomic, and released
+    indexes sit in a list (``append``/``pop`` are atomic too), so spawning users
+    never serialise on a lock.
+    """
+
+    def __init__(self):
+        self._partition = (0, 1, itertools.count())
+        self._released = []
+        self._wrapped = False
+
+    @property
+    def offset(self):
+        return self._partition[0]
+
+    @property
+    def stride(self):
+        return self._partition[1]
+
+    def assign(self, offset, stride):
+        """Adopt a new partition and restart local numbering."""
+        self._partition = (offset, stride, itertools.count())
+        self._released = []
+        self._wrapped = False
+
+    def release(self, index):
+        """Hand ``index`` back for the next user that starts."""
+        self._released.append(index)
+
+    def next_index(self, available=None):
+        """A released index if there is one, else the next index of this partition.
+
+        New indexes are wrapped into ``available`` records in a distributed run.
+        """
+        released = self._released
+        try:
+            return released.pop()
+        except IndexError:
+            pass
+        offset, stride, counter = self._partition
+        index = offset + next(counter) * stride
+        if available and stride > 1 and index >= available:
+            if not self._wrapped:
+                self._wrapped = True
+                logging.warning(f"⚠️ USER PARTITION: this worker ran past the {available} available users, "
+                                f"wrapping around (users may be shared with other workers)")
+            index %= available
+        return index
+
+
+user_partitioner = UserPartitioner()
+
+
+def next_user_index(available=None):
+    """Return a user index that is unique across all workers of the test while the data lasts."""
+    return user_partitioner.next_index(available)
+
+
+def release_user_index(index):
+    """Let the next user started in this process take over ``index``."""
+    user_partitioner.release(index)
+
+
+def on_partition_message(environment, msg, **kwargs):
+    user_partitioner.assign(msg.data["offset"], msg.data["stride"])
+    logging.info(f"🧩 USER PARTITION: offset {msg.data['offset']}, stride {msg.data['stride']}")
+
+
+def on_locust_init(environment, **kwargs):
+    if isinstance(environment.runner, WorkerRunner):
+        environment.runner.register_message(PARTITION_MESSAGE, on_partition_message)
+
+
+def on_test_start(environment, **kwargs):
+    runner = environment.runner
+    if isinstance(runner, MasterRunner):
+        # Sent before the spawn messages, so workers know their partition before any user starts
+        workers = sorted(node.id for node in runner.clients.ready + runner.clients.running + runner.clients.spawning)
+        for offset, client_id in enumerate(workers):
+            runner.send_message(PARTITION_MESSAGE, {"offset": offset, "stride": len(workers)}, client_id=client_id)
+    elif not isinstance(runner, WorkerRunner):
+        user_partitioner.assign(0, 1)
+
+
+events.init.add_listener(on_locust_init)
+events.test_start.add_listener(on_test_start)
@@ -0,0 +1,151 @@
+"""
+Queue-based, sampled logging for load-generator hot paths
+---------------------------------------------------------
+Same `debug`/`perf` profiles and `LOG_SAMPLE_RATES` as the Mock API, configured
+from config.py. The module is self-contained, so workers can run without the
+mock_api package.
+
+- **debug** profile (default): every event is logged, emoji and all.
+- **perf** profile: INFO events are only counted; warnings and errors are still
+  logged, and the per-event counts are logged once at test stop.
+
+Once Locust has set up logging, the root logger's console/file handlers are
+moved behind a `QueueListener`. The listener runs in gevent's thread pool, on a
+real OS thread, and reads a native queue: a monkey-patched thread would just be
+another greenlet on the users' hub. Users only format the message and put the
+record on the queue; the write to stderr or the log file happens on the
+listener thread.
+"""
+
+from locust import events
+from gevent import get_hub, monkey
+from config import LOG_PROFILE, LOG_SAMPLE_RATES
+import atexit
+import logging
+import logging.handlers
+
+LOG_PROFILES = ("debug", "perf")
+
+NativeRLock = monkey.get_original("_thread", "RLock")
+NativeSimpleQueue = monkey.get_original("queue", "SimpleQueue")
+
+
+def parse_sample_rates(spec):
+    """Parse ``"event=rate,event=rate"`` into a dict of floats."""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        event, _, rate = item.partition("=")
+        rates[event.strip()] = float(rate)
+    return rates
+
+
+class EventLog:
+    """Counts every event and logs a deterministic sample of them."""
+
+    def __init__(self, profile="debug", sample_rates=None, logger=None):
+        if profile not in LOG_PROFILES:
+            raise ValueError(f"Unknown log profile '{profile}', expected one of {LOG_PROFILES}")
+        self.profile = profile
+        self.sample_rates = sample_rates or {}
+        self.logger = logger or logging.getLogger()
+        self.counts = {}
+        self._every = {}  # event -> log every Nth occurrence (0 = never)
+
+    def _log_every(self, event, level):
+        rate = self.sample_rates.get(event)
+        if rate is None:
+            rate = 1.0 if self.profile == "debug" or level >= logging.WARNING else 0.0
+        every = 0 if rate <= 0 else max(1, round(1 / rate))
+        self._every[event] = every
+        return every
+
+    def log(self, event, level, msg, *args):
+        """Count ``event`` and log it if it falls in the sample. ``msg`` is formatted lazily."""
+        count = self.counts.get(event, 0) + 1
+        self.counts[event] = count
+
+        every = self._every.get(event)
+        if every is None:
+            every = self._log_every(event, level)
+        if every and (count - 1) % every == 0 and self.logger.isEnabledFor(level):
+            self.logger.log(level, msg, *args)
+
+    def log_summary(self):
+        if self.counts:
+            summary = ", ".join(f"{event}={count}" for event, count in sorted(self.counts.items()))
+            self.logger.warning("📊 LOG EVENTS: %s", summary)
+
+
+event_log = EventLog(LOG_PROFILE, parse_sample_rates(LOG_SAMPLE_RATES))
+
+
+def log_event(event, level, msg, *args):
+    event_log.log(event, level, msg, *args)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queues records with their message text fixed, leaving handler formatting to the listener thread."""
+
+    def prepare(self, record):
+        # Merge the args now: they are often live objects that may change before the listener gets to the record
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class NativeQueueListener(logging.handlers.QueueListener):
+    """QueueListener running on one of gevent's thread-pool threads, a real OS thread."""
+
+    def start(self):
+        self._thread = get_hub().threadpool.spawn(self._monitor)
+
+    def stop(self):
+        if self._thread is not None:
+            self.enqueue_sentinel()
+            self._thread.wait()  # waits cooperatively; other greenlets keep running
+            self._thread = None
+
+
+_listener = None
+
+
+def start_queue_logging():
+    """Move the root logger's writing handlers behind a NativeQueueListener.
+
+    Locust's ``log_reader`` handler stays on the root logger, since the web UI
+    looks it up there; it only appends to an in-memory deque.
+    """
+    global _listener
+    root = logging.getLogger()
+    writers = [handler for handler in root.handlers if handler.name != "log_reader"]
+    if _listener is not None or not writers:
+        return
+
+    for handler in writers:
+        handler.lock = NativeRLock()  # only the listener thread uses these handlers from now on
+        root.removeHandler(handler)
+    log_queue = NativeSimpleQueue()
+    _listener = NativeQueueListener(log_queue, *writers, respect_handler_level=True)
+    root.addHandler(DeferredQueueHandler(log_queue))
+    _listener.start()
+    atexit.register(stop_queue_logging)  # drain the queue before the process exits
+
+
+def stop_queue_logging():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def on_init(environment, **kwargs):
+    start_queue_logging()  # Locust configures its handlers after importing the locustfile
+
+
+def on_test_stop(environment, **kwargs):
+    if event_log.profile == "perf":
+        event_log.log_summary()
+
+
+events.init.add_listener(on_init)
+events.test_stop.add_listener(on_test_stop)
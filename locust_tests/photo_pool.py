@@ -0,0 +1,48 @@
+import os
+import random
+import logging
+
+PHOTOS_DIR = os.path.join(os.path.dirname(__file__), "profile_photos")
+PHOTO_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+class PhotoPool:
+    """Profile photos preloaded into memory once and shared by all simulated users.
+
+    For every photo the pool keeps the list of *other* photos, so picking a
+    photo different from a user's current one is a single random choice with
+    no retries and no filesystem access.
+    """
+
+    def __init__(self, photos_dir=PHOTOS_DIR):
+        self.photos_dir = photos_dir
+        self.names = []
+        self.payloads = {}  # name -> bytes
+        self.alternatives = {}  # name -> names of every other photo
+
+    def load(self):
+        """Read every photo into memory. Raises FileNotFoundError if none are available."""
+        if not os.path.exists(self.photos_dir):
+            raise FileNotFoundError(f"❌ ERROR: Profile photos directory not found at {self.photos_dir}")
+
+        names = sorted(f for f in os.listdir(self.photos_dir) if f.endswith(PHOTO_EXTENSIONS))
+        if not names:
+            raise FileNotFoundError("❌ ERROR: No profile photos found in the directory!")
+
+        for name in names:
+            with open(os.path.join(self.photos_dir, name), "rb") as f:
+                self.payloads[name] = f.read()
+        self.names = names
+        self.alternatives = {name: [other for other in names if other != name] or names for name in names}
+
+        logging.info(f"🖼️ PHOTO POOL: {len(names)} photos preloaded ({sum(map(len, self.payloads.values()))} bytes)")
+        return self
+
+    def next_photo(self, current_photo, rng=random):
+        """Return ``(name, payload)`` for a photo different from ``current_photo``."""
+        name = rng.choice(self.alternatives.get(current_photo, self.names))
+        return name, self.payloads[name]
+
+
+# Shared pool, filled once at events.init
+photo_pool = PhotoPool()
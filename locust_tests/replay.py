@@ -0,0 +1,149 @@
+"""
+Streaming traffic replay
+------------------------
+Reads a JSONL trace captured by the Mock API (`CAPTURE_TRACE_FILE`, one request per
+line with its start time `t` in seconds) and hands the records to simulated users at
+their original inter-arrival times, scaled by `REPLAY_SPEED` (2 = twice as fast,
+0 = as fast as possible).
+
+The capture writes each line when its request completes, so lines can be out of
+`t` order by up to a request's duration. Records are buffered for
+`REPLAY_REORDER_WINDOW` seconds of trace time and scheduled in `t` order; traces
+sorted with `python capture.py <trace>` need no reordering.
+
+The trace is streamed line by line (`.gz` files are decompressed on the fly), so
+memory does not grow with its length. In a distributed run, worker k of N only
+reads lines k, k + N, k + 2N, ... (the same partition as partitioning.py), and all
+workers share one timeline, so together they replay the whole trace once.
+"""
+
+from locust import events
+from config import REPLAY_TRACE_FILE, REPLAY_SPEED, REPLAY_LOOP, REPLAY_REORDER_WINDOW
+from partitioning import user_partitioner
+import gevent
+import gzip
+import heapq
+import itertools
+import json
+import logging
+import time
+
+LATE_AFTER = 0.05  # seconds behind schedule before a request counts as late
+
+
+def open_trace(path):
+    return gzip.open(path, "rt") if path.endswith(".gz") else open(path, "r")
+
+
+def iter_trace(path, shard=0, shards=1):
+    """Yield this shard's records from a JSONL trace, one line at a time."""
+    with open_trace(path) as f:
+        for line in itertools.islice(f, shard, None, shards):
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def reorder(records, window):
+    """Yield ``records`` sorted by ``t``, given that none is more than ``window`` seconds out of place."""
+    heap = []
+    newest = float("-inf")
+    for seq, record in enumerate(records):
+        heapq.heappush(heap, (record["t"], seq, record))
+        newest = max(newest, record["t"])
+        while heap[0][0] <= newest - window:
+            yield heapq.heappop(heap)[2]
+    while heap:
+        yield heapq.heappop(heap)[2]
+
+
+def trace_origin(path, window):
+    """Earliest ``t`` in the trace: the minimum over its first ``window`` seconds, the same for every shard."""
+    origin = None
+    for record in iter_trace(path):
+        if origin is not None and record["t"] > origin + window:
+            break
+        origin = record["t"] if origin is None else min(origin, record["t"])
+    return origin
+
+
+class TraceFeed:
+    """Hands out trace records once they are due. Shared by every simulated user in the process."""
+
+    def __init__(self, path, speed=1.0, loop=False, shard=0, shards=1, reorder_window=5.0,
+                 clock=time.monotonic, sleep=gevent.sleep):
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.shard = shard
+        self.shards = shards
+        self.reorder_window = reorder_window
+        self._clock = clock
+        self._sleep = sleep
+        self._records = self._open()
+        self._origin = trace_origin(path, reorder_window) or 0.0
+        self._start = None
+        self._offset = 0.0  # added to ``t`` on each pass when looping
+        self._max_t = self._origin
+        self.sent = 0
+        self.late = 0
+        self.max_lag = 0.0
+
+    def next(self):
+        """Return the next record after waiting until it is due, or None once the trace is exhausted."""
+        record = next(self._records, None)
+        if record is None and self.loop and self.sent:
+            self._offset += self._max_t - self._origin  # the next pass starts where this one's latest request did
+            self._records = self._open()
+            record = next(self._records, None)
+        if record is None:
+            return None
+
+        self._max_t = max(self._max_t, record["t"])
+        if self._start is None:
+            self._start = self._clock()
+        if self.speed > 0:
+            due = max(0.0, record["t"] - self._origin) + self._offset
+            delay = self._start + due / self.speed - self._clock()
+            if delay > 0:
+                self._sleep(delay)
+            elif -delay > LATE_AFTER:
+                self.late += 1
+                self.max_lag = max(self.max_lag, -delay)
+        self.sent += 1
+        return record
+
+    def _open(self):
+        return reorder(iter_trace(self.path, self.shard, self.shards), self.reorder_window)
+
+
+_feed = None
+
+
+def trace_feed():
+    """The process-wide feed for this worker's shard, opened on first use."""
+    global _feed
+    if _feed is None:
+        _feed = TraceFeed(REPLAY_TRACE_FILE, speed=REPLAY_SPEED, loop=REPLAY_LOOP,
+                          shard=user_partitioner.offset, shards=user_partitioner.stride,
+                          reorder_window=REPLAY_REORDER_WINDOW)
+        logging.info(f"🎬 REPLAYING {REPLAY_TRACE_FILE} (shard {_feed.shard + 1}/{_feed.shards}, "
+                     f"speed {'max' if REPLAY_SPEED <= 0 else REPLAY_SPEED})")
+    return _feed
+
+
+def on_test_start(environment, **kwargs):
+    global _feed
+    _feed = None  # a new run replays from the start
+
+
+def on_test_stop(environment, **kwargs):
+    if _feed is not None:
+        logging.info(f"🎬 REPLAY DONE: {_feed.sent} requests, {_feed.late} late "
+                     f"(max {_feed.max_lag * 1000:.0f} ms behind schedule)")
+        if _feed.late:
+            logging.warning("⚠️ Requests fell behind the trace's schedule; add users to keep up")
+
+
+events.test_start.add_listener(on_test_start)
+events.test_stop.add_listener(on_test_stop)
@@ -1,94 +1,131 @@
 import random
 import os
 import logging
+import requests
+from config import ENDPOINTS
+from mutations import booking_mutator
+from perf_logging import log_event
 
 logging.basicConfig(level=logging.INFO)
 
 
-def get_random_user(users):
+def get_random_user(users, rng=random):
     """Fetch a random user from the dataset."""
-    return random.choice(users) if users else None
+    return rng.choice(users) if users else None
 
 
-def get_random_booking(bookings):
+def get_random_booking(bookings, rng=random):
     """Fetch a random booking from the dataset."""
-    return random.choice(bookings) if bookings else None
-
-
-def modify_booking(booking):
-    """Modify at least one booking field while keeping the ID unchanged."""
-    fields_to_update = ["firstname", "lastname", "totalprice", "depositpaid", "checkin", "checkout", "additionalneeds"]
-    field_to_modify = random.choice(fields_to_update)
-    original_value = booking[field_to_modify]
-
-    if field_to_modify == "firstname":
-        booking["firstname"] = random.choice(["Alice", "Bob", "Charlie", "David"])
-    elif field_to_modify == "lastname":
-        booking["lastname"] = random.choice(["Johnson", "Williams", "Brown", "Davis"])
-    elif field_to_modify == "totalprice":
-        booking["totalprice"] = random.randint(100, 1000)
-    elif field_to_modify == "depositpaid":
-        booking["depositpaid"] = not booking["depositpaid"]
-    elif field_to_modify == "checkin":
-        booking["checkin"] = f"2025-01-{random.randint(1, 28):02d}"
-    elif field_to_modify == "checkout":
-        booking["checkout"] = f"2025-02-{random.randint(1, 28):02d}"
-    elif field_to_modify == "additionalneeds":
-        booking["additionalneeds"] = random.choice(["Breakfast", "Lunch", "Dinner", "None"])
-
-    if booking[field_to_modify] != original_value:
-        return field_to_modify, booking[field_to_modify]
-    else:
-        return modify_booking(booking)  # recall the function to ensure a change.
+    return rng.choice(bookings) if bookings else None
+
+
+def modify_booking(booking, rng=random):
+    """Modify at least one booking field while keeping the ID unchanged.
+
+    Pass a seeded ``random.Random`` as ``rng`` for a reproducible sequence of changes.
+    """
+    return booking_mutator.mutate(booking, rng)
+
+
+class LazyToken:
+    """Defers decoding the auth response until the log line is actually formatted"""
+
+    def __init__(self, response):
+        self.response = response
+
+    def __str__(self):
+        return self.response.json().get("token", "")
+
+
+class LazyUploadStats:
+    """Defers decoding the upload stats in a profile update response until formatted"""
+
+    def __init__(self, response):
+        self.response = response
+
+    def __str__(self):
+        upload = self.response.json()
+        if "bytes_per_sec" not in upload:
+            return ""
+        return f"\n UPLOAD: {upload['upload_bytes']} bytes in {upload['upload_ms']} ms ({upload['bytes_per_sec']} bytes/sec)"
 
 
 def log_booking_update(booking_id, field_updated, new_value, response):
     """Logs booking update details"""
     if response.status_code == 200:
-        logging.info(f"✅ UPDATED BOOKING {booking_id} - {field_updated}: {new_value}")
+        log_event("booking_update", logging.INFO, "✅ UPDATED BOOKING %s - %s: %s", booking_id, field_updated, new_value)
     elif response.status_code == 404:
-        logging.warning(f"⚠️ Booking ID {booking_id} not found.")
+        log_event("booking_not_found", logging.WARNING, "⚠️ Booking ID %s not found.", booking_id)
     else:
-        logging.error(f"❌ ERROR {response.status_code}: {response.text}")
+        log_event("booking_update_error", logging.ERROR, "❌ ERROR %s: %s", response.status_code, response.text)
 
 
 def log_auth_response(username, response):
     """Logs authentication attempts"""
     if response.status_code == 200:
-        token = response.json().get("token", "")
-        logging.info(f"✅ AUTH SUCCESS: User '{username}' authenticated. Token: {token}")
+        log_event("auth_success", logging.INFO, "✅ AUTH SUCCESS: User '%s' authenticated. Token: %s",
+                  username, LazyToken(response))
     else:
-        logging.error(f"❌ AUTH FAILURE: {response.status_code} - {response.text}")
+        log_event("auth_failure", logging.ERROR, "❌ AUTH FAILURE: %s - %s", response.status_code, response.text)
 
 
 def log_profile_update(user_id, old_email, new_email, old_photo, new_photo, response):
     """Log profile update details"""
     if response.status_code == 200:
-        logging.info(f"📸 PROFILE UPDATED: ID {user_id}")
-        logging.info(f" OLD EMAIL: {old_email} ➡️ NEW EMAIL: {new_email}")
-        logging.info(f" OLD PHOTO: {old_photo} ➡️ NEW PHOTO: {new_photo}")
+        log_event("profile_update", logging.INFO,
+                  "📸 PROFILE UPDATED: ID %s\n OLD EMAIL: %s ➡️ NEW EMAIL: %s\n OLD PHOTO: %s ➡️ NEW PHOTO: %s%s",
+                  user_id, old_email, new_email, old_photo, new_photo, LazyUploadStats(response))
     else:
-        logging.error(f"❌ PROFILE UPDATE FAILED: ID {user_id} - Status {response.status_code} - {response.text}")
+        log_event("profile_update_error", logging.ERROR, "❌ PROFILE UPDATE FAILED: ID %s - Status %s - %s",
+                  user_id, response.status_code, response.text)
 
 
-def generate_random_email():
+def generate_random_email(rng=random):
     """Generate a random email address"""
     domains = ["example.com", "test.com", "sample.org"]
-    name = ''.join(random.choices('abcdefghijklmnopqrstuvwxyz', k=7))
-    domain = random.choice(domains)
+    name = ''.join(rng.choices('abcdefghijklmnopqrstuvwxyz', k=7))
+    domain = rng.choice(domains)
     return f"{name}@{domain}"
 
 
-def select_random_photo():
+def select_random_photo(rng=random):
     """Select a random profile photo from the available options"""
     photos_dir = os.path.join(os.path.dirname(__file__), "profile_photos")
 
     if not os.path.exists(photos_dir):
         raise FileNotFoundError(f"❌ ERROR: Profile photos directory not found at {photos_dir}")
 
-    photos = [f for f in os.listdir(photos_dir) if f.endswith(('.jpg', '.jpeg', '.png'))]
+    photos = sorted(f for f in os.listdir(photos_dir) if f.endswith(('.jpg', '.jpeg', '.png')))
 
     if not photos:
         raise FileNotFoundError("❌ ERROR: No profile photos found in the directory!")
 
-    return os.path.join(photos_dir, random.choice(photos)), random.choice(photos)
+    return os.path.join(photos_dir, rng.choice(photos)), rng.choice(photos)
+
+
+def fetch_cache_stats(host):
+    """Fetch booking cache counters from the API, or None if unavailable"""
+    try:
+        response = requests.get(f"{host}{ENDPOINTS['booking_cache_stats']}", timeout=5)
+        response.raise_for_status()
+        return response.json()
+    except requests.RequestException as e:
+        logging.error(f"❌ ERROR: Could not fetch booking cache stats - {e}")
+        return None
+
+
+def log_cache_hit_ratio(before, after, min_ratio=None):
+    """Log the cache-hit ratio observed between two stats snapshots"""
+    if before is None or after is None:
+        return None
+
+    hits = after["hits"] - before["hits"]
+    misses = after["misses"] - before["misses"]
+    evictions = after["evictions"] - before["evictions"]
+    lookups = hits + misses
+    hit_ratio = hits / lookups if lookups else 0.0
+
+    logging.info(f"📊 CACHE STATS: {hits} hits, {misses} misses, {evictions} evictions - hit ratio {hit_ratio:.2%}")
+    if min_ratio is not None and hit_ratio < min_ratio:
+        logging.warning(f"⚠️ Cache-hit ratio {hit_ratio:.2%} is below the expected {min_ratio:.2%}")
+    return hit_ratio
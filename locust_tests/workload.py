@@ -0,0 +1,105 @@
+"""
+Seeded, reproducible workload generation
+----------------------------------------
+Every simulated user gets its own `random.Random(f"{run_seed}:{user_index}")`, so the
+sequence of changes it sends depends only on the run seed and its index, never on
+timing or on what other users did. Two runs with the same `RUN_SEED` therefore
+send byte-identical request streams (user indexes are also stable across
+distributed workers, see partitioning.py).
+
+With `WORKLOAD_PREGENERATE=N` each stream encodes its next N requests in one go
+and the task just pops the next ready-made body: no RNG calls and no JSON
+encoding per request. Batches are drawn from the same generator, so the stream is
+identical whether or not it is pre-generated.
+"""
+
+from collections import deque
+from locust import events
+from config import RUN_SEED, WORKLOAD_PREGENERATE
+from photo_pool import photo_pool
+from utils import modify_booking, generate_random_email
+from urllib3 import encode_multipart_formdata
+import json
+import logging
+import random
+
+run_seed = int(RUN_SEED) if RUN_SEED is not None else random.randrange(2 ** 32)
+
+
+def user_rng(user_index, seed=None):
+    """Independent RNG for one simulated user, derived from the run seed and its index."""
+    return random.Random(f"{run_seed if seed is None else seed}:{user_index}")
+
+
+class RequestStream:
+    """Deterministic per-user request stream, optionally pre-generated in batches."""
+
+    def __init__(self, rng, batch_size=WORKLOAD_PREGENERATE):
+        self.rng = rng
+        self.batch_size = batch_size
+        self._buffer = deque()
+
+    def next(self):
+        if self.batch_size <= 0:
+            return self._generate()
+        if not self._buffer:
+            self._buffer.extend(self._generate() for _ in range(self.batch_size))
+        return self._buffer.popleft()
+
+    def _generate(self):
+        raise NotImplementedError
+
+
+class BookingUpdateStream(RequestStream):
+    """Yields ``(field, new_value, body)`` for successive updates of one booking.
+
+    ``body`` is the full booking already encoded as JSON bytes. The stream keeps
+    its own copy of the booking, so the shared dataset is never touched.
+    """
+
+    def __init__(self, booking, rng, batch_size=WORKLOAD_PREGENERATE):
+        super().__init__(rng, batch_size)
+        self.booking = dict(booking)
+
+    def _generate(self):
+        field, value = modify_booking(self.booking, self.rng)
+        return field, value, json.dumps(self.booking).encode("utf-8")
+
+
+class ProfileUpdateStream(RequestStream):
+    """Yields ``(email, photo_name, body, content_type)`` for successive profile updates of one user.
+
+    ``body`` is the complete multipart/form-data payload. Its boundary is drawn
+    from the seeded RNG (HTTP clients pick a random one), which keeps uploads
+    byte-identical between runs. Pre-generated batches only hold the email, the
+    photo name and the multipart text around the photo; the body is joined
+    around the shared ``photo_pool`` buffer when it is taken.
+    """
+
+    def __init__(self, user, rng, batch_size=WORKLOAD_PREGENERATE):
+        super().__init__(rng, batch_size)
+        self.photo = user.get("profile_photo", "None")
+
+    def next(self):
+        email, photo, head, tail, content_type = super().next()
+        return email, photo, b"".join((head, photo_pool.payloads[photo], tail)), content_type
+
+    def _generate(self):
+        email = generate_random_email(self.rng)
+        self.photo, _ = photo_pool.next_photo(self.photo, self.rng)
+        boundary = f"{self.rng.getrandbits(128):032x}"
+        # Encode with an empty photo: everything after the (empty) photo part is the closing boundary
+        envelope, content_type = encode_multipart_formdata(
+            {"email": email, "profile_photo": (self.photo, b"", "image/jpeg")},
+            boundary=boundary,
+        )
+        tail = f"\r\n--{boundary}--\r\n".encode("latin-1")
+        return email, self.photo, envelope[:-len(tail)], tail, content_type
+
+
+def on_test_start(environment, **kwargs):
+    hint = "" if RUN_SEED is not None else " (set RUN_SEED to reproduce this run)"
+    logging.info(f"🎲 RUN SEED: {run_seed}{hint}")
+
+
+events.test_start.add_listener(on_test_start)
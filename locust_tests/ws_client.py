@@ -0,0 +1,170 @@
+"""
+Gevent-cooperative, pipelined WebSocket client for Locust
+---------------------------------------------------------
+Each `PipelinedWebSocket` owns one connection plus a reader greenlet. Pings carry
+a sequence number, so many can be in flight at once and each echo is matched to
+its ping and timed with `time.perf_counter`. A dropped connection fails its
+in-flight pings, is closed and is re-established with exponential backoff and
+jitter; so is a connection whose first attempt failed.
+
+Locust monkey-patches sockets for gevent, so a blocked `recv` only parks its own
+greenlet; one worker can hold thousands of sockets (raise `ulimit -n` to match).
+"""
+
+import itertools
+import json
+import logging
+import random
+import time
+
+import gevent
+import websocket
+
+from perf_logging import log_event
+
+ECHO_PREFIX = "Echo: "
+
+
+class PipelinedWebSocket:
+    """One multiplexed WebSocket connection that reports to Locust's request event."""
+
+    def __init__(self, url, environment, name="send_message", connect_timeout=10.0,
+                 initial_backoff=0.5, max_backoff=30.0):
+        self.url = url
+        self.environment = environment
+        self.name = name
+        self.connect_timeout = connect_timeout
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+
+        self.ws = None
+        self.pending = {}  # seq -> perf_counter() at send
+        self._seq = itertools.count()
+        self._reader = None
+        self._closed = False
+
+    @property
+    def connected(self):
+        return self.ws is not None and self.ws.connected
+
+    def connect(self):
+        """Open the connection (once) and start the reader greenlet.
+
+        Returns whether the first attempt succeeded. A failure is reported as a
+        failed ``connect`` request, and the reader keeps retrying with backoff.
+        """
+        start = time.perf_counter()
+        try:
+            self.ws = self._open()
+        except Exception as e:
+            self._fire("connect", start, 0, e)
+            log_event("ws_connect_error", logging.ERROR, "❌ CONNECTION ERROR: %s", e)
+        else:
+            self._fire("connect", start, 0)
+        if self._reader is None:
+            self._reader = gevent.spawn(self._read_loop)
+        return self.ws is not None
+
+    def ping(self, payload, count=1):
+        """Send ``count`` pings back to back without waiting for their echoes."""
+        for _ in range(count):
+            seq = next(self._seq)
+            message = json.dumps({**payload, "seq": seq})
+            self.pending[seq] = time.perf_counter()
+            try:
+                self.ws.send(message)
+            except Exception as e:
+                start = self.pending.pop(seq)
+                self._fire(self.name, start, 0, e)
+                return
+
+    def expire(self, timeout):
+        """Fail pings that have waited longer than ``timeout`` seconds for their echo."""
+        deadline = time.perf_counter() - timeout
+        for seq, start in list(self.pending.items()):
+            if start < deadline and self.pending.pop(seq, None) is not None:
+                self._fire(self.name, start, 0, TimeoutError(f"No echo within {timeout}s"))
+
+    def close(self):
+        self._closed = True
+        if self._reader is not None:
+            self._reader.kill(block=False)
+            self._reader = None
+        self._close_socket()
+
+    def _open(self):
+        ws = websocket.create_connection(self.url, timeout=self.connect_timeout)
+        ws.settimeout(None)
+        return ws
+
+    def _close_socket(self):
+        ws, self.ws = self.ws, None
+        if ws is not None:
+            try:
+                ws.close(timeout=0)  # the peer may be gone; do not wait for its close frame
+            except Exception:
+                pass
+
+    def _read_loop(self):
+        while not self._closed:
+            if self.ws is None:
+                self._reconnect()
+                continue
+            try:
+                response = self.ws.recv()
+            except Exception as e:
+                if self._closed:
+                    return
+                log_event("ws_connection_lost", logging.WARNING, "⚠️ WebSocket connection lost: %s", e)
+                self._fail_pending(e)
+                self._close_socket()
+                continue
+            self._on_message(response)
+
+    def _on_message(self, response):
+        received = time.perf_counter()
+        try:
+            seq = json.loads(response[len(ECHO_PREFIX):])["seq"] if response.startswith(ECHO_PREFIX) else None
+        except (ValueError, KeyError, TypeError):
+            seq = None
+
+        start = self.pending.pop(seq, None)
+        if start is None:
+            return  # not an echo of one of our pings (e.g. a broadcast), or already timed out
+
+        log_event("ws_message", logging.INFO, "📩 ECHO RECEIVED: %s", response)
+        self.environment.events.request.fire(
+            request_type="WebSocket",
+            name=self.name,
+            response_time=(received - start) * 1000,
+            response_length=len(response),
+            exception=None,
+        )
+
+    def _fail_pending(self, exception):
+        pending, self.pending = self.pending, {}
+        for start in pending.values():
+            self._fire(self.name, start, 0, exception)
+
+    def _reconnect(self):
+        backoff = self.initial_backoff
+        while not self._closed:
+            gevent.sleep(backoff * random.uniform(0.5, 1.0))
+            start = time.perf_counter()
+            try:
+                self.ws = self._open()
+                self._fire("reconnect", start, 0)
+                return
+            except Exception as e:
+                self._fire("reconnect", start, 0, e)
+                log_event("ws_reconnect_error", logging.WARNING, "⚠️ WebSocket reconnect failed: %s", e)
+                backoff = min(backoff * 2, self.max_backoff)
+
+    def _fire(self, name, start, length, exception=None):
+        self.environment.events.request.fire(
+            request_type="WebSocket",
+            name=name,
+            response_time=(time.perf_counter() - start) * 1000,
+            response_length=length,
+            exception=exception,
+        )
@@ -1,119 +1,265 @@
-from fastapi import FastAPI, HTTPException, Body, Request, UploadFile, File, WebSocket, WebSocketDisconnect
-import json
+from fastapi import (FastAPI, HTTPException, Body, Request, UploadFile, File, WebSocket, WebSocketDisconnect, Depends,
+                     Header, Response)
 import os
+import json
 import threading
-from typing import Dict
 import tempfile
 import shutil
-import uuid
+import asyncio
 import atexit
 import logging
-
-# Configure logging
+import time
+from contextlib import asynccontextmanager
+from starlette.concurrency import run_in_threadpool
+
+try:
+    from . import metrics, settings
+    from .cache import LRUCache
+    from .capture import TraceCaptureMiddleware
+    from .perf_logging import event_log, log_event, start_queue_logging, stop_queue_logging
+    from .sqlite_store import CacheInvalidationBus
+    from .storage import create_engine
+    from .tokens import InvalidToken, PasswordChecker, TokenService
+    from .uploads import UploadStore
+    from .ws_hub import WebSocketHub
+except ImportError:  # started from inside mock_api/ as `uvicorn api:app`
+    import metrics
+    import settings
+    from cache import LRUCache
+    from capture import TraceCaptureMiddleware
+    from perf_logging import event_log, log_event, start_queue_logging, stop_queue_logging
+    from sqlite_store import CacheInvalidationBus
+    from storage import create_engine
+    from tokens import InvalidToken, PasswordChecker, TokenService
+    from uploads import UploadStore
+    from ws_hub import WebSocketHub
+
+# Configure logging (handlers run on a QueueListener thread, off the event loop)
 logging.basicConfig(level=logging.INFO)
-
-app = FastAPI()
+start_queue_logging()
 
 # Define the path for the data file
-DATA_FILE = os.path.join(os.path.dirname(__file__), "data.json")
+DATA_FILE = settings.DATA_FILE
+
+# asyncio lock to handle concurrent updates safely without blocking the event loop
+# (instrumented with wait/hold times when metrics are enabled)
+data_lock = metrics.InstrumentedLock() if settings.METRICS_ENABLED else asyncio.Lock()
 
-# Thread lock to handle concurrent updates safely
-data_lock = threading.Lock()
+# Guards the one-off load of data.json (may run in a worker thread)
+load_lock = threading.Lock()
 
-# In-memory cache
-booking_cache: Dict[int, dict] = {}
+# In-memory booking cache (bounded LRU with TTL)
+booking_cache = LRUCache(max_entries=settings.BOOKING_CACHE_MAX_ENTRIES, ttl=settings.BOOKING_CACHE_TTL)
 
 # Temporary upload directory
 temp_upload_dir = tempfile.mkdtemp(prefix="upload_")
 logging.info(f"Temporary upload directory: {temp_upload_dir}")
 
+# Content-addressed upload sink (disk / memory / discard)
+upload_store = UploadStore(temp_upload_dir, mode=settings.UPLOAD_MODE, chunk_size=settings.UPLOAD_CHUNK_SIZE)
+
+# Signed bearer tokens with a verified-token cache, and the /auth password check
+token_service = TokenService(settings.TOKEN_SECRET, ttl=settings.TOKEN_TTL,
+                             cache_max_entries=settings.TOKEN_CACHE_MAX_ENTRIES)
+password_checker = PasswordChecker(settings.PASSWORD_HASH, iterations=settings.PBKDF2_ITERATIONS)
+
+# Metrics series resolved once, so recording on the hot path is a plain observe()
+metrics.registry.register(metrics.CacheCollector("mock_api_cache", {"booking": booking_cache, "token": token_service.cache}))
+booking_lookup_seconds = metrics.store_read_seconds.labels("get_booking")
+user_lookup_seconds = metrics.store_read_seconds.labels("find_user")
+upload_io_seconds = metrics.file_io_seconds.labels("upload")
+loop_lag_monitor = metrics.LoopLagMonitor(settings.METRICS_LOOP_LAG_INTERVAL)
+
+# Pluggable storage: in-memory dicts with write-behind persistence, or a SQLite database
+engine = create_engine(settings)
+store = engine.store
+
+# In multi-worker mode every worker relays booking-cache invalidations through the shared database
+invalidation_bus = None
+if settings.SHARED_STATE:
+    invalidation_bus = CacheInvalidationBus(settings.DB_FILE, booking_cache,
+                                            poll_interval=settings.INVALIDATION_POLL_INTERVAL)
+
+
+def get_store():
+    """Return the data store, loading data.json on first use"""
+    if not store.loaded:
+        with load_lock:
+            if not store.loaded:
+                started = time.perf_counter()
+                try:
+                    engine.open()
+                except FileNotFoundError:
+                    raise HTTPException(status_code=500, detail="Data file not found")
+                if invalidation_bus is not None:
+                    invalidation_bus.start()
+                    atexit.register(invalidation_bus.stop)
+                metrics.data_load_seconds.set(time.perf_counter() - started)
+                logging.info(f"📦 DATA LOADED ({engine.name}): {engine.describe()}")
+    return store
+
+
+async def run_mutation(func, *args):
+    """Run a write; engines whose writes may wait on another transaction run them off the event loop"""
+    if engine.blocking_writes:
+        return await run_in_threadpool(func, *args)
+    return func(*args)
+
+
+async def run_read(func, *args):
+    """Run a store lookup; engines whose reads can block (SQLite) run them off the event loop"""
+    if engine.blocking_reads:
+        return await run_in_threadpool(func, *args)
+    return func(*args)
+
+
+def invalidate_booking(booking_id=None):
+    """Drop a booking (or every booking) from this worker's cache and, in shared mode, from every worker's"""
+    if booking_id is None:
+        booking_cache.clear()
+    else:
+        booking_cache.pop(booking_id)
+    if invalidation_bus is not None:
+        invalidation_bus.publish(booking_id)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load data.json once at startup instead of on every request"""
+    try:
+        await run_in_threadpool(get_store)
+    except HTTPException:
+        logging.error(f"❌ ERROR: Data file not found at {DATA_FILE}")
+    if settings.METRICS_ENABLED:
+        loop_lag_monitor.start()
+    yield
+    await loop_lag_monitor.stop()
+    # Flush pending changes (memory engine) on shutdown
+    await run_in_threadpool(engine.close)
+    if invalidation_bus is not None:
+        await run_in_threadpool(invalidation_bus.stop)
+    if event_log.profile == "perf":
+        event_log.log_summary()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+def token_user(authorization):
+    """Username behind a valid bearer token, or None"""
+    if not authorization or not authorization.startswith("Bearer "):
+        return None
+    try:
+        return token_service.verify(authorization[len("Bearer "):])["sub"]
+    except InvalidToken:
+        return None
 
-# Load data function
-def load_data():
-    """Load data from data.json"""
-    if not os.path.exists(DATA_FILE):
-        raise HTTPException(status_code=500, detail="Data file not found")
 
-    with open(DATA_FILE, "r") as f:
-        return json.load(f)
+# Per-route latency and status counts for /metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware, routes=app.routes)
 
+# Record production-shaped traffic for replay
+if settings.CAPTURE_TRACE_FILE:
+    app.add_middleware(TraceCaptureMiddleware, trace_file=settings.CAPTURE_TRACE_FILE, resolve_user=token_user)
 
-# Save data function
-def save_data(data):
-    """Save data to data.json"""
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+
+async def require_token(authorization: str = Header(None)):
+    """Reject requests without a valid ``Authorization: Bearer <token>`` header"""
+    if not authorization or not authorization.startswith("Bearer "):
+        log_event("token_missing", logging.WARNING, "🔒 UNAUTHORIZED: Missing bearer token")
+        raise HTTPException(status_code=401, detail="Missing bearer token")
+    try:
+        return token_service.verify(authorization[len("Bearer "):])
+    except InvalidToken as e:
+        log_event("token_invalid", logging.WARNING, "🔒 UNAUTHORIZED: %s", e)
+        raise HTTPException(status_code=401, detail=str(e))
 
 
 @app.post("/auth")
 async def authenticate_user(request: Request, username: str = Body(...), password: str = Body(...)):
     """Mock authentication endpoint with detailed logging"""
-    data = load_data()
+    data = get_store()
+
+    log_event("auth_request", logging.INFO, "🔹 AUTH REQUEST: Username: %s, Password: %s", username, password)
+
+    started = time.perf_counter()
+    user = await run_read(data.find_user, username)
+    user_lookup_seconds.observe(time.perf_counter() - started)
+    if user is None:
+        valid = False
+    elif password_checker.mode == "plain":
+        valid = password_checker.check(user, password)
+    else:
+        # Key stretching is CPU-bound; keep it off the event loop
+        valid = await run_in_threadpool(password_checker.check, user, password)
+
+    if valid:
+        token = token_service.issue(username)
+        log_event("auth_success", logging.INFO, "✅ AUTH SUCCESS: User '%s' authenticated. Token: %s", username, token)
+        return {"token": token}
+
+    log_event("auth_failure", logging.ERROR, "❌ AUTH FAILURE: Invalid credentials for user '%s'", username)
+    raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    logging.info(f"🔹 AUTH REQUEST: Username: {username}, Password: {password}")
 
-    for user in data["users"]:
-        if user["username"] == username and user["password"] == password:
-            token = f"fake-token-{username}"
-            logging.info(f"✅ AUTH SUCCESS: User '{username}' authenticated. Token: {token}")
-            return {"token": token}
+@app.put("/update-profile/{user_id}", dependencies=[Depends(require_token)])
+async def update_profile(user_id: int, email: str = Body(...), profile_photo: UploadFile = File(...)):
+    """Update user email and profile photo, streaming the photo into the upload sink."""
+    data = get_store()
 
-    logging.error(f"❌ AUTH FAILURE: Invalid credentials for user '{username}'")
-    raise HTTPException(status_code=401, detail="Invalid credentials")
+    user = await run_read(data.get_user, user_id)
+    if user is None:
+        log_event("user_not_found", logging.ERROR, "❌ ERROR: User ID %s not found", user_id)
+        raise HTTPException(status_code=404, detail="User not found")
 
+    old_email = user["email"]
+    old_photo = user.get("profile_photo", "None")
 
-@app.put("/update-profile/{user_id}")
-async def update_profile(user_id: int, email: str = Body(...), profile_photo: UploadFile = File(...)):
-    """Update user email and profile photo, saving to temp dir."""
-    data = load_data()
+    try:
+        if upload_store.mode == "disk" and not os.path.exists(temp_upload_dir):
+            logging.error(f"Temporary directory does not exist: {temp_upload_dir}")
+            raise HTTPException(status_code=500, detail="Temporary directory not found")
+
+        file_extension = os.path.splitext(profile_photo.filename)[1]
+
+        # One thread-pool hop for the whole streamed copy instead of blocking writes on the event loop
+        upload = await run_in_threadpool(upload_store.save, profile_photo.file, file_extension)
+        upload_io_seconds.observe(upload["elapsed"])
+        stored_filename = upload["filename"]
+        bytes_per_sec = round(upload["bytes"] / upload["elapsed"]) if upload["elapsed"] else 0
+
+        async with data_lock:
+            await run_mutation(data.update_user, user_id, {
+                "email": email,
+                "profile_photo": stored_filename  # Store filename
+            })
+
+        log_event("profile_update", logging.INFO,
+                  "📸 PROFILE UPDATED: ID %s\n OLD EMAIL: %s ➡️ NEW EMAIL: %s\n OLD PHOTO: %s ➡️ NEW PHOTO: %s\n"
+                  "File stored (%s): %s - %s bytes, %s",
+                  user_id, old_email, email, old_photo, stored_filename, upload_store.mode, stored_filename,
+                  upload["bytes"], "deduplicated" if upload["deduplicated"] else "new")
+
+        return {
+            "message": "Profile updated successfully",
+            "user_id": user_id,
+            "new_email": email,
+            "new_profile_photo": stored_filename,
+            "upload_bytes": upload["bytes"],
+            "upload_ms": round(upload["elapsed"] * 1000, 3),
+            "bytes_per_sec": bytes_per_sec
+        }
+
+    except FileNotFoundError as e:
+        logging.error(f"File not found error: {e}")
+        raise HTTPException(status_code=500, detail="File not found")
+    except Exception as e:
+        logging.error(f"Error saving file: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
 
-    for user in data["users"]:
-        if user["id"] == user_id:
-            old_email = user["email"]
-            old_photo = user.get("profile_photo", "None")
 
-            try:
-                if not os.path.exists(temp_upload_dir):
-                    logging.error(f"Temporary directory does not exist: {temp_upload_dir}")
-                    raise HTTPException(status_code=500, detail="Temporary directory not found")
-
-                file_extension = os.path.splitext(profile_photo.filename)[1]
-                unique_filename = f"{uuid.uuid4()}{file_extension}"
-                file_path = os.path.join(temp_upload_dir, unique_filename)
-
-                with open(file_path, "wb") as f:
-                    while contents := await profile_photo.read(1024):
-                        f.write(contents)
-
-                with data_lock:
-                    user["email"] = email
-                    user["profile_photo"] = unique_filename  # Store filename
-                    save_data(data)
-
-                logging.info(f"📸 PROFILE UPDATED: ID {user_id}")
-                logging.info(f" OLD EMAIL: {old_email} ➡️ NEW EMAIL: {email}")
-                logging.info(f" OLD PHOTO: {old_photo} ➡️ NEW PHOTO: {unique_filename}")
-                logging.info(f"File saved to: {file_path}")
-
-                return {
-                    "message": "Profile updated successfully",
-                    "user_id": user_id,
-                    "new_email": email,
-                    "new_profile_photo": unique_filename
-                }
-
-            except FileNotFoundError as e:
-                logging.error(f"File not found error: {e}")
-                raise HTTPException(status_code=500, detail="File not found")
-            except Exception as e:
-                logging.error(f"Error saving file: {e}")
-                raise HTTPException(status_code=500, detail="Internal server error")
-
-    logging.error(f"❌ ERROR: User ID {user_id} not found")
-    raise HTTPException(status_code=404, detail="User not found")
-
-
-@app.put("/booking/{booking_id}")
+@app.put("/booking/{booking_id}", dependencies=[Depends(require_token)])
 async def update_booking(
         booking_id: int,
         firstname: str = Body(...),
@@ -125,106 +271,177 @@ async def update_booking(
         additionalneeds: str = Body(...)
 ):
     """Update an existing booking"""
-    data = load_data()
-    for booking in data["bookings"]:
-        if booking["id"] == booking_id:
-            old_booking = booking.copy()
-
-            with data_lock:
-                booking.update({
-                    "firstname": firstname,
-                    "lastname": lastname,
-                    "totalprice": totalprice,
-                    "depositpaid": depositpaid,
-                    "checkin": checkin,
-                    "checkout": checkout,
-                    "additionalneeds": additionalneeds
-                })
-                save_data(data)
-                # clear cache when booking is updated.
-                booking_cache.pop(booking_id, None)
-
-            logging.info(f"✏️ BOOKING UPDATED: ID {booking_id}")
-            logging.info(f" OLD DATA: {old_booking}")
-            logging.info(f" NEW DATA: {booking}")
-
-            return {"message": "Booking updated"}
-
-    logging.error(f"❌ ERROR: Booking ID {booking_id} not found")
+    data = get_store()
+
+    fields = {
+        "firstname": firstname,
+        "lastname": lastname,
+        "totalprice": totalprice,
+        "depositpaid": depositpaid,
+        "checkin": checkin,
+        "checkout": checkout,
+        "additionalneeds": additionalneeds
+    }
+
+    async with data_lock:
+        old_booking = await run_mutation(data.update_booking, booking_id, fields)
+        if old_booking is not None:
+            # clear cache when booking is updated.
+            await run_mutation(invalidate_booking, booking_id)
+
+    if old_booking is None:
+        log_event("booking_not_found", logging.ERROR, "❌ ERROR: Booking ID %s not found", booking_id)
+        raise HTTPException(status_code=404, detail="Booking not found")
+
+    log_event("booking_update", logging.INFO, "✏️ BOOKING UPDATED: ID %s\n OLD DATA: %s\n NEW DATA: %s",
+              booking_id, old_booking, fields)
+
+    return {"message": "Booking updated"}
+
+
+@app.get("/booking/{booking_id}", dependencies=[Depends(require_token)])
+async def get_booking(booking_id: int, response: Response):
+    """Retrieve a specific booking by ID with caching (``X-Cache: HIT`` or ``MISS`` tells which)"""
+    cached = booking_cache.get(booking_id)
+    if cached is not None:
+        log_event("booking_fetch_cached", logging.INFO, "📄 FETCH BOOKING FROM CACHE: %s", cached)
+        response.headers["X-Cache"] = "HIT"
+        return cached
+
+    response.headers["X-Cache"] = "MISS"
+
+    version = booking_cache.version(booking_id)  # invalidating this booking after this point makes the read stale
+    started = time.perf_counter()
+    booking = await run_read(get_store().get_booking, booking_id)
+    booking_lookup_seconds.observe(time.perf_counter() - started)
+    if booking is not None:
+        booking_cache.put(booking_id, booking, version)
+        log_event("booking_fetch", logging.INFO, "📄 FETCH BOOKING: %s", booking)
+        return booking
+
+    log_event("booking_not_found", logging.ERROR, "❌ ERROR: Booking ID %s not found", booking_id)
     raise HTTPException(status_code=404, detail="Booking not found")
 
 
-@app.get("/booking/{booking_id}")
-async def get_booking(booking_id: int):
-    """Retrieve a specific booking by ID with caching"""
-    if booking_id in booking_cache:
-        logging.info(f"📄 FETCH BOOKING FROM CACHE: {booking_cache[booking_id]}")
-        return booking_cache[booking_id]
-
-    data = load_data()
-    for booking in data["bookings"]:
-        if booking["id"] == booking_id:
-            booking_cache[booking_id] = booking
-            logging.info(f"📄 FETCH BOOKING: {booking}")
-            return booking
+@app.delete("/booking/{booking_id}", dependencies=[Depends(require_token)])
+async def delete_booking(booking_id: int):
+    """Delete a booking by ID"""
+    data = get_store()
 
-    logging.error(f"❌ ERROR: Booking ID {booking_id} not found")
-    raise HTTPException(status_code=404, detail="Booking not found")
+    async with data_lock:
+        deleted = await run_mutation(data.delete_booking, booking_id)
+        if deleted is not None:
+            # clear cache when booking is deleted.
+            await run_mutation(invalidate_booking, booking_id)
 
+    if deleted is None:
+        log_event("booking_not_found", logging.ERROR, "❌ ERROR: Booking ID %s not found", booking_id)
+        raise HTTPException(status_code=404, detail="Booking not found")
 
-@app.delete("/booking/{booking_id}")
-async def delete_booking(booking_id: int):
-    """Delete a booking by ID"""
-    data = load_data()
-    for booking in data["bookings"]:
-        if booking["id"] == booking_id:
-            with data_lock:
-                data["bookings"].remove(booking)
-                save_data(data)
-                # clear cache when booking is deleted.
-                booking_cache.pop(booking_id, None)
-
-            logging.info(f"🗑️ BOOKING DELETED: ID {booking_id}")
-            return {"message": "Booking deleted"}
-
-    logging.error(f"❌ ERROR: Booking ID {booking_id} not found")
-    raise HTTPException(status_code=404, detail="Booking not found")
+    log_event("booking_delete", logging.INFO, "🗑️ BOOKING DELETED: ID %s", booking_id)
+    return {"message": "Booking deleted"}
 
 
 @app.post("/clear-booking-cache")
 async def clear_cache():
     """Clear the booking cache."""
-    booking_cache.clear()
-    logging.info("🗑️ BOOKING CACHE CLEARED")
+    await run_mutation(invalidate_booking)
+    log_event("cache_clear", logging.INFO, "🗑️ BOOKING CACHE CLEARED")
     return {"message": "Booking cache cleared"}
 
 
+@app.get("/booking-cache/stats")
+async def booking_cache_stats():
+    """Booking cache size, hit/miss/eviction counters and hit ratio."""
+    return booking_cache.stats()
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Server-side latency histograms, lock waits, cache counters, file I/O and event-loop lag (Prometheus text)."""
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/token-cache/stats")
+async def token_cache_stats():
+    """Verified-token cache size and hit/miss/eviction counters."""
+    return token_service.cache.stats()
+
+
 # -----------------------
 # ✅ WebSocket Server
 # -----------------------
 
-active_connections = set()  # Keep track of connected WebSocket clients
+# Connections, topic subscriptions and bounded per-client send queues
+ws_hub = WebSocketHub(
+    queue_size=settings.WS_SEND_QUEUE_SIZE,
+    policy=settings.WS_SLOW_CONSUMER_POLICY,
+    ping_interval=settings.WS_PING_INTERVAL,
+)
+
+TOPIC_ACTIONS = ("subscribe", "unsubscribe", "publish")
 
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    """Mock WebSocket Service"""
+    """Mock WebSocket Service
+
+    Plain messages are echoed back. JSON control messages
+    ``{"action": "subscribe" | "unsubscribe", "topic": ...}`` manage topic
+    subscriptions and ``{"action": "publish", "topic": ..., "message": ...}``
+    fans a message out to the topic's subscribers. Control messages without a
+    topic are answered with ``{"type": "error", ...}``.
+    """
     await websocket.accept()
-    active_connections.add(websocket)
-    logging.info(f"🔗 NEW WEBSOCKET CONNECTION: {len(active_connections)} clients connected")
+    connection = ws_hub.register(websocket)
+    log_event("ws_connect", logging.INFO, "🔗 NEW WEBSOCKET CONNECTION: %s clients connected", len(ws_hub.connections))
 
     try:
-        while True:
+        while not connection.closing:
             data = await websocket.receive_text()
-            logging.info(f"📩 MESSAGE RECEIVED: {data}")
+            log_event("ws_message", logging.INFO, "📩 MESSAGE RECEIVED: %s", data)
 
-            # Echo the message back to the sender
-            response = f"Echo: {data}"
-            await websocket.send_text(response)
+            try:
+                message = json.loads(data)
+            except ValueError:
+                message = None
+            action = message.get("action") if isinstance(message, dict) else None
+
+            topic = message.get("topic") if action in TOPIC_ACTIONS else None
+            if action in TOPIC_ACTIONS and (not isinstance(topic, str) or not topic):
+                await connection.send(json.dumps({"type": "error", "action": action, "error": "topic is required"}))
+            elif action == "subscribe":
+                ws_hub.subscribe(connection, topic)
+            elif action == "unsubscribe":
+                ws_hub.unsubscribe(connection, topic)
+            elif action == "publish":
+                text = message.get("message")
+                await ws_hub.broadcast(text if isinstance(text, str) else json.dumps(text), topic)
+            else:
+                # Echo the message back to the sender
+                await connection.send(f"Echo: {data}")
 
     except WebSocketDisconnect:
-        active_connections.remove(websocket)
-        logging.info(f"🔌 CLIENT DISCONNECTED: {len(active_connections)} clients remaining")
+        pass
+    except Exception as e:
+        log_event("ws_error", logging.WARNING, "⚠️ WEBSOCKET ERROR: %s", e)
+    finally:
+        await ws_hub.unregister(connection)
+        log_event("ws_disconnect", logging.INFO, "🔌 CLIENT DISCONNECTED: %s clients remaining", len(ws_hub.connections))
+
+
+@app.post("/ws/broadcast")
+async def websocket_broadcast(message: str = Body(...), topic: str = Body(None)):
+    """Fan a message out to every client, or only to a topic's subscribers."""
+    result = await ws_hub.broadcast(message, topic)
+    log_event("ws_broadcast", logging.INFO, "📣 BROADCAST: %s", result)
+    return result
+
+
+@app.get("/ws/stats")
+async def websocket_stats():
+    """Connection counts, topic sizes, send-queue depths and send latencies."""
+    return ws_hub.stats()
 
 
 # Cleanup function
@@ -0,0 +1,397 @@
+"""
+Endpoint micro-benchmark for the Mock API (no Locust needed)
+------------------------------------------------------------
+Drives the FastAPI app either in-process through its ASGI interface
+(`--transports asgi`, measures the app alone) or over a local uvicorn socket
+(`--transports socket`, adds the HTTP server and network stack), and reports
+ops/sec and p50/p95/p99 latency per endpoint for every dataset size.
+
+Each dataset is generated with `generate_data.py` (fixed seed) into a scratch
+directory, and every (dataset, transport) pair runs in a fresh process so the
+app's settings and in-memory state start clean. Results are written as JSON;
+`compare` diffs two result files and exits non-zero on regressions.
+
+Usage (from `mock_api/`):
+    python benchmark_api.py run --sizes 1000 100000 --output bench.json
+    python benchmark_api.py run --sizes 1000 --baseline bench.json        # run + compare
+    python benchmark_api.py compare bench_old.json bench_new.json --threshold 10
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from generate_data import generate_data
+
+MOCK_API_DIR = os.path.dirname(os.path.abspath(__file__))
+ENDPOINTS = ("auth", "get_booking", "put_booking", "update_profile", "clear_cache", "ws_echo")
+TRANSPORTS = ("asgi", "socket")
+PHOTO = bytes(range(256)) * 128  # 32 KB upload payload
+SERVER_START_TIMEOUT = 60
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def summarize(endpoint, latencies, errors, elapsed):
+    latencies.sort()
+    return {
+        "endpoint": endpoint,
+        "requests": len(latencies),
+        "errors": errors,
+        "ops_per_sec": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+# -----------------------
+# WebSocket clients (one per transport)
+# -----------------------
+
+class ASGIWebSocket:
+    """Minimal in-process WebSocket client speaking the ASGI protocol to the app directly."""
+
+    def __init__(self, app, path="/ws"):
+        self.app = app
+        self.path = path
+
+    async def __aenter__(self):
+        self._inbound = asyncio.Queue()
+        self._outbound = asyncio.Queue()
+        scope = {
+            "type": "websocket", "asgi": {"version": "3.0"}, "scheme": "ws", "http_version": "1.1",
+            "path": self.path, "raw_path": self.path.encode(), "root_path": "", "query_string": b"",
+            "headers": [(b"host", b"mock-api")], "client": ("127.0.0.1", 0), "server": ("mock-api", 80),
+            "subprotocols": [],
+        }
+        self._task = asyncio.create_task(self.app(scope, self._inbound.get, self._outbound.put))
+        await self._inbound.put({"type": "websocket.connect"})
+        message = await self._outbound.get()
+        if message["type"] != "websocket.accept":
+            raise RuntimeError(f"WebSocket rejected: {message}")
+        return self
+
+    async def send(self, text):
+        await self._inbound.put({"type": "websocket.receive", "text": text})
+
+    async def recv(self):
+        message = await self._outbound.get()
+        if message["type"] != "websocket.send":
+            raise RuntimeError(f"WebSocket closed: {message}")
+        return message.get("text")
+
+    async def __aexit__(self, *exc):
+        await self._inbound.put({"type": "websocket.disconnect", "code": 1000})
+        await self._task
+
+
+def socket_websocket(base_url):
+    from websockets.asyncio.client import connect
+    return connect(base_url.replace("http://", "ws://") + "/ws", ping_interval=None)
+
+
+# -----------------------
+# Endpoint drivers
+# -----------------------
+
+async def run_http(client, endpoint, requests, concurrency, num_users, num_bookings, token):
+    auth = {"Authorization": f"Bearer {token}"}
+
+    def send(i):
+        booking_id = i % num_bookings + 1
+        if endpoint == "auth":
+            user_id = i % num_users + 1
+            return client.post("/auth", json={"username": f"user{user_id}", "password": "password"})
+        if endpoint == "get_booking":
+            return client.get(f"/booking/{booking_id}", headers=auth)
+        if endpoint == "put_booking":
+            return client.put(f"/booking/{booking_id}", headers=auth, json={
+                "firstname": "Bench", "lastname": "Mark", "totalprice": 100 + i % 900, "depositpaid": i % 2 == 0,
+                "checkin": "2025-01-01", "checkout": "2025-01-05", "additionalneeds": "None"})
+        if endpoint == "update_profile":
+            return client.put(f"/update-profile/{i % num_users + 1}", headers=auth,
+                              data={"email": f"bench{i}@example.com"},
+                              files={"profile_photo": ("photo.jpg", i.to_bytes(4, "big") + PHOTO, "image/jpeg")})
+        return client.post("/clear-booking-cache")
+
+    latencies = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                response = await send(i)
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(endpoint, latencies, errors, time.perf_counter() - started)
+
+
+async def run_ws_echo(open_websocket, requests, concurrency):
+    latencies = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def connection():
+        nonlocal errors
+        async with open_websocket() as ws:
+            for i in counter:
+                message = f"bench {i}"
+                started = time.perf_counter()
+                await ws.send(message)
+                reply = await ws.recv()
+                latencies.append(time.perf_counter() - started)
+                errors += reply != f"Echo: {message}"
+
+    started = time.perf_counter()
+    await asyncio.gather(*(connection() for _ in range(concurrency)))
+    return summarize("ws_echo", latencies, errors, time.perf_counter() - started)
+
+
+async def run_endpoints(client, open_websocket, args):
+    response = await client.post("/auth", json={"username": "user1", "password": "password"})
+    response.raise_for_status()
+    token = response.json()["token"]
+
+    results = []
+    for endpoint in args.endpoints:
+        if endpoint == "ws_echo":
+            await run_ws_echo(open_websocket, args.warmup, args.concurrency)
+            results.append(await run_ws_echo(open_websocket, args.requests, args.concurrency))
+        else:
+            await run_http(client, endpoint, args.warmup, args.concurrency, args.users, args.bookings, token)
+            results.append(await run_http(client, endpoint, args.requests, args.concurrency,
+                                          args.users, args.bookings, token))
+    return results
+
+
+# -----------------------
+# Transports (run inside the per-dataset child process)
+# -----------------------
+
+async def measure_asgi(args):
+    sys.path.insert(0, MOCK_API_DIR)
+    import api
+
+    async with api.app.router.lifespan_context(api.app):
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://mock-api") as client:
+            return await run_endpoints(client, lambda: ASGIWebSocket(api.app), args)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, server):
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            sys.exit(f"❌ ERROR: uvicorn exited with status {server.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    sys.exit(f"❌ ERROR: uvicorn did not start listening on port {port} within {SERVER_START_TIMEOUT}s")
+
+
+async def measure_socket(args):
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"], cwd=MOCK_API_DIR)
+    try:
+        wait_for_port(port, server)
+        base_url = f"http://127.0.0.1:{port}"
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            return await run_endpoints(client, lambda: socket_websocket(base_url), args)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def measure(args):
+    """Child process entry point: benchmark one dataset over one transport and print the results as JSON."""
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # one INFO line per request otherwise
+    results = asyncio.run(measure_asgi(args) if args.transport == "asgi" else measure_socket(args))
+    print(json.dumps(results))
+
+
+# -----------------------
+# Orchestration
+# -----------------------
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=MOCK_API_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    results = []
+    with tempfile.TemporaryDirectory(prefix="api_bench_") as workdir:
+        for users in args.sizes:
+            bookings = max(1, users // 2)
+            data_file = os.path.join(workdir, f"data_{users}.json")
+            generate_data(users, bookings, data_file, compact=True, seed=args.seed)
+
+            for transport in args.transports:
+                print(f"⏱️ BENCHMARKING {transport} with {users} users / {bookings} bookings...", flush=True)
+                env = dict(os.environ, MOCK_API_DATA_FILE=data_file, MOCK_API_DB_FILE=f"{data_file}.db",
+                           LOG_PROFILE="perf", WS_PING_INTERVAL="0")
+                command = [
+                    sys.executable, os.path.abspath(__file__), "measure", "--transport", transport,
+                    "--users", str(users), "--bookings", str(bookings), "--requests", str(args.requests),
+                    "--warmup", str(args.warmup), "--concurrency", str(args.concurrency),
+                    "--endpoints", *args.endpoints,
+                ]
+                child = subprocess.run(command, env=env, cwd=MOCK_API_DIR, stdout=subprocess.PIPE, text=True)
+                if child.returncode != 0:
+                    sys.exit(f"❌ ERROR: {transport} benchmark for {users} users failed")
+                for result in json.loads(child.stdout.strip().splitlines()[-1]):
+                    results.append({"transport": transport, "users": users, "bookings": bookings, **result})
+
+    report = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "settings": {
+            "requests": args.requests, "warmup": args.warmup, "concurrency": args.concurrency, "seed": args.seed,
+            "storage_engine": os.getenv("STORAGE_ENGINE", "memory"), "upload_mode": os.getenv("UPLOAD_MODE", "disk"),
+            "password_hash": os.getenv("PASSWORD_HASH", "plain"),
+        },
+        "results": results,
+    }
+    print_results(results)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"\n✅ Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            return compare_reports(json.load(f), report, args.threshold)
+    return 0
+
+
+def print_results(results):
+    print(f"\n{'Transport':<10}{'Users':>9}{'Endpoint':>16}{'Requests':>10}{'Errors':>8}{'Ops/s':>10}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for r in results:
+        print(f"{r['transport']:<10}{r['users']:>9}{r['endpoint']:>16}{r['requests']:>10}{r['errors']:>8}"
+              f"{r['ops_per_sec']:>10}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}")
+
+
+def compare_reports(baseline, current, threshold):
+    """Print per-endpoint changes and return 1 if throughput dropped or p95/p99 grew by more than ``threshold`` %."""
+    key = lambda r: (r["transport"], r["users"], r["endpoint"])  # noqa: E731
+    previous = {key(r): r for r in baseline["results"]}
+    regressions = 0
+    matched = 0
+
+    print(f"\nComparing {baseline.get('git_commit')} ({baseline.get('created')}) -> "
+          f"{current.get('git_commit')} ({current.get('created')}), threshold {threshold}%")
+    print(f"{'Transport':<10}{'Users':>9}{'Endpoint':>16}{'Ops/s':>10}{'p95':>9}{'p99':>9}  Status")
+    for r in current["results"]:
+        old = previous.get(key(r))
+        if old is None:
+            continue
+        matched += 1
+        ops = (r["ops_per_sec"] / old["ops_per_sec"] - 1) * 100 if old["ops_per_sec"] else 0.0
+        p95 = (r["p95_ms"] / old["p95_ms"] - 1) * 100 if old["p95_ms"] else 0.0
+        p99 = (r["p99_ms"] / old["p99_ms"] - 1) * 100 if old["p99_ms"] else 0.0
+        regressed = ops < -threshold or p95 > threshold or p99 > threshold or r["errors"] > old["errors"]
+        regressions += regressed
+        print(f"{r['transport']:<10}{r['users']:>9}{r['endpoint']:>16}{ops:>+9.1f}%{p95:>+8.1f}%{p99:>+8.1f}%  "
+              f"{'❌ REGRESSION' if regressed else '✅'}")
+
+    if not matched:
+        print("\n⚠️ No (transport, dataset, endpoint) in common with the baseline; nothing compared")
+    if regressions:
+        print(f"\n❌ {regressions} regression(s) beyond {threshold}%")
+        return 1
+    print("\n✅ No regressions")
+    return 0
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    return compare_reports(baseline, current, args.threshold)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Mock API endpoints in-process and over a socket")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Benchmark every endpoint for each dataset size and transport")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100_000],
+                            help="Dataset sizes in users (bookings = users / 2)")
+    run_parser.add_argument("--transports", nargs="+", choices=TRANSPORTS, default=list(TRANSPORTS))
+    run_parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+    run_parser.add_argument("--requests", type=int, default=2000, help="Measured requests per endpoint")
+    run_parser.add_argument("--warmup", type=int, default=200, help="Unmeasured requests per endpoint first")
+    run_parser.add_argument("--concurrency", type=int, default=10)
+    run_parser.add_argument("--seed", type=int, default=int(os.getenv("SEED", 42)))
+    run_parser.add_argument("--output", default="benchmark_results.json")
+    run_parser.add_argument("--baseline", help="Compare against this earlier result file after the run")
+    run_parser.add_argument("--threshold", type=float, default=10.0, help="Allowed change in percent")
+
+    compare_parser = commands.add_parser("compare", help="Flag regressions between two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="Allowed change in percent")
+
+    measure_parser = commands.add_parser("measure")  # internal: one dataset + transport in a fresh process
+    measure_parser.add_argument("--transport", choices=TRANSPORTS, required=True)
+    measure_parser.add_argument("--users", type=int, required=True)
+    measure_parser.add_argument("--bookings", type=int, required=True)
+    measure_parser.add_argument("--requests", type=int, required=True)
+    measure_parser.add_argument("--warmup", type=int, required=True)
+    measure_parser.add_argument("--concurrency", type=int, required=True)
+    measure_parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, required=True)
+
+    args = parser.parse_args()
+    if args.command == "measure":
+        measure(args)
+    elif args.command == "run":
+        sys.exit(run(args))
+    else:
+        sys.exit(compare(args))
+
+
+if __name__ == "__main__":
+    main()
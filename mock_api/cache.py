@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Bounded LRU cache with optional TTL and hit/miss/eviction counters.
+
+    Values are copied on insert so cached entries never alias the live
+    objects held by the data store.
+
+    ``pop`` bumps the key's ``version`` and ``clear`` bumps every key's. A
+    reader that takes the version before loading a value and passes it to
+    ``put`` skips the fill if that key was invalidated in between, so a value
+    read before a write can not be cached after that write's invalidation,
+    while fills of other keys go ahead.
+    """
+
+    def __init__(self, max_entries=10000, ttl=0.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_fills = 0
+        self._epoch = 0  # bumped by clear
+        self._pop_count = 0
+        self._popped = {}  # key -> value of _pop_count when it was last popped, since the last clear
+
+    def get(self, key):
+        """Return the cached value or None, refreshing its LRU position."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at and expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def version(self, key):
+        """Opaque token that changes whenever ``key`` is popped or the cache is cleared."""
+        with self._lock:
+            return self._epoch, self._popped.get(key, 0)
+
+    def put(self, key, value, version=None):
+        """Cache a copy of ``value``, evicting the least recently used entry when full.
+
+        With ``version`` (taken before ``value`` was loaded), nothing is cached if the
+        key has been invalidated since; returns whether the value was cached.
+        """
+        expires_at = self._clock() + self.ttl if self.ttl > 0 else 0.0
+        with self._lock:
+            if version is not None and version != (self._epoch, self._popped.get(key, 0)):
+                self.stale_fills += 1
+                return False
+            self._entries[key] = (expires_at, value.copy())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return True
+
+    def pop(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            if key not in self._popped and len(self._popped) >= self.max_entries:
+                self._clear()  # keeps the version table bounded; costs only fills in flight
+            self._pop_count += 1
+            self._popped[key] = self._pop_count
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+            self._entries.clear()
+
+    def _clear(self):
+        self._epoch += 1
+        self._popped.clear()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "stale_fills": self.stale_fills,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,149 @@
+import argparse
+import atexit
+import gzip
+import json
+import logging
+import os
+import queue
+import tempfile
+import threading
+import time
+
+CAPTURED_BODY_TYPES = ("application/json", "text/")
+MAX_CAPTURED_BODY = 64 * 1024
+
+
+class TraceWriter:
+    """Appends trace records to a JSONL file from a background thread."""
+
+    def __init__(self, trace_file):
+        self.trace_file = trace_file
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def write(self, record):
+        self._queue.put(record)
+
+    def stop(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self):
+        with open(self.trace_file, "a") as f:
+            while True:
+                record = self._queue.get()
+                if record is None:
+                    return
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+                if self._queue.empty():
+                    f.flush()
+
+
+class TraceCaptureMiddleware:
+    """ASGI middleware recording every HTTP request as one JSONL trace line.
+
+    A record holds the request's start time (``t``, Unix seconds, so every
+    ``--workers`` process appending to the file shares one timeline), method,
+    path, query string, content type, the body for small JSON/text requests
+    (uploads are recorded without their bytes), the authenticated user
+    (``user``, resolved from the bearer token by ``resolve_user``), and the
+    response status and duration. The body is teed while the app reads it,
+    so nothing is buffered twice and the app sees the request unchanged.
+
+    Records are written when requests complete, so the file is only roughly
+    sorted by ``t``: a slow request lands after faster ones that started later,
+    and workers interleave. The replay reorders within a time window;
+    ``python capture.py <trace>`` sorts a trace completely.
+    """
+
+    def __init__(self, app, trace_file, resolve_user=None):
+        self.app = app
+        self.writer = TraceWriter(trace_file)
+        self.resolve_user = resolve_user
+        logging.info(f"🎥 CAPTURING TRAFFIC to {trace_file}")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.time()
+        started = time.perf_counter()
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        content_type = headers.get("content-type", "")
+        capture_body = content_type.startswith(CAPTURED_BODY_TYPES)
+        chunks = []
+        size = 0
+        status = 0
+
+        async def tee_receive():
+            nonlocal size
+            message = await receive()
+            if capture_body and message["type"] == "http.request":
+                size += len(message.get("body", b""))
+                if size <= MAX_CAPTURED_BODY:
+                    chunks.append(message.get("body", b""))
+            return message
+
+        async def capture_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, tee_receive, capture_send)
+        finally:
+            body = b"".join(chunks).decode("utf-8", "replace") if capture_body and size <= MAX_CAPTURED_BODY else None
+            self.writer.write({
+                "t": round(started_at, 6),
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": scope["query_string"].decode("latin-1"),
+                "content_type": content_type.split(";")[0],
+                "body": body,
+                "user": self.resolve_user(headers.get("authorization")) if self.resolve_user else None,
+                "status": status,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            })
+
+
+def _open(path, mode):
+    return gzip.open(path, mode + "t") if path.endswith(".gz") else open(path, mode)
+
+
+def sort_trace(trace_file, output=None):
+    """Rewrite a trace (in memory) sorted by request start time; ``output`` defaults to the trace itself."""
+    with _open(trace_file, "r") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    records.sort(key=lambda record: record["t"])
+
+    output = output or trace_file
+    fd, temp_path = tempfile.mkstemp(prefix=".trace-", suffix=".gz" if output.endswith(".gz") else ".jsonl",
+                                     dir=os.path.dirname(output) or ".")
+    os.close(fd)
+    try:
+        with _open(temp_path, "w") as f:
+            for record in records:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        os.replace(temp_path, output)
+    except Exception:
+        os.remove(temp_path)
+        raise
+    return len(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sort a captured trace by request start time")
+    parser.add_argument("trace_file", help="JSONL trace written with CAPTURE_TRACE_FILE (.gz also works)")
+    parser.add_argument("--output", help="Write the sorted trace here instead of replacing the input")
+    args = parser.parse_args()
+    count = sort_trace(args.trace_file, args.output)
+    print(f"Sorted {count} records into {args.output or args.trace_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,64 +1,244 @@
+"""
+Test-data generator for the Mock API
+------------------------------------
+Records are produced in fixed-size chunks by a process pool and streamed to the
+output in order, so memory stays bounded by a few chunks whatever the dataset
+size. Each chunk has its own `random.Random` seeded from the run seed and the
+chunk's position, so the same seed gives the same dataset for any number of
+worker processes. Names come from a pool sampled once from Faker instead of a
+Faker call per booking.
+
+Usage:
+    python generate_data.py                                  # 1000 users, 500 bookings -> data.json
+    python generate_data.py --users 1000000 --bookings 500000 --compact --seed 42
+    STORAGE_ENGINE=sqlite python generate_data.py --users 1000000   # bulk-load into SQLite
+"""
+
+import argparse
 import json
 import random
 import os
 import datetime
+import multiprocessing
+import time
 from faker import Faker
 
-fake = Faker()
+from sqlite_store import SQLiteStore, USER_COLUMNS, BOOKING_COLUMNS
 
 DATA_FILE = os.path.join(os.path.dirname(__file__), "data.json")
+DB_FILE = os.path.splitext(DATA_FILE)[0] + ".db"
 
+CHUNK_SIZE = 20_000
+NAME_POOL_SIZE = 2000
+ADDITIONAL_NEEDS = ["Breakfast", "Lunch", "Dinner", "None"]
+MAX_DATE_OFFSET = 40  # check-in up to 30 days ahead, check-out up to 10 days after that
 
-def generate_data(num_users=1000, num_bookings=500):
-    """Generates realistic sample user and booking data with configurability & error handling."""
+# Per-process generation context, set by _init_worker
+_context = {}
+
+
+def build_name_pool(seed, size=NAME_POOL_SIZE):
+    """Sample ``size`` first and last names from Faker once, deterministically for ``seed``."""
+    fake = Faker()
+    fake.seed_instance(seed)
+    return [fake.first_name() for _ in range(size)], [fake.last_name() for _ in range(size)]
+
+
+def _init_worker(first_names, last_names, today):
+    _context["first_names"] = first_names
+    _context["last_names"] = last_names
+    # JSON-escaped once, so formatting a record is plain string interpolation
+    _context["first_names_json"] = [json.dumps(name) for name in first_names]
+    _context["last_names_json"] = [json.dumps(name) for name in last_names]
+    _context["dates"] = [(today + datetime.timedelta(days=offset)).strftime("%Y-%m-%d")
+                         for offset in range(MAX_DATE_OFFSET + 1)]
+
+
+# -----------------------
+# Record generation (one chunk at a time, inside a worker)
+# -----------------------
+
+def _user_rows(rng, start, stop):
+    for user_id in range(start + 1, stop + 1):
+        yield user_id, rng.randint(1, 5)  # Assuming 5 available images
+
+
+def _booking_rows(rng, start, stop):
+    name_count = len(_context["first_names"])
+    for booking_id in range(start + 1, stop + 1):
+        checkin = rng.randint(1, 30)
+        checkout = checkin + rng.randint(1, 10)
+        yield (booking_id, rng.randrange(name_count), rng.randrange(name_count), rng.randint(100, 1000),
+               rng.random() < 0.5, checkin, checkout, rng.randrange(len(ADDITIONAL_NEEDS)))
+
+
+def _format_users(rows, compact):
+    if compact:
+        template = ('{{"id":{0},"username":"user{0}","password":"password","email":"user{0}@example.com",'
+                    '"profile_photo":"photo{1}.jpg"}}')
+    else:
+        template = ('        {{\n'
+                    '            "id": {0},\n'
+                    '            "username": "user{0}",\n'
+                    '            "password": "password",\n'
+                    '            "email": "user{0}@example.com",\n'
+                    '            "profile_photo": "photo{1}.jpg"\n'
+                    '        }}')
+    return [template.format(*row) for row in rows]
+
+
+def _format_bookings(rows, compact):
+    first_names, last_names, dates = _context["first_names_json"], _context["last_names_json"], _context["dates"]
+    if compact:
+        template = ('{{"id":{0},"firstname":{1},"lastname":{2},"totalprice":{3},"depositpaid":{4},'
+                    '"checkin":"{5}","checkout":"{6}","additionalneeds":"{7}"}}')
+    else:
+        template = ('        {{\n'
+                    '            "id": {0},\n'
+                    '            "firstname": {1},\n'
+                    '            "lastname": {2},\n'
+                    '            "totalprice": {3},\n'
+                    '            "depositpaid": {4},\n'
+                    '            "checkin": "{5}",\n'
+                    '            "checkout": "{6}",\n'
+                    '            "additionalneeds": "{7}"\n'
+                    '        }}')
+    return [
+        template.format(booking_id, first_names[first], last_names[last], price, "true" if paid else "false",
+                        dates[checkin], dates[checkout], ADDITIONAL_NEEDS[needs])
+        for booking_id, first, last, price, paid, checkin, checkout, needs in rows
+    ]
+
+
+def _records(kind, rows):
+    """Turn generated rows into dicts in the data.json layout (for the SQLite bulk load)."""
+    if kind == "users":
+        return [dict(zip(USER_COLUMNS, (user_id, f"user{user_id}", "password", f"user{user_id}@example.com",
+                                        f"photo{photo}.jpg")))
+                for user_id, photo in rows]
+
+    first_names, last_names, dates = _context["first_names"], _context["last_names"], _context["dates"]
+    return [dict(zip(BOOKING_COLUMNS, (booking_id, first_names[first], last_names[last], price, paid,
+                                       dates[checkin], dates[checkout], ADDITIONAL_NEEDS[needs])))
+            for booking_id, first, last, price, paid, checkin, checkout, needs in rows]
 
-    users = []
-    bookings = []
-
-    # Generate Users
-    for i in range(num_users):
-        user = {
-            "id": i + 1,
-            "username": f"user{i + 1}",
-            "password": "password",
-            "email": f"user{i + 1}@example.com",
-            "profile_photo": f"photo{random.randint(1, 5)}.jpg"  # Assuming 5 available images
-        }
-        users.append(user)
-
-    # Generate Bookings
+
+def _build_chunk(task):
+    """Generate one chunk: JSON text for ``json``/``compact`` output, or a list of dicts for ``rows``."""
+    kind, start, stop, seed, output = task
+    rng = random.Random(f"{seed}:{kind}:{start}")
+    rows = (_user_rows if kind == "users" else _booking_rows)(rng, start, stop)
+    if output == "rows":
+        return _records(kind, rows)
+    format_rows = _format_users if kind == "users" else _format_bookings
+    compact = output == "compact"
+    return ("," if compact else ",\n").join(format_rows(rows, compact))
+
+
+# -----------------------
+# Driving the pool and writing the output
+# -----------------------
+
+def _chunks(kind, count, seed, output, chunk_size):
+    for start in range(0, count, chunk_size):
+        yield kind, start, min(start + chunk_size, count), seed, output
+
+
+def _generate_chunks(tasks, workers, name_pool, today):
+    """Yield chunk results in order, from a process pool when ``workers`` > 1."""
+    init_args = (*name_pool, today)
+    if workers <= 1:
+        _init_worker(*init_args)
+        yield from map(_build_chunk, tasks)
+        return
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=init_args) as pool:
+        yield from pool.imap(_build_chunk, tasks)
+
+
+def _write_json(f, kind, chunks, compact, last):
+    f.write(f'"{kind}":[' if compact else f'    "{kind}": [')
+    wrote_any = False
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if wrote_any:
+            f.write("," if compact else ",\n")
+        elif not compact:
+            f.write("\n")
+        f.write(chunk)
+        wrote_any = True
+    if compact:
+        f.write("]" if last else "],")
+    else:
+        f.write(("\n    ]" if wrote_any else "]") + ("\n" if last else ",\n"))
+
+
+def generate_data(num_users=1000, num_bookings=500, output_file=DATA_FILE, compact=False, seed=None,
+                  workers=None, chunk_size=CHUNK_SIZE):
+    """Generates realistic sample user and booking data with configurability & error handling."""
+    seed = random.randrange(2 ** 32) if seed is None else seed
+    workers = workers or os.cpu_count() or 1
+    output = "compact" if compact else "json"
+    name_pool = build_name_pool(seed)
     today = datetime.date.today()
-    for i in range(num_bookings):
-        checkin_date = today + datetime.timedelta(days=random.randint(1, 30))
-        checkout_date = checkin_date + datetime.timedelta(days=random.randint(1, 10))
-
-        booking = {
-            "id": i + 1,
-            "firstname": fake.first_name(),  # More diversity
-            "lastname": fake.last_name(),  # More diversity
-            "totalprice": random.randint(100, 1000),
-            "depositpaid": random.choice([True, False]),
-            "checkin": checkin_date.strftime("%Y-%m-%d"),
-            "checkout": checkout_date.strftime("%Y-%m-%d"),
-            "additionalneeds": random.choice(["Breakfast", "Lunch", "Dinner", "None"])
-        }
-        bookings.append(booking)
-
-    data = {"users": users, "bookings": bookings}
+    started = time.perf_counter()
 
     try:
-        with open(DATA_FILE, "w") as f:
-            json.dump(data, f, indent=4)
-        print(f"✅ Data generated and saved to {DATA_FILE} with {num_users} users and {num_bookings} bookings.")
+        with open(output_file, "w") as f:
+            f.write("{" if compact else "{\n")
+            _write_json(f, "users", _generate_chunks(_chunks("users", num_users, seed, output, chunk_size),
+                                                     workers, name_pool, today), compact, last=False)
+            _write_json(f, "bookings", _generate_chunks(_chunks("bookings", num_bookings, seed, output, chunk_size),
+                                                        workers, name_pool, today), compact, last=True)
+            f.write("}")
+        print(f"✅ Data generated and saved to {output_file} with {num_users} users and {num_bookings} bookings "
+              f"(seed {seed}, {time.perf_counter() - started:.1f}s).")
     except IOError as e:
-        print(f"❌ Error saving data to {DATA_FILE}: {e}")
+        print(f"❌ Error saving data to {output_file}: {e}")
     except TypeError as e:
         print(f"❌ Error dumping json data: {e}")
     except Exception as e:
         print(f"❌ An unexpected error occurred: {e}")
 
 
+def generate_sqlite(num_users=1000, num_bookings=500, db_file=DB_FILE, seed=None, workers=None,
+                    chunk_size=CHUNK_SIZE):
+    """Bulk-load generated rows straight into the SQLite storage engine's database (constant memory)."""
+    seed = random.randrange(2 ** 32) if seed is None else seed
+    workers = workers or os.cpu_count() or 1
+    name_pool = build_name_pool(seed)
+    today = datetime.date.today()
+    started = time.perf_counter()
+
+    def records(kind, count):
+        for chunk in _generate_chunks(_chunks(kind, count, seed, "rows", chunk_size), workers, name_pool, today):
+            yield from chunk
+
+    try:
+        SQLiteStore(db_file, DATA_FILE).bulk_load(records("users", num_users), records("bookings", num_bookings),
+                                                  source="generate_data.py")
+        print(f"✅ Data generated and loaded into {db_file} with {num_users} users and {num_bookings} bookings "
+              f"(seed {seed}, {time.perf_counter() - started:.1f}s).")
+    except Exception as e:
+        print(f"❌ Error loading data into {db_file}: {e}")
+
+
 if __name__ == "__main__":
-    num_users = int(os.getenv("NUM_USERS", 1000))  # Configurable via env variables
-    num_bookings = int(os.getenv("NUM_BOOKINGS", 500))  # Configurable via env variables
-    generate_data(num_users, num_bookings)
+    sqlite = os.getenv("STORAGE_ENGINE", "memory") == "sqlite"
+    parser = argparse.ArgumentParser(description="Generate users & bookings for the Mock API")
+    parser.add_argument("--users", type=int, default=int(os.getenv("NUM_USERS", 1000)))  # Configurable via env variables
+    parser.add_argument("--bookings", type=int, default=int(os.getenv("NUM_BOOKINGS", 500)))
+    parser.add_argument("--output", help="Output file (default: data.json, or data.db with STORAGE_ENGINE=sqlite)")
+    parser.add_argument("--compact", action="store_true", help="Write JSON without indentation")
+    parser.add_argument("--seed", type=int, default=os.getenv("SEED"), help="Seed for a reproducible dataset")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+    seed = None if args.seed is None else int(args.seed)
+
+    if sqlite:
+        generate_sqlite(args.users, args.bookings, args.output or os.getenv("MOCK_API_DB_FILE", DB_FILE), seed=seed,
+                        workers=args.workers, chunk_size=args.chunk_size)
+    else:
+        generate_data(args.users, args.bookings, args.output or DATA_FILE, compact=args.compact, seed=seed,
+                      workers=args.workers, chunk_size=args.chunk_size)
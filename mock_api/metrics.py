@@ -0,0 +1,297 @@
+"""
+Server-side metrics for the Mock API, exposed in Prometheus text format
+-----------------------------------------------------------------------
+All series are allocated up front: histograms keep a fixed list of bucket
+counts per label set, and the request middleware resolves each route's series
+once, so recording a request is a dict lookup, a `bisect` and a few integer
+increments. Cache counters are read from the caches at scrape time, so they
+cost nothing on the request path.
+
+Recorded:
+- per-route request latency and responses by status class (`MetricsMiddleware`)
+- wait and hold time on the data lock (`InstrumentedLock`)
+- store lookups, data load time and file I/O (change log, snapshots, uploads)
+- booking/token cache hits, misses, evictions and size (`CacheCollector`)
+- event-loop lag (`LoopLagMonitor`)
+"""
+
+import asyncio
+import time
+from bisect import bisect_left
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; request and lock timings live in the sub-millisecond to second range
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Seconds; file writes and snapshots of large datasets can take much longer
+IO_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names, values):
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _header(lines, name, help_text, kind):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+class _HistogramSeries:
+    __slots__ = ("bounds", "counts", "sum", "label_text")
+
+    def __init__(self, bounds, label_text):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.label_text = label_text
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Histogram:
+    """Fixed-bucket histogram; ``labels(...)`` returns a series that can be kept and observed directly."""
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.bounds = tuple(sorted(buckets))
+        self._series = {}
+        if not self.labelnames:
+            self.observe = self.labels().observe
+
+    def labels(self, *values):
+        series = self._series.get(values)
+        if series is None:
+            series = self._series[values] = _HistogramSeries(self.bounds, _label_text(self.labelnames, values))
+        return series
+
+    def render(self, lines):
+        _header(lines, self.name, self.help_text, "histogram")
+        for series in self._series.values():
+            prefix = f"{series.label_text}," if series.label_text else ""
+            suffix = f"{{{series.label_text}}}" if series.label_text else ""
+            cumulative = 0
+            for bound, count in zip(self.bounds + (float("inf"),), series.counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{_number(bound)}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{suffix} {_number(series.sum)}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+
+
+class _Value:
+    __slots__ = ("value", "label_text")
+
+    def __init__(self, label_text):
+        self.value = 0
+        self.label_text = label_text
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def set(self, value):
+        self.value = value
+
+
+class Counter:
+    """Monotonic counter (``kind="gauge"`` for a value that is set instead)."""
+
+    def __init__(self, name, help_text, labelnames=(), kind="counter"):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.kind = kind
+        self._series = {}
+        if not self.labelnames:
+            default = self.labels()
+            self.inc = default.inc
+            self.set = default.set
+
+    def labels(self, *values):
+        series = self._series.get(values)
+        if series is None:
+            series = self._series[values] = _Value(_label_text(self.labelnames, values))
+        return series
+
+    def render(self, lines):
+        _header(lines, self.name, self.help_text, self.kind)
+        for series in self._series.values():
+            labels = f"{{{series.label_text}}}" if series.label_text else ""
+            lines.append(f"{self.name}{labels} {_number(series.value)}")
+
+
+class Gauge(Counter):
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames, kind="gauge")
+
+
+class CacheCollector:
+    """Reads the counters an ``LRUCache`` already keeps, labelled by cache name, at scrape time."""
+
+    COUNTERS = ("hits", "misses", "evictions", "expirations", "stale_fills")
+
+    def __init__(self, prefix, caches):
+        self.prefix = prefix
+        self.caches = caches  # name -> LRUCache
+
+    def render(self, lines):
+        for counter in self.COUNTERS:
+            name = f"{self.prefix}_{counter}_total"
+            _header(lines, name, f"Cache {counter}", "counter")
+            for cache_name, cache in self.caches.items():
+                lines.append(f'{name}{{cache="{cache_name}"}} {getattr(cache, counter)}')
+        name = f"{self.prefix}_entries"
+        _header(lines, name, "Entries currently cached", "gauge")
+        for cache_name, cache in self.caches.items():
+            lines.append(f'{name}{{cache="{cache_name}"}} {len(cache)}')
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            metric.render(lines)
+        return "\n".join(lines) + "\n"
+
+
+# -----------------------
+# The Mock API's metrics
+# -----------------------
+
+registry = MetricsRegistry()
+
+request_seconds = registry.register(Histogram(
+    "mock_api_request_duration_seconds", "HTTP request latency by route", ("method", "route")))
+responses_total = registry.register(Counter(
+    "mock_api_responses_total", "HTTP responses by route and status class", ("method", "route", "status")))
+data_lock_wait_seconds = registry.register(Histogram(
+    "mock_api_data_lock_wait_seconds", "Time spent waiting to acquire the data lock"))
+data_lock_hold_seconds = registry.register(Histogram(
+    "mock_api_data_lock_hold_seconds", "Time the data lock was held"))
+store_read_seconds = registry.register(Histogram(
+    "mock_api_store_read_seconds", "Data store lookups", ("op",)))
+file_io_seconds = registry.register(Histogram(
+    "mock_api_file_io_seconds", "File writes: change-log appends, data.json snapshots, uploads", ("op",),
+    buckets=IO_BUCKETS))
+data_load_seconds = registry.register(Gauge(
+    "mock_api_data_load_seconds", "Time taken by the initial data load"))
+event_loop_lag_seconds = registry.register(Histogram(
+    "mock_api_event_loop_lag_seconds", "How late the event loop woke a periodic timer"))
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency and status class per (method, route template)."""
+
+    STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+
+    def __init__(self, app, routes):
+        self.app = app
+        self._series = {}  # id(route) -> method -> (latency series, status counters); routes are unhashable
+        for route in routes:
+            for method in getattr(route, "methods", None) or ():
+                self._series_for(route, method, route.path)
+
+    def _series_for(self, route, method, path):
+        series = self._series.setdefault(id(route), {})[method] = (
+            request_seconds.labels(method, path),
+            [responses_total.labels(method, path, status) for status in self.STATUS_CLASSES],
+        )
+        return series
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            method = scope["method"]
+            by_method = self._series.get(id(route))
+            series = by_method.get(method) if by_method is not None else None
+            if series is None:  # unmatched paths (404s) and methods first seen at runtime
+                series = self._series_for(route, method, getattr(route, "path", "unmatched"))
+            latency, statuses = series
+            latency.observe(time.perf_counter() - started)
+            statuses[min(max(status // 100, 1), 5) - 1].inc()
+
+
+class InstrumentedLock:
+    """``asyncio.Lock`` recording how long callers waited for it and how long they held it."""
+
+    def __init__(self, wait_seconds=data_lock_wait_seconds, hold_seconds=data_lock_hold_seconds):
+        self._lock = asyncio.Lock()
+        self._wait = wait_seconds.observe
+        self._hold = hold_seconds.observe
+        self._acquired_at = 0.0
+
+    async def __aenter__(self):
+        started = time.perf_counter()
+        await self._lock.acquire()
+        self._acquired_at = time.perf_counter()
+        self._wait(self._acquired_at - started)
+
+    async def __aexit__(self, *exc_info):
+        self._hold(time.perf_counter() - self._acquired_at)
+        self._lock.release()
+
+    def locked(self):
+        return self._lock.locked()
+
+
+class LoopLagMonitor:
+    """Sleeps ``interval`` seconds in a loop and records how much later than asked it woke up."""
+
+    def __init__(self, interval=0.5, histogram=event_loop_lag_seconds):
+        self.interval = interval
+        self._observe = histogram.observe
+        self._task = None
+
+    def start(self):
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            due = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self._observe(max(0.0, loop.time() - due))
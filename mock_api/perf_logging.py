@@ -0,0 +1,113 @@
+"""
+Asynchronous, sampled logging for the Mock API hot paths
+--------------------------------------------------------
+- **debug** profile (default): every event is logged, emoji and all.
+- **perf** profile: INFO events are only counted; warnings and errors are still
+  logged, and the per-event counts are logged as an aggregate on shutdown.
+
+Per-event sampling rates (`LOG_SAMPLE_RATES="auth_success=0.01,booking_fetch=0.1"`)
+override either profile: a rate of 0.1 logs every 10th occurrence. Messages use
+%-style arguments, so they are only formatted when actually emitted. In the API,
+records are handed to a `QueueListener` thread, which adds timestamps and writes
+to stderr off the request path.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+
+try:
+    from .settings import LOG_PROFILE, LOG_SAMPLE_RATES
+except ImportError:  # started from inside mock_api/ as `uvicorn api:app`
+    from settings import LOG_PROFILE, LOG_SAMPLE_RATES
+
+LOG_PROFILES = ("debug", "perf")
+
+
+def parse_sample_rates(spec):
+    """Parse ``"event=rate,event=rate"`` into a dict of floats."""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        event, _, rate = item.partition("=")
+        rates[event.strip()] = float(rate)
+    return rates
+
+
+class EventLog:
+    """Counts every event and logs a deterministic sample of them."""
+
+    def __init__(self, profile="debug", sample_rates=None, logger=None):
+        if profile not in LOG_PROFILES:
+            raise ValueError(f"Unknown log profile '{profile}', expected one of {LOG_PROFILES}")
+        self.profile = profile
+        self.sample_rates = sample_rates or {}
+        self.logger = logger or logging.getLogger()
+        self.counts = {}
+        self._every = {}  # event -> log every Nth occurrence (0 = never)
+
+    def _log_every(self, event, level):
+        rate = self.sample_rates.get(event)
+        if rate is None:
+            rate = 1.0 if self.profile == "debug" or level >= logging.WARNING else 0.0
+        every = 0 if rate <= 0 else max(1, round(1 / rate))
+        self._every[event] = every
+        return every
+
+    def log(self, event, level, msg, *args):
+        """Count ``event`` and log it if it falls in the sample. ``msg`` is formatted lazily."""
+        count = self.counts.get(event, 0) + 1
+        self.counts[event] = count
+
+        every = self._every.get(event)
+        if every is None:
+            every = self._log_every(event, level)
+        if every and (count - 1) % every == 0 and self.logger.isEnabledFor(level):
+            self.logger.log(level, msg, *args)
+
+    def log_summary(self):
+        if self.counts:
+            summary = ", ".join(f"{event}={count}" for event, count in sorted(self.counts.items()))
+            self.logger.warning("📊 LOG EVENTS: %s", summary)
+
+
+event_log = EventLog(LOG_PROFILE, parse_sample_rates(LOG_SAMPLE_RATES))
+
+
+def log_event(event, level, msg, *args):
+    event_log.log(event, level, msg, *args)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queues records with their message text fixed, leaving handler formatting to the listener thread."""
+
+    def prepare(self, record):
+        # Like QueueHandler, merge the args now: they are often live dicts (bookings, users)
+        # that may change before the listener gets to the record.
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+_listener = None
+
+
+def start_queue_logging():
+    """Move the root logger's handlers behind a QueueListener thread."""
+    global _listener
+    root = logging.getLogger()
+    if _listener is not None or not root.handlers:
+        return
+
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, *root.handlers, respect_handler_level=True)
+    root.handlers = [DeferredQueueHandler(log_queue)]
+    _listener.start()
+    atexit.register(stop_queue_logging)  # drain the queue before the process exits
+
+
+def stop_queue_logging():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,169 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import deque
+
+try:
+    from .metrics import file_io_seconds
+    from .store import file_fingerprint
+except ImportError:  # started from inside mock_api/ as `uvicorn api:app`
+    from metrics import file_io_seconds
+    from store import file_fingerprint
+
+log_append_seconds = file_io_seconds.labels("log_append")
+snapshot_seconds = file_io_seconds.labels("snapshot")
+
+
+class WriteBehindPersister:
+    """Write-behind persistence for a DataStore.
+
+    Mutations are queued in memory and appended to ``<snapshot_file>.log`` by
+    a background thread, which also compacts the log into an atomic snapshot
+    (temp file + rename) every ``interval`` seconds or once ``dirty_threshold``
+    changes have accumulated. The snapshot is a runtime file in the data.json
+    layout, written without indentation; the store's own data.json is only
+    read, as the seed. Request handlers never touch the snapshot, so update
+    cost no longer grows with the dataset.
+    """
+
+    def __init__(self, store, snapshot_file, interval=5.0, dirty_threshold=1000):
+        self.store = store
+        self.snapshot_file = snapshot_file
+        self.log_file = f"{snapshot_file}.log"
+        self.compacting_log_file = f"{snapshot_file}.log.old"
+        self.interval = interval
+        self.dirty_threshold = dirty_threshold
+        self._source = None
+
+        self._pending = deque()
+        self._dirty = 0
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def record(self, change):
+        """Queue a change record. Called by the store while it holds its write lock."""
+        self._pending.append(change)
+        self._dirty += 1
+        if self._dirty >= self.dirty_threshold:
+            self._wake.set()
+
+    def load(self):
+        """Load the latest snapshot into the store, or the seed data.json if there is no usable one.
+
+        Each snapshot records the seed file it grew from. If data.json has been
+        regenerated since, the snapshot and its change logs belong to another
+        dataset and are discarded.
+        """
+        seed_file = self.store.data_file
+        if not os.path.exists(seed_file):
+            raise FileNotFoundError(f"Data file not found: {seed_file}")
+        self._source = file_fingerprint(seed_file)
+        if os.path.exists(self.snapshot_file):
+            if self.store.load(self.snapshot_file) == self._source:
+                logging.info(f"♻️ LOADED SNAPSHOT {self.snapshot_file}")
+                self.recover()
+                return
+            logging.warning(f"⚠️ DISCARDING SNAPSHOT {self.snapshot_file}: {seed_file} changed since it was taken")
+            for path in (self.snapshot_file, self.compacting_log_file, self.log_file):
+                if os.path.exists(path):
+                    os.remove(path)
+        self.store.load()
+        self.recover()
+
+    def recover(self):
+        """Replay change logs left behind by a previous run that did not compact them."""
+        replayed = 0
+        for path in (self.compacting_log_file, self.log_file):
+            if not os.path.exists(path):
+                continue
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        change = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # torn write at the tail of the log
+                    self.store.apply(change)
+                    replayed += 1
+        if replayed:
+            logging.info(f"♻️ REPLAYED {replayed} CHANGES from {self.log_file}")
+            self._dirty = replayed
+            self.flush()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="write-behind-persister", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background thread and flush everything to the snapshot."""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logging.error(f"⚠️ Error persisting data: {e}")
+
+    def flush(self):
+        """Append queued changes to the log and compact if anything changed."""
+        with self._flush_lock:
+            self._append_pending()
+            if self._dirty:
+                self._compact()
+
+    def _append_pending(self):
+        if not self._pending:
+            return
+        lines = []
+        while self._pending:
+            lines.append(json.dumps(self._pending.popleft()))
+        started = time.perf_counter()
+        with open(self.log_file, "a") as f:
+            f.write("\n".join(lines) + "\n")
+        log_append_seconds.observe(time.perf_counter() - started)
+
+    def _compact(self):
+        # Everything in the rotated log is already applied to the store, so the
+        # snapshot taken afterwards supersedes it. Changes arriving meanwhile stay
+        # queued and land in a fresh log.
+        if os.path.exists(self.log_file):
+            if os.path.exists(self.compacting_log_file):
+                # A previous compaction failed; keep its changes ahead of the new ones
+                with open(self.log_file, "r") as src, open(self.compacting_log_file, "a") as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(self.log_file)
+            else:
+                os.replace(self.log_file, self.compacting_log_file)
+        self._dirty = 0
+        data = {"source": self._source, **self.store.to_dict()}
+
+        started = time.perf_counter()
+        fd, temp_path = tempfile.mkstemp(prefix=".snapshot-", suffix=".json",
+                                         dir=os.path.dirname(self.snapshot_file) or ".")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(temp_path, self.snapshot_file)
+        except Exception:
+            self._dirty += 1  # retry on the next cycle
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        snapshot_seconds.observe(time.perf_counter() - started)
+
+        if os.path.exists(self.compacting_log_file):
+            os.remove(self.compacting_log_file)
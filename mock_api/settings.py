@@ -0,0 +1,62 @@
+import os
+
+# Data File Location
+DATA_FILE = os.getenv("MOCK_API_DATA_FILE", os.path.join(os.path.dirname(__file__), "data.json"))
+
+# Multi-worker mode (for `uvicorn --workers N`): MOCK_API_SHARED_STATE=1 keeps users and bookings in the
+# SQLite database shared by all workers. Booking-cache invalidations reach the other workers within
+# INVALIDATION_POLL_INTERVAL seconds
+SHARED_STATE = os.getenv("MOCK_API_SHARED_STATE", "0") == "1"
+
+# Storage engine: "memory" (dicts + write-behind data.json) or "sqlite" (WAL database at DB_FILE,
+# seeded from DATA_FILE on first start and whenever DATA_FILE changes, or bulk-loaded by generate_data.py).
+# Multi-worker mode needs "sqlite"
+STORAGE_ENGINE = os.getenv("STORAGE_ENGINE", "sqlite" if SHARED_STATE else "memory")
+DB_FILE = os.getenv("MOCK_API_DB_FILE", os.path.splitext(DATA_FILE)[0] + ".db")
+INVALIDATION_POLL_INTERVAL = float(os.getenv("INVALIDATION_POLL_INTERVAL", 0.1))
+
+# Write-behind persistence for the memory engine: mutations are journalled to "<SNAPSHOT_FILE>.log" and
+# compacted into an atomic SNAPSHOT_FILE every PERSIST_INTERVAL seconds or PERSIST_DIRTY_THRESHOLD changes.
+# DATA_FILE is only read (as the seed); a snapshot taken from an older DATA_FILE is discarded on start
+SNAPSHOT_FILE = os.getenv("MOCK_API_SNAPSHOT_FILE", os.path.splitext(DATA_FILE)[0] + ".snapshot.json")
+PERSIST_INTERVAL = float(os.getenv("PERSIST_INTERVAL", 5))
+PERSIST_DIRTY_THRESHOLD = int(os.getenv("PERSIST_DIRTY_THRESHOLD", 1000))
+
+# Booking cache: LRU-evicted beyond BOOKING_CACHE_MAX_ENTRIES, entries expire after BOOKING_CACHE_TTL seconds (0 = never)
+BOOKING_CACHE_MAX_ENTRIES = int(os.getenv("BOOKING_CACHE_MAX_ENTRIES", 10000))
+BOOKING_CACHE_TTL = float(os.getenv("BOOKING_CACHE_TTL", 300))
+
+# Profile photo uploads: "disk" (content-addressed files), "memory" or "discard" (hash and count only)
+UPLOAD_MODE = os.getenv("UPLOAD_MODE", "disk")
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 256 * 1024))
+
+# Bearer tokens: HMAC-SHA256 signed with TOKEN_SECRET (keep it identical across server processes),
+# valid for TOKEN_TTL seconds. Up to TOKEN_CACHE_MAX_ENTRIES verified tokens are cached
+TOKEN_SECRET = os.getenv("TOKEN_SECRET", "mock-api-token-secret")
+TOKEN_TTL = int(os.getenv("TOKEN_TTL", 3600))
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", 10000))
+
+# Password checks on /auth: "plain" comparison or "pbkdf2" (PBKDF2-SHA256, PBKDF2_ITERATIONS rounds)
+PASSWORD_HASH = os.getenv("PASSWORD_HASH", "plain")
+PBKDF2_ITERATIONS = int(os.getenv("PBKDF2_ITERATIONS", 100_000))
+
+# WebSocket hub: each client gets a WS_SEND_QUEUE_SIZE-deep send queue; when it is full the
+# WS_SLOW_CONSUMER_POLICY ("drop_oldest", "drop_newest" or "disconnect") applies.
+# Server pings go out every WS_PING_INTERVAL seconds (0 = off)
+WS_SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", 100))
+WS_SLOW_CONSUMER_POLICY = os.getenv("WS_SLOW_CONSUMER_POLICY", "drop_oldest")
+WS_PING_INTERVAL = float(os.getenv("WS_PING_INTERVAL", 20))
+
+# Traffic capture: when set, every HTTP request is appended to this JSONL trace (replayed by
+# locust_tests/locustfile_replay.py)
+CAPTURE_TRACE_FILE = os.getenv("CAPTURE_TRACE_FILE", "")
+
+# Metrics on /metrics (Prometheus text format): per-route latency, data-lock wait/hold times and an event-loop
+# lag probe every METRICS_LOOP_LAG_INTERVAL seconds. METRICS_ENABLED=0 turns the middleware, lock timing and probe off
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+METRICS_LOOP_LAG_INTERVAL = float(os.getenv("METRICS_LOOP_LAG_INTERVAL", 0.5))
+
+# Logging: "debug" logs every event, "perf" keeps only warnings/errors plus aggregate counts.
+# LOG_SAMPLE_RATES overrides per event, e.g. "auth_success=0.01,booking_fetch=0.1"
+LOG_PROFILE = os.getenv("LOG_PROFILE", "debug")
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
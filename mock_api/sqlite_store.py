@@ -0,0 +1,297 @@
+import functools
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    from .store import file_fingerprint
+except ImportError:  # started from inside mock_api/ as `uvicorn api:app`
+    from store import file_fingerprint
+
+USER_COLUMNS = ("id", "username", "password", "email", "profile_photo")
+BOOKING_COLUMNS = ("id", "firstname", "lastname", "totalprice", "depositpaid", "checkin", "checkout", "additionalneeds")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL UNIQUE,
+    password TEXT NOT NULL,
+    email TEXT,
+    profile_photo TEXT
+);
+CREATE TABLE IF NOT EXISTS bookings (
+    id INTEGER PRIMARY KEY,
+    firstname TEXT,
+    lastname TEXT,
+    totalprice INTEGER,
+    depositpaid INTEGER,
+    checkin TEXT,
+    checkout TEXT,
+    additionalneeds TEXT
+);
+CREATE TABLE IF NOT EXISTS invalidations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    booking_id INTEGER,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+INSERT_USER = f"INSERT OR REPLACE INTO users VALUES ({', '.join('?' * len(USER_COLUMNS))})"
+INSERT_BOOKING = f"INSERT OR REPLACE INTO bookings VALUES ({', '.join('?' * len(BOOKING_COLUMNS))})"
+SELECT_USER = "SELECT * FROM users WHERE id = ?"
+SELECT_USER_BY_USERNAME = "SELECT * FROM users WHERE username = ?"
+SELECT_BOOKING = "SELECT * FROM bookings WHERE id = ?"
+DELETE_BOOKING = "DELETE FROM bookings WHERE id = ?"
+
+
+@functools.lru_cache(maxsize=None)
+def _update_statement(table, columns):
+    """SQL for updating ``columns`` of one row; identical text lets SQLite reuse the prepared statement."""
+    return f"UPDATE {table} SET {', '.join(f'{column} = ?' for column in columns)} WHERE id = ?"
+
+
+def connect(db_file):
+    """Open a connection in WAL mode, so readers never block the (single) writer.
+
+    Every query uses constant SQL text with ``?`` parameters, so the
+    connection's statement cache serves them as prepared statements.
+    """
+    conn = sqlite3.connect(db_file, timeout=30, isolation_level=None, cached_statements=256)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _booking_from_row(row):
+    booking = dict(row)
+    booking["depositpaid"] = bool(booking["depositpaid"])
+    return booking
+
+
+class SQLiteStore:
+    """DataStore backed by a SQLite database, which several server processes can share.
+
+    The database is seeded from data.json by whichever process gets there
+    first (or bulk-loaded by generate_data.py), and reseeded when data.json
+    has changed since (path, size or mtime); afterwards all reads and
+    row-level writes go to SQLite, so mutation cost does not grow with the
+    dataset and every ``uvicorn --workers N`` process sees the same data.
+    Each thread uses its own connection.
+    """
+
+    def __init__(self, db_file, data_file):
+        self.db_file = db_file
+        self.data_file = data_file
+        self._local = threading.local()
+        self.loaded = False
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.db_file)
+        return conn
+
+    def load(self):
+        """Create the schema and seed it from data.json unless it already holds that version of data.json.
+
+        A database bulk-loaded by generate_data.py is kept as is; one seeded from
+        an older data.json (different path, size or mtime) is reseeded.
+        """
+        conn = self.conn
+        conn.executescript(SCHEMA)
+        conn.execute("BEGIN IMMEDIATE")  # serialises seeding across workers
+        try:
+            meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+            if "seeded_from" not in meta:
+                self._seed(conn)
+                logging.info(f"🗄️ DB SEEDED: {self.db_file} from {self.data_file}")
+            elif "source_fingerprint" in meta and os.path.exists(self.data_file) \
+                    and json.loads(meta["source_fingerprint"]) != file_fingerprint(self.data_file):
+                logging.warning(f"⚠️ {self.data_file} changed since {self.db_file} was seeded from it, reseeding")
+                conn.execute("DELETE FROM users")
+                conn.execute("DELETE FROM bookings")
+                self._seed(conn)
+                logging.info(f"🗄️ DB RESEEDED: {self.db_file} from {self.data_file}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self.loaded = True
+
+    def _seed(self, conn):
+        if not os.path.exists(self.data_file):
+            raise FileNotFoundError(f"Data file not found: {self.data_file}")
+        fingerprint = file_fingerprint(self.data_file)
+        with open(self.data_file, "r") as f:
+            data = json.load(f)
+        self._insert(conn, data.get("users", []), data.get("bookings", []), self.data_file)
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('source_fingerprint', ?)", (json.dumps(fingerprint),))
+
+    def bulk_load(self, users, bookings, source):
+        """Replace all rows with ``users`` and ``bookings`` (iterables, consumed lazily) in one transaction."""
+        conn = self.conn
+        conn.executescript(SCHEMA)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM users")
+            conn.execute("DELETE FROM bookings")
+            conn.execute("DELETE FROM meta")
+            self._insert(conn, users, bookings, source)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _insert(conn, users, bookings, source):
+        conn.executemany(INSERT_USER, ([user.get(column) for column in USER_COLUMNS] for user in users))
+        conn.executemany(INSERT_BOOKING, ([booking.get(column) for column in BOOKING_COLUMNS] for booking in bookings))
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('seeded_from', ?)", (source,))
+
+    def close(self):
+        """Close this thread's connection (other threads' connections close with the thread)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def counts(self):
+        users = self.conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        bookings = self.conn.execute("SELECT COUNT(*) FROM bookings").fetchone()[0]
+        return users, bookings
+
+    # -----------------------
+    # Lookups
+    # -----------------------
+
+    def get_user(self, user_id):
+        row = self.conn.execute(SELECT_USER, (user_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def find_user(self, username):
+        row = self.conn.execute(SELECT_USER_BY_USERNAME, (username,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def get_booking(self, booking_id):
+        row = self.conn.execute(SELECT_BOOKING, (booking_id,)).fetchone()
+        return _booking_from_row(row) if row is not None else None
+
+    # -----------------------
+    # Mutations
+    # -----------------------
+
+    def _update(self, table, columns, select, row_id, fields, from_row):
+        assignments = tuple(column for column in fields if column in columns and column != "id")
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(select, (row_id,)).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return None
+            if assignments:
+                conn.execute(_update_statement(table, assignments), [fields[column] for column in assignments] + [row_id])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return from_row(row)
+
+    def update_user(self, user_id, fields):
+        """Apply ``fields`` to a user. Returns the previous values or None if missing."""
+        return self._update("users", USER_COLUMNS, SELECT_USER, user_id, fields, dict)
+
+    def update_booking(self, booking_id, fields):
+        """Apply ``fields`` to a booking. Returns the previous values or None if missing."""
+        return self._update("bookings", BOOKING_COLUMNS, SELECT_BOOKING, booking_id, fields, _booking_from_row)
+
+    def delete_booking(self, booking_id):
+        """Remove a booking. Returns the removed booking or None if missing."""
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(SELECT_BOOKING, (booking_id,)).fetchone()
+            if row is not None:
+                conn.execute(DELETE_BOOKING, (booking_id,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return _booking_from_row(row) if row is not None else None
+
+
+class CacheInvalidationBus:
+    """Propagates booking-cache invalidations between server processes.
+
+    ``publish`` appends to the shared ``invalidations`` table; a background
+    thread in every process polls it every ``poll_interval`` seconds and drops
+    the affected entries (``booking_id`` NULL clears the whole cache) from its
+    local cache. Rows older than ``retention`` seconds are pruned. Each drop
+    bumps that booking's cache version, so a request that read the row before
+    the write cannot put the old value back afterwards.
+    """
+
+    def __init__(self, db_file, cache, poll_interval=0.1, retention=60.0):
+        self.db_file = db_file
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._local = threading.local()
+        self._last_id = 0
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.db_file)
+        return conn
+
+    def publish(self, booking_id=None):
+        """Tell every process to drop ``booking_id`` (or everything) from its booking cache."""
+        self.conn.execute("INSERT INTO invalidations (booking_id, created_at) VALUES (?, ?)",
+                          (booking_id, time.time()))
+
+    def start(self):
+        if self._thread is None:
+            # Only invalidations published from now on matter; the cache starts empty
+            self._last_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM invalidations").fetchone()[0]
+            self._thread = threading.Thread(target=self._run, name="cache-invalidation", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        last_prune = time.monotonic()
+        while not self._stopped.wait(self.poll_interval):
+            try:
+                self.poll()
+                if time.monotonic() - last_prune > self.retention:
+                    self.conn.execute("DELETE FROM invalidations WHERE created_at < ?", (time.time() - self.retention,))
+                    last_prune = time.monotonic()
+            except sqlite3.Error as e:
+                logging.error(f"⚠️ Error polling cache invalidations: {e}")
+
+    def poll(self):
+        rows = self.conn.execute("SELECT id, booking_id FROM invalidations WHERE id > ? ORDER BY id",
+                                 (self._last_id,)).fetchall()
+        for row in rows:
+            if row["booking_id"] is None:
+                self.cache.clear()
+            else:
+                self.cache.pop(row["booking_id"])
+            self._last_id = row["id"]
@@ -0,0 +1,71 @@
+import atexit
+
+try:
+    from .persistence import WriteBehindPersister
+    from .sqlite_store import SQLiteStore
+    from .store import DataStore
+except ImportError:  # started from inside mock_api/ as `uvicorn api:app`
+    from persistence import WriteBehindPersister
+    from sqlite_store import SQLiteStore
+    from store import DataStore
+
+STORAGE_ENGINES = ("memory", "sqlite")
+
+
+class MemoryEngine:
+    """In-memory dicts seeded from data.json, made durable by the write-behind persister (change log + snapshots)."""
+
+    name = "memory"
+    blocking_writes = False  # mutations are dict updates; no need to leave the event loop
+    blocking_reads = False  # lookups are dict gets
+
+    def __init__(self, data_file, snapshot_file, persist_interval=5.0, dirty_threshold=1000):
+        self.store = DataStore(data_file)
+        self.persister = WriteBehindPersister(self.store, snapshot_file, interval=persist_interval,
+                                              dirty_threshold=dirty_threshold)
+        self.store.journal = self.persister.record
+
+    def open(self):
+        self.persister.load()
+        self.persister.start()
+        atexit.register(self.persister.stop)
+
+    def close(self):
+        self.persister.stop()
+
+    def describe(self):
+        return f"{len(self.store.users_by_id)} users, {len(self.store.bookings_by_id)} bookings in memory"
+
+
+class SQLiteEngine:
+    """SQLite database in WAL mode with row-level writes, durable on commit."""
+
+    name = "sqlite"
+    blocking_writes = True  # a write may wait for another connection's transaction
+    blocking_reads = True  # a read may wait on a WAL checkpoint or a busy database
+
+    def __init__(self, db_file, data_file):
+        self.store = SQLiteStore(db_file, data_file)
+
+    def open(self):
+        self.store.load()
+
+    def close(self):
+        self.store.close()
+
+    def describe(self):
+        users, bookings = self.store.counts()
+        return f"{users} users, {bookings} bookings in {self.store.db_file}"
+
+
+def create_engine(settings):
+    """Build the storage engine selected by ``settings.STORAGE_ENGINE``."""
+    if settings.STORAGE_ENGINE not in STORAGE_ENGINES:
+        raise ValueError(f"Unknown STORAGE_ENGINE '{settings.STORAGE_ENGINE}', expected one of {STORAGE_ENGINES}")
+    if settings.SHARED_STATE and settings.STORAGE_ENGINE != "sqlite":
+        raise ValueError("MOCK_API_SHARED_STATE=1 needs STORAGE_ENGINE=sqlite")
+
+    if settings.STORAGE_ENGINE == "sqlite":
+        return SQLiteEngine(settings.DB_FILE, settings.DATA_FILE)
+    return MemoryEngine(settings.DATA_FILE, settings.SNAPSHOT_FILE, persist_interval=settings.PERSIST_INTERVAL,
+                        dirty_threshold=settings.PERSIST_DIRTY_THRESHOLD)
@@ -0,0 +1,136 @@
+import json
+import os
+import threading
+
+
+class DataStore:
+    """Process-wide in-memory store for users and bookings.
+
+    data.json is parsed once; every lookup afterwards is an O(1) dict access.
+    Writers serialise on an internal lock so indexes never drift apart. Each
+    mutation is handed to ``journal`` (if set) as a change record that
+    ``apply`` can replay.
+
+    Records are copy-on-write: a mutation swaps in an updated dict instead of
+    changing the stored one, so ``to_dict`` only has to collect references
+    under the lock and the copy can be serialised without blocking writers.
+    """
+
+    def __init__(self, data_file, journal=None):
+        self.data_file = data_file
+        self.journal = journal
+        self._lock = threading.RLock()
+        self.users_by_id = {}
+        self.users_by_username = {}
+        self.bookings_by_id = {}
+        self.loaded = False
+
+    def load(self, path=None):
+        """Read data.json (or a snapshot of it at ``path``) once and build the indexes.
+
+        Returns the ``source`` entry a snapshot records (None for data.json itself).
+        """
+        path = path or self.data_file
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Data file not found: {path}")
+
+        with open(path, "r") as f:
+            data = json.load(f)
+
+        with self._lock:
+            self.users_by_id = {user["id"]: user for user in data.get("users", [])}
+            self.users_by_username = {user["username"]: user for user in self.users_by_id.values()}
+            self.bookings_by_id = {booking["id"]: booking for booking in data.get("bookings", [])}
+            self.loaded = True
+        return data.get("source")
+
+    # -----------------------
+    # Lookups
+    # -----------------------
+
+    def get_user(self, user_id):
+        return self.users_by_id.get(user_id)
+
+    def find_user(self, username):
+        return self.users_by_username.get(username)
+
+    def get_booking(self, booking_id):
+        return self.bookings_by_id.get(booking_id)
+
+    # -----------------------
+    # Mutations
+    # -----------------------
+
+    def update_user(self, user_id, fields):
+        """Apply ``fields`` to a user. Returns the previous values or None if missing."""
+        with self._lock:
+            old_user = self._update_user(user_id, fields)
+            if old_user is not None:
+                self._record({"op": "update_user", "id": user_id, "fields": fields})
+            return old_user
+
+    def update_booking(self, booking_id, fields):
+        """Apply ``fields`` to a booking. Returns the previous values or None if missing."""
+        with self._lock:
+            old_booking = self._update_booking(booking_id, fields)
+            if old_booking is not None:
+                self._record({"op": "update_booking", "id": booking_id, "fields": fields})
+            return old_booking
+
+    def delete_booking(self, booking_id):
+        """Remove a booking. Returns the removed booking or None if missing."""
+        with self._lock:
+            booking = self.bookings_by_id.pop(booking_id, None)
+            if booking is not None:
+                self._record({"op": "delete_booking", "id": booking_id})
+            return booking
+
+    def _update_user(self, user_id, fields):
+        user = self.users_by_id.get(user_id)
+        if user is not None:
+            updated = {**user, **fields}
+            self.users_by_id[user_id] = updated
+            if updated["username"] != user["username"]:
+                self.users_by_username.pop(user["username"], None)
+            self.users_by_username[updated["username"]] = updated
+        return user
+
+    def _update_booking(self, booking_id, fields):
+        booking = self.bookings_by_id.get(booking_id)
+        if booking is not None:
+            self.bookings_by_id[booking_id] = {**booking, **fields}
+        return booking
+
+    def _record(self, change):
+        if self.journal is not None:
+            self.journal(change)
+
+    def apply(self, change):
+        """Replay a change record produced by a mutation, without journalling it again."""
+        with self._lock:
+            op = change["op"]
+            if op == "update_user":
+                self._update_user(change["id"], change["fields"])
+            elif op == "update_booking":
+                self._update_booking(change["id"], change["fields"])
+            elif op == "delete_booking":
+                self.bookings_by_id.pop(change["id"], None)
+
+    def to_dict(self):
+        """Consistent view of the dataset in the data.json layout.
+
+        Only the lists of record references are built under the lock; the
+        records themselves are never modified once stored, so the result can
+        be serialised while writers carry on.
+        """
+        with self._lock:
+            return {
+                "users": list(self.users_by_id.values()),
+                "bookings": list(self.bookings_by_id.values()),
+            }
+
+
+def file_fingerprint(path):
+    """Identify one version of a seed file by its path, size and modification time."""
+    stat = os.stat(path)
+    return {"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
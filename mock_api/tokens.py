@@ -0,0 +1,103 @@
+import base64
+import hashlib
+import hmac
+import time
+
+try:
+    from .cache import LRUCache
+except ImportError:  # started from inside mock_api/ as `uvicorn api:app`
+    from cache import LRUCache
+
+PASSWORD_HASHES = ("plain", "pbkdf2")
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class TokenService:
+    """Issues HMAC-SHA256 signed bearer tokens and verifies them.
+
+    A token is ``<base64(username:expires_at)>.<base64(signature)>``, so any
+    process sharing the secret can verify it without server-side sessions.
+    Verified tokens are kept in an LRU cache, so repeat requests cost a dict
+    lookup and an expiry check instead of a decode and HMAC.
+    """
+
+    def __init__(self, secret, ttl=3600, cache_max_entries=10000, clock=time.time):
+        self._key = secret.encode("utf-8")
+        self.ttl = ttl
+        self._clock = clock
+        self.cache = LRUCache(max_entries=cache_max_entries)
+
+    def _sign(self, payload):
+        return hmac.new(self._key, payload, hashlib.sha256).digest()
+
+    def issue(self, username):
+        payload = f"{username}:{int(self._clock()) + self.ttl}".encode("utf-8")
+        return f"{_b64encode(payload)}.{_b64encode(self._sign(payload))}"
+
+    def verify(self, token):
+        """Return the claims (``sub``, ``exp``) of a valid token or raise InvalidToken."""
+        claims = self.cache.get(token)
+        if claims is None:
+            claims = self._decode(token)
+            self.cache.put(token, claims)
+
+        if claims["exp"] <= self._clock():
+            self.cache.pop(token)
+            raise InvalidToken("Token expired")
+        return claims
+
+    def _decode(self, token):
+        try:
+            encoded_payload, encoded_signature = token.split(".")
+            payload = _b64decode(encoded_payload)
+            signature = _b64decode(encoded_signature)
+        except ValueError:
+            raise InvalidToken("Malformed token")
+
+        if not hmac.compare_digest(signature, self._sign(payload)):
+            raise InvalidToken("Bad signature")
+
+        username, _, expires_at = payload.decode("utf-8").rpartition(":")
+        if not username or not expires_at.isdigit():
+            raise InvalidToken("Malformed token")
+        return {"sub": username, "exp": int(expires_at)}
+
+
+class PasswordChecker:
+    """Checks passwords in plain text or against PBKDF2-SHA256 hashes.
+
+    data.json stores plain passwords, so in ``pbkdf2`` mode the stored hash is
+    derived once per user and remembered; every check then hashes the supplied
+    password, which is the cost a real login pays.
+    """
+
+    def __init__(self, mode="plain", iterations=100_000):
+        if mode not in PASSWORD_HASHES:
+            raise ValueError(f"Unknown password hash '{mode}', expected one of {PASSWORD_HASHES}")
+        self.mode = mode
+        self.iterations = iterations
+        self._stored_hashes = {}  # (username, stored password) -> hash
+
+    def _hash(self, username, password):
+        return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), username.encode("utf-8"), self.iterations)
+
+    def check(self, user, password):
+        if self.mode == "plain":
+            return hmac.compare_digest(user["password"].encode("utf-8"), password.encode("utf-8"))
+
+        key = (user["username"], user["password"])
+        stored = self._stored_hashes.get(key)
+        if stored is None:
+            stored = self._stored_hashes[key] = self._hash(*key)
+        return hmac.compare_digest(stored, self._hash(user["username"], password))
@@ -0,0 +1,90 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+UPLOAD_MODES = ("disk", "memory", "discard")
+
+
+class UploadStore:
+    """Content-addressed sink for uploaded profile photos.
+
+    Uploads are streamed in ``chunk_size`` pieces and named after their
+    SHA-256 digest, so re-uploading the same photo is deduplicated.
+
+    - ``disk``: keep one file per distinct photo in ``upload_dir``
+    - ``memory``: keep one in-memory copy per distinct photo
+    - ``discard``: hash and count the bytes only, for pure-throughput runs
+    """
+
+    def __init__(self, upload_dir, mode="disk", chunk_size=256 * 1024):
+        if mode not in UPLOAD_MODES:
+            raise ValueError(f"Unknown upload mode '{mode}', expected one of {UPLOAD_MODES}")
+        self.upload_dir = upload_dir
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.blobs = {}  # digest -> bytes (memory mode)
+        self._lock = threading.Lock()
+
+    def save(self, source, extension=""):
+        """Stream ``source`` into the sink (blocking; run in the thread pool).
+
+        Returns the stored filename, byte count, elapsed seconds and whether the
+        content was already present.
+        """
+        start = time.perf_counter()
+        if self.mode == "disk":
+            digest, size, deduplicated = self._save_to_disk(source, extension)
+        else:
+            digest, size, deduplicated = self._save_to_memory(source)
+        elapsed = time.perf_counter() - start
+
+        return {
+            "filename": f"{digest}{extension}",
+            "bytes": size,
+            "elapsed": elapsed,
+            "deduplicated": deduplicated,
+        }
+
+    def _save_to_disk(self, source, extension):
+        digest = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(prefix=".upload-", dir=self.upload_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                while chunk := source.read(self.chunk_size):
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+
+            file_path = os.path.join(self.upload_dir, f"{digest.hexdigest()}{extension}")
+            if os.path.exists(file_path):
+                os.remove(temp_path)
+                return digest.hexdigest(), size, True
+            os.replace(temp_path, file_path)
+            return digest.hexdigest(), size, False
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _save_to_memory(self, source):
+        digest = hashlib.sha256()
+        size = 0
+        chunks = [] if self.mode == "memory" else None
+        while chunk := source.read(self.chunk_size):
+            digest.update(chunk)
+            size += len(chunk)
+            if chunks is not None:
+                chunks.append(chunk)
+
+        key = digest.hexdigest()
+        if chunks is None:
+            return key, size, False
+
+        with self._lock:
+            if key in self.blobs:
+                return key, size, True
+            self.blobs[key] = b"".join(chunks)
+        return key, size, False
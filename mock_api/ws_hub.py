@@ -0,0 +1,192 @@
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+
+try:
+    from .perf_logging import log_event
+except ImportError:  # started from inside mock_api/ as `uvicorn api:app`
+    from perf_logging import log_event
+
+SLOW_CONSUMER_POLICIES = ("drop_oldest", "drop_newest", "disconnect")
+# Outcomes of WebSocketConnection.send
+QUEUED = "queued"
+EVICTED = "evicted"  # queued, after discarding the oldest queued message
+DROPPED = "dropped"
+
+
+class WebSocketConnection:
+    """One client socket with a bounded send queue drained by its own writer task.
+
+    Producers (echo replies, broadcasts, server pings) only enqueue, so a slow
+    client never stalls the event loop or other clients; when its queue is full
+    the hub's slow-consumer policy decides what gives.
+    """
+
+    def __init__(self, websocket, hub):
+        self.websocket = websocket
+        self.hub = hub
+        self.queue = asyncio.Queue(maxsize=hub.queue_size)  # (enqueued_at, text)
+        self.topics = set()
+        self.sent = 0
+        self.dropped = 0
+        self.evicted = 0
+        self.closing = False
+        self._tasks = []
+
+    def start(self):
+        self._tasks.append(asyncio.create_task(self._writer()))
+        if self.hub.ping_interval > 0:
+            self._tasks.append(asyncio.create_task(self._pinger()))
+
+    async def send(self, text):
+        """Queue ``text`` for this client. Returns QUEUED, EVICTED or DROPPED."""
+        if self.closing:
+            return DROPPED
+        item = (time.perf_counter(), text)
+        try:
+            self.queue.put_nowait(item)
+            return QUEUED
+        except asyncio.QueueFull:
+            pass
+
+        if self.hub.policy == "drop_newest":
+            self._drop(1)
+            return DROPPED
+        if self.hub.policy == "drop_oldest":
+            self.queue.get_nowait()
+            self.queue.put_nowait(item)
+            self.evicted += 1
+            self.hub.evicted += 1
+            return EVICTED
+
+        # "disconnect": shed the slow consumer entirely
+        self.closing = True
+        self._drop(self.queue.qsize() + 1)
+        self.hub.slow_disconnects += 1
+        log_event("ws_slow_consumer", logging.WARNING, "🐢 SLOW CONSUMER DISCONNECTED: queue full (%s)",
+                  self.hub.queue_size)
+        await self.stop()  # the writer may be inside send_text; it must not race the close
+        try:
+            await self.websocket.close(code=1008)
+        except Exception:
+            pass  # already gone
+        return DROPPED
+
+    def _drop(self, count):
+        self.dropped += count
+        self.hub.dropped += count
+
+    async def _writer(self):
+        try:
+            while True:
+                enqueued_at, text = await self.queue.get()
+                await self.websocket.send_text(text)
+                self.sent += 1
+                self.hub.record_send(time.perf_counter() - enqueued_at)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Socket is gone; the receive loop notices and unregisters us
+            self.closing = True
+            log_event("ws_send_error", logging.WARNING, "⚠️ WEBSOCKET SEND FAILED: %s", e)
+
+    async def _pinger(self):
+        while True:
+            await asyncio.sleep(self.hub.ping_interval)
+            await self.send(json.dumps({"type": "ping", "ts": time.time()}))
+
+    async def stop(self):
+        """Cancel the writer and pinger and wait for them, except the task calling us (a pinger send)."""
+        self.closing = True
+        current = asyncio.current_task()
+        tasks = [task for task in self._tasks if task is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class WebSocketHub:
+    """Tracks connections and topic subscriptions, fans out broadcasts and keeps send stats."""
+
+    def __init__(self, queue_size=100, policy="drop_oldest", ping_interval=20.0, latency_window=1024):
+        if policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow-consumer policy '{policy}', expected one of {SLOW_CONSUMER_POLICIES}")
+        self.queue_size = queue_size
+        self.policy = policy
+        self.ping_interval = ping_interval
+        self.connections = set()
+        self.topics = {}  # topic -> set of connections
+        self.dropped = 0
+        self.evicted = 0
+        self.slow_disconnects = 0
+        self.total_connections = 0
+        self.messages_sent = 0
+        self._send_latencies = deque(maxlen=latency_window)  # seconds, most recent sends
+
+    def register(self, websocket):
+        connection = WebSocketConnection(websocket, self)
+        self.connections.add(connection)
+        self.total_connections += 1
+        connection.start()
+        return connection
+
+    async def unregister(self, connection):
+        """Forget ``connection`` and stop its tasks. Safe to call more than once."""
+        self.connections.discard(connection)
+        for topic in connection.topics:
+            subscribers = self.topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(connection)
+                if not subscribers:
+                    del self.topics[topic]
+        connection.topics.clear()
+        await connection.stop()
+
+    def subscribe(self, connection, topic):
+        connection.topics.add(topic)
+        self.topics.setdefault(topic, set()).add(connection)
+
+    def unsubscribe(self, connection, topic):
+        connection.topics.discard(topic)
+        subscribers = self.topics.get(topic)
+        if subscribers is not None:
+            subscribers.discard(connection)
+            if not subscribers:
+                del self.topics[topic]
+
+    async def broadcast(self, text, topic=None):
+        """Queue ``text`` for every subscriber of ``topic`` (or every client) concurrently."""
+        targets = list(self.topics.get(topic, ()) if topic is not None else self.connections)
+        results = await asyncio.gather(*(connection.send(text) for connection in targets), return_exceptions=True)
+        evicted = sum(1 for result in results if result == EVICTED)
+        queued = sum(1 for result in results if result == QUEUED) + evicted
+        return {"recipients": len(targets), "queued": queued, "dropped": len(targets) - queued, "evicted": evicted}
+
+    def record_send(self, latency):
+        self.messages_sent += 1
+        self._send_latencies.append(latency)
+
+    def stats(self):
+        depths = [connection.queue.qsize() for connection in self.connections]
+        latencies = sorted(self._send_latencies)
+
+        def percentile(p):
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 3) if latencies else 0.0
+
+        return {
+            "connections": len(self.connections),
+            "total_connections": self.total_connections,
+            "topics": {topic: len(subscribers) for topic, subscribers in self.topics.items()},
+            "policy": self.policy,
+            "queue_size": self.queue_size,
+            "queued_messages": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "messages_sent": self.messages_sent,
+            "dropped": self.dropped,
+            "evicted": self.evicted,
+            "slow_disconnects": self.slow_disconnects,
+            "send_latency_ms": {"p50": percentile(0.50), "p95": percentile(0.95), "p99": percentile(0.99),
+                                "max": percentile(1.0)},
+        }
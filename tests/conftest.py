@@ -0,0 +1,58 @@
+"""
+Shared fixtures: the Locust helpers are imported the way Locust loads them (flat
+modules from locust_tests/), and integration tests run against a real Mock API
+started with uvicorn on a free port.
+"""
+
+import locust  # noqa: F401 - monkey-patches sockets for gevent, as in a Locust run
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "locust_tests"))
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture(scope="session")
+def mock_api(tmp_path_factory):
+    """Base URL of a Mock API serving a small generated data.json."""
+    data_file = tmp_path_factory.mktemp("mock_api") / "data.json"
+    data_file.write_text(json.dumps({
+        "users": [{"id": i, "username": f"user{i}", "password": "password", "email": f"user{i}@example.com",
+                   "profile_photo": "photo1.jpg"} for i in range(1, 11)],
+        "bookings": [{"id": i, "firstname": "Alice", "lastname": "Smith", "totalprice": 100, "depositpaid": True,
+                      "checkin": "2025-01-01", "checkout": "2025-01-02", "additionalneeds": "None"}
+                     for i in range(1, 11)],
+    }))
+    port = _free_port()
+    env = dict(os.environ, MOCK_API_DATA_FILE=str(data_file), LOG_PROFILE="perf")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "mock_api.api:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 20
+        while True:
+            try:
+                requests.get(f"{base_url}/ws/stats", timeout=1)
+                break
+            except requests.ConnectionError:
+                if server.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("Mock API did not start")
+                time.sleep(0.1)
+        yield base_url
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
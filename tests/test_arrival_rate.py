@@ -0,0 +1,54 @@
+import gevent
+
+from arrival_rate import ArrivalScheduler, RateProfile
+
+
+class StallingClock:
+    """Fake clock that loses ``stall`` seconds right after the scheduler reads its start time."""
+
+    def __init__(self, stall):
+        self.now = 0.0
+        self.stall = stall
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls == 2:
+            self.now += self.stall
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+        gevent.sleep(0)  # let the spawned requests run, as a real sleep would
+
+
+def request():
+    gevent.sleep(0)  # completes as soon as the scheduler yields again
+
+
+def test_catching_up_after_a_stall_sends_late_instead_of_dropping():
+    clock = StallingClock(stall=0.5)
+    profile = RateProfile("constant", start_rps=100, duration=1.0)
+    scheduler = ArrivalScheduler(profile, request, max_in_flight=5, clock=clock, sleep=clock.sleep)
+
+    scheduler.run()
+
+    assert scheduler.scheduled == 100
+    assert scheduler.dropped == 0
+    assert scheduler.sent == 100
+    assert 45 <= scheduler.late <= 50  # the arrivals due during the stall
+    assert scheduler.max_lag >= 0.45
+
+
+def test_arrivals_beyond_the_in_flight_budget_are_dropped():
+    clock = StallingClock(stall=0.0)
+    profile = RateProfile("constant", start_rps=100, duration=0.5)
+    scheduler = ArrivalScheduler(profile, lambda: gevent.sleep(10), max_in_flight=5,
+                                 clock=clock, sleep=clock.sleep)
+
+    gevent.spawn(scheduler.run)
+    gevent.sleep(0.05)  # real time: the scheduler runs through its fake schedule, requests never finish
+    scheduler.pool.kill()
+
+    assert scheduler.scheduled == 50
+    assert (scheduler.sent, scheduler.dropped) == (5, 45)
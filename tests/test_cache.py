@@ -0,0 +1,57 @@
+from mock_api.cache import LRUCache
+from mock_api.sqlite_store import SCHEMA, CacheInvalidationBus, connect
+
+
+def test_put_skips_fills_read_before_an_invalidation():
+    cache = LRUCache()
+    version = cache.version(1)
+    cache.pop(1)  # another request invalidates booking 1 while this one reads it
+
+    assert cache.put(1, {"firstname": "old"}, version) is False
+    assert 1 not in cache
+    assert cache.stats()["stale_fills"] == 1
+
+    assert cache.put(1, {"firstname": "new"}, cache.version(1)) is True
+    assert cache.get(1) == {"firstname": "new"}
+
+
+def test_invalidating_one_key_does_not_block_fills_of_others():
+    cache = LRUCache()
+    version = cache.version(1)
+    cache.pop(2)
+
+    assert cache.put(1, {"firstname": "old"}, version) is True
+    assert cache.stats()["stale_fills"] == 0
+
+
+def test_clear_blocks_every_fill_in_flight():
+    cache = LRUCache(max_entries=2)
+    versions = {key: cache.version(key) for key in (1, 2, 3)}
+    cache.pop(1)
+    cache.clear()
+
+    assert [cache.put(key, {}, versions[key]) for key in (1, 2, 3)] == [False, False, False]
+    cache.pop(1)  # versions taken after the clear still tell a fresh pop apart
+    assert cache.put(2, {}, cache.version(2)) is True
+
+
+def test_version_table_stays_bounded():
+    cache = LRUCache(max_entries=10)
+    for key in range(1000):
+        cache.pop(key)
+    assert len(cache._popped) <= 10
+
+
+def test_cross_worker_invalidation_between_read_and_fill_is_not_undone(tmp_path):
+    db_file = str(tmp_path / "data.db")
+    connect(db_file).executescript(SCHEMA)
+    cache_a, cache_b = LRUCache(), LRUCache()
+    bus_a, bus_b = CacheInvalidationBus(db_file, cache_a), CacheInvalidationBus(db_file, cache_b)
+
+    version = cache_b.version(7)  # worker B misses and reads the old row
+    old_row = {"id": 7, "firstname": "old"}
+    bus_a.publish(7)  # worker A commits an update and publishes it
+    bus_b.poll()  # B's poller applies it before B fills its cache
+
+    assert not cache_b.put(7, old_row, version)
+    assert cache_b.get(7) is None
@@ -0,0 +1,34 @@
+import pytest
+
+from data_loader import CompactDataset, write_compact_dataset
+
+USERS = [{"id": i, "username": f"user{i}", "email": f"ü{i}@example.com"} for i in range(1, 4)]
+BOOKINGS = [{"id": 1, "firstname": "Alice", "depositpaid": True}]
+
+
+def test_compact_dataset_round_trips_records(tmp_path):
+    path = str(tmp_path / "data.lcds")
+    write_compact_dataset(path, (user for user in USERS), iter(BOOKINGS))  # any iterables, consumed once
+
+    data = CompactDataset(path).as_dict()
+    assert len(data["users"]) == 3 and len(data["bookings"]) == 1
+    assert list(data["users"]) == USERS
+    assert data["users"][-1] == USERS[-1]
+    assert data["bookings"][0] == BOOKINGS[0]
+    with pytest.raises(IndexError):
+        data["users"][3]
+
+
+def test_empty_sections_are_allowed(tmp_path):
+    path = str(tmp_path / "data.lcds")
+    write_compact_dataset(path, USERS, [])
+    dataset = CompactDataset(path)
+    assert len(dataset.users) == 3
+    assert list(dataset.bookings) == []
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "data.lcds"
+    path.write_bytes(b'{"users": [], "bookings": []}')
+    with pytest.raises(ValueError):
+        CompactDataset(str(path))
@@ -0,0 +1,55 @@
+import random
+from collections import Counter
+
+from mutations import BookingMutator
+
+
+def booking():
+    return {"firstname": "Alice", "lastname": "Brown", "totalprice": 100, "depositpaid": True,
+            "checkin": "2025-01-01", "checkout": "2025-02-01", "additionalneeds": "None"}
+
+
+def test_every_mutation_changes_exactly_one_field():
+    mutator = BookingMutator()
+    rng = random.Random(7)
+    current = booking()
+    for _ in range(2000):
+        before = dict(current)
+        field, value = mutator.mutate(current, rng)
+        assert value != before[field] and current[field] == value
+        assert {k for k in current if current[k] != before[k]} == {field}
+
+
+def test_new_values_are_uniform_over_the_other_entries():
+    mutator = BookingMutator()
+    rng = random.Random(11)
+    seen = Counter()
+    for _ in range(30000):
+        current = booking()
+        field, value = mutator.mutate(current, rng)
+        if field == "firstname":
+            seen[value] += 1
+
+    assert set(seen) == {"Bob", "Charlie", "David"}
+    assert max(seen.values()) - min(seen.values()) < 0.1 * sum(seen.values()) / 3
+
+
+def test_values_outside_the_table_are_replaced():
+    mutator = BookingMutator()
+    rng = random.Random(3)
+    current = dict(booking(), firstname="Zoe")
+    while True:
+        field, value = mutator.mutate(current, rng)
+        if field == "firstname":
+            assert value in ("Alice", "Bob", "Charlie", "David")
+            break
+
+
+def test_batch_is_the_same_as_successive_mutations():
+    mutator = BookingMutator()
+    batched, stepped = booking(), booking()
+    changes = mutator.batch(batched, 50, random.Random(9))
+
+    rng = random.Random(9)
+    assert changes == [mutator.mutate(stepped, rng) for _ in range(50)]
+    assert batched == stepped
@@ -0,0 +1,24 @@
+from partitioning import UserPartitioner
+
+
+def test_indexes_follow_the_worker_partition_and_wrap():
+    partitioner = UserPartitioner()
+    partitioner.assign(1, 2)
+    assert [partitioner.next_index(available=6) for _ in range(4)] == [1, 3, 5, 1]
+
+
+def test_released_slots_are_reused_before_new_ones():
+    partitioner = UserPartitioner()
+    first = [partitioner.next_index() for _ in range(3)]
+    partitioner.release(first[1])
+
+    assert partitioner.next_index() == first[1]  # a respawned user gets the same slot (and username)
+    assert partitioner.next_index() == 3
+
+
+def test_reassigning_the_partition_drops_released_slots():
+    partitioner = UserPartitioner()
+    partitioner.release(partitioner.next_index())
+    partitioner.assign(0, 2)
+    assert partitioner.next_index() == 0
+    assert partitioner.next_index() == 2
@@ -0,0 +1,73 @@
+import json
+import os
+
+from mock_api.persistence import WriteBehindPersister
+from mock_api.store import DataStore
+
+
+def write_seed(path, firstname="Alice"):
+    path.write_text(json.dumps({
+        "users": [{"id": 1, "username": "user1", "password": "password"}],
+        "bookings": [{"id": 1, "firstname": firstname}, {"id": 2, "firstname": firstname}],
+    }, indent=4))
+    return str(path)
+
+
+def open_store(tmp_path):
+    store = DataStore(str(tmp_path / "data.json"))
+    persister = WriteBehindPersister(store, str(tmp_path / "data.snapshot.json"), interval=3600)
+    store.journal = persister.record
+    persister.load()
+    return store, persister
+
+
+def test_changes_survive_a_restart_without_rewriting_the_seed(tmp_path):
+    seed = write_seed(tmp_path / "data.json")
+    with open(seed) as f:
+        seed_text = f.read()
+    store, persister = open_store(tmp_path)
+    store.update_booking(1, {"firstname": "Bob"})
+    store.delete_booking(2)
+    persister.stop()
+
+    with open(seed) as f:
+        assert f.read() == seed_text
+    store, persister = open_store(tmp_path)
+    assert store.get_booking(1)["firstname"] == "Bob"
+    assert store.get_booking(2) is None
+
+
+def test_leftover_change_log_is_replayed(tmp_path):
+    write_seed(tmp_path / "data.json")
+    store, persister = open_store(tmp_path)
+    store.update_user(1, {"email": "new@example.com"})
+    persister._append_pending()  # the process dies before the next compaction
+
+    store, persister = open_store(tmp_path)
+    assert store.get_user(1)["email"] == "new@example.com"
+    assert not os.path.exists(persister.log_file)  # replayed changes are compacted straight away
+
+
+def test_snapshot_of_an_older_seed_is_discarded(tmp_path):
+    write_seed(tmp_path / "data.json")
+    store, persister = open_store(tmp_path)
+    store.update_booking(1, {"firstname": "Bob"})
+    persister.stop()
+
+    write_seed(tmp_path / "data.json", firstname="Carol" * 2)  # generate_data.py run again
+    store, persister = open_store(tmp_path)
+    assert store.get_booking(1)["firstname"] == "CarolCarol"
+    assert not os.path.exists(persister.snapshot_file)
+
+
+def test_snapshot_view_is_not_changed_by_later_writes(tmp_path):
+    write_seed(tmp_path / "data.json")
+    store, persister = open_store(tmp_path)
+    snapshot = store.to_dict()
+    store.update_booking(1, {"firstname": "Bob"})
+    store.update_user(1, {"username": "renamed"})
+
+    assert snapshot["bookings"][0]["firstname"] == "Alice"
+    assert snapshot["users"][0]["username"] == "user1"
+    assert store.find_user("renamed")["id"] == 1
+    assert store.find_user("user1") is None
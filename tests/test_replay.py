@@ -0,0 +1,55 @@
+import json
+
+from mock_api.capture import sort_trace
+from replay import TraceFeed, reorder
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def write_trace(path, times):
+    path.write_text("".join(json.dumps({"t": t, "path": f"/r/{i}"}) + "\n" for i, t in enumerate(times)))
+    return str(path)
+
+
+def test_reorder_sorts_records_within_the_window():
+    records = [{"t": t} for t in (1.0, 1.3, 1.1, 2.0, 1.9, 5.0)]
+    assert [r["t"] for r in reorder(iter(records), window=0.5)] == [1.0, 1.1, 1.3, 1.9, 2.0, 5.0]
+
+
+def test_out_of_order_lines_are_replayed_in_start_order_and_on_time(tmp_path):
+    # Written in completion order: the request that started at +0.2s finished last
+    trace = write_trace(tmp_path / "trace.jsonl", [1000.0, 1000.1, 1000.3, 1000.2])
+    clock = FakeClock()
+    feed = TraceFeed(trace, reorder_window=1.0, clock=clock, sleep=clock.sleep)
+
+    sent_at = [(feed.next()["t"], round(clock.now - 100.0, 6)) for _ in range(4)]
+    assert sent_at == [(1000.0, 0.0), (1000.1, 0.1), (1000.2, 0.2), (1000.3, 0.3)]
+    assert feed.late == 0
+    assert feed.next() is None
+
+
+def test_looping_continues_after_the_latest_request_not_the_last_line(tmp_path):
+    trace = write_trace(tmp_path / "trace.jsonl", [0.0, 2.0, 1.0])
+    clock = FakeClock()
+    feed = TraceFeed(trace, loop=True, reorder_window=5.0, clock=clock, sleep=clock.sleep)
+
+    for _ in range(4):
+        record = feed.next()
+    assert record["t"] == 0.0 and clock.now - 100.0 == 2.0  # second pass starts at the 2 s mark, not 1 s
+    assert feed.late == 0
+
+
+def test_sort_trace_orders_a_capture_by_start_time(tmp_path):
+    trace = write_trace(tmp_path / "trace.jsonl", [5.0, 3.0, 4.0])
+    assert sort_trace(trace) == 3
+    with open(trace) as f:
+        assert [json.loads(line)["t"] for line in f] == [3.0, 4.0, 5.0]
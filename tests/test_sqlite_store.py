@@ -0,0 +1,54 @@
+import json
+import os
+
+from mock_api.sqlite_store import SQLiteStore
+
+
+def write_seed(path, firstname):
+    path.write_text(json.dumps({
+        "users": [{"id": 1, "username": "user1", "password": "password"}],
+        "bookings": [{"id": 1, "firstname": firstname, "depositpaid": True}],
+    }))
+    return str(path)
+
+
+def open_store(tmp_path):
+    store = SQLiteStore(str(tmp_path / "data.db"), str(tmp_path / "data.json"))
+    store.load()
+    return store
+
+
+def test_seeds_once_and_keeps_changes_across_restarts(tmp_path):
+    write_seed(tmp_path / "data.json", "Alice")
+    store = open_store(tmp_path)
+    assert store.get_booking(1) == {"id": 1, "firstname": "Alice", "lastname": None, "totalprice": None,
+                                    "depositpaid": True, "checkin": None, "checkout": None, "additionalneeds": None}
+    store.update_booking(1, {"firstname": "Bob"})
+    store.close()
+
+    assert open_store(tmp_path).get_booking(1)["firstname"] == "Bob"
+
+
+def test_regenerated_data_file_is_reseeded(tmp_path):
+    seed = write_seed(tmp_path / "data.json", "Alice")
+    store = open_store(tmp_path)
+    store.update_booking(1, {"firstname": "Bob"})
+    store.close()
+
+    write_seed(tmp_path / "data.json", "Carol")
+    stat = os.stat(seed)
+    os.utime(seed, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))  # same size, newer file
+    store = open_store(tmp_path)
+    assert store.get_booking(1)["firstname"] == "Carol"
+    assert store.counts() == (1, 1)
+
+
+def test_bulk_loaded_database_is_not_reseeded_from_data_json(tmp_path):
+    write_seed(tmp_path / "data.json", "Alice")
+    SQLiteStore(str(tmp_path / "data.db"), str(tmp_path / "data.json")).bulk_load(
+        [{"id": 2, "username": "user2", "password": "password"}], [{"id": 2, "firstname": "Dan"}],
+        source="generate_data.py")
+
+    store = open_store(tmp_path)
+    assert store.get_booking(1) is None
+    assert store.get_booking(2)["firstname"] == "Dan"
@@ -0,0 +1,40 @@
+import random
+
+from urllib3 import encode_multipart_formdata
+
+from photo_pool import photo_pool
+from utils import generate_random_email
+from workload import ProfileUpdateStream
+
+
+def expected_bodies(seed, count, photo="photo1.jpg"):
+    """The bodies a stream must produce, encoded the straightforward way with the same RNG draws."""
+    rng = random.Random(seed)
+    bodies = []
+    for _ in range(count):
+        email = generate_random_email(rng)
+        photo, payload = photo_pool.next_photo(photo, rng)
+        bodies.append(encode_multipart_formdata(
+            {"email": email, "profile_photo": (photo, payload, "image/jpeg")},
+            boundary=f"{rng.getrandbits(128):032x}"))
+    return bodies
+
+
+def test_profile_bodies_match_a_full_encode_with_or_without_pregeneration():
+    photo_pool.load()
+    user = {"profile_photo": "photo1.jpg"}
+    expected = expected_bodies("42:0", 6)
+
+    for batch_size in (0, 4):
+        stream = ProfileUpdateStream(user, random.Random("42:0"), batch_size=batch_size)
+        assert [stream.next()[2:] for _ in range(6)] == expected
+
+
+def test_pregenerated_batches_do_not_hold_photo_bytes():
+    photo_pool.load()
+    stream = ProfileUpdateStream({"profile_photo": "photo1.jpg"}, random.Random(1), batch_size=50)
+    stream.next()
+
+    buffered = sum(len(head) + len(tail) for _, _, head, tail, _ in stream._buffer)
+    assert len(stream._buffer) == 49
+    assert buffered < 49 * 1024  # only multipart headers; the smallest photo alone is ~24 KB
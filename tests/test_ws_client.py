@@ -0,0 +1,99 @@
+import socket
+
+import gevent
+import pytest
+from locust.env import Environment
+
+from ws_client import PipelinedWebSocket
+
+
+class RequestLog:
+    """Collects the request events a connection fires."""
+
+    def __init__(self, environment):
+        self.requests = []
+        environment.events.request.add_listener(self.on_request)
+
+    def on_request(self, request_type, name, response_time, response_length, exception, **kwargs):
+        self.requests.append((name, exception))
+
+    def named(self, name, failed=False):
+        return [exc for n, exc in self.requests if n == name and (exc is not None) == failed]
+
+
+def wait_until(condition, timeout=5.0):
+    with gevent.Timeout(timeout, AssertionError("condition not met in time")):
+        while not condition():
+            gevent.sleep(0.01)
+
+
+@pytest.fixture
+def connection(mock_api):
+    environment = Environment()
+    log = RequestLog(environment)
+    ws = PipelinedWebSocket(mock_api.replace("http", "ws", 1) + "/ws", environment, initial_backoff=0.01)
+    ws.connect()
+    yield ws, log
+    ws.close()
+
+
+def test_pipelined_pings_are_matched_to_their_echoes(connection):
+    ws, log = connection
+    ws.ping({"action": "ping"}, count=50)
+    assert len(ws.pending) == 50
+
+    wait_until(lambda: not ws.pending)
+    assert len(log.named("send_message")) == 50
+    assert log.named("send_message", failed=True) == []
+    assert len(log.named("connect")) == 1
+
+
+def test_expire_fails_unanswered_pings_and_ignores_late_echoes(connection):
+    ws, log = connection
+    ws.ping({"action": "ping"}, count=10)
+    ws.expire(0)  # everything sent so far is overdue
+
+    failures = log.named("send_message", failed=True)
+    assert len(failures) == 10
+    assert all(isinstance(exc, TimeoutError) for exc in failures)
+    assert not ws.pending
+
+    ws.ping({"action": "ping"})  # its echo arrives after the expired ones
+    wait_until(lambda: not ws.pending)
+    assert len(log.named("send_message")) == 1
+
+
+def test_dropped_connection_fails_in_flight_pings_and_reconnects(connection):
+    ws, log = connection
+    old_ws = ws.ws
+    ws.pending[10_000] = 0.0  # a ping that will never be answered on this socket
+    old_ws.sock.shutdown(socket.SHUT_RDWR)
+
+    wait_until(lambda: log.named("reconnect"))
+    assert ws.ws is not old_ws and ws.connected
+    assert old_ws.sock is None  # the dead socket was closed, not leaked
+    assert len(log.named("send_message", failed=True)) == 1
+    assert 10_000 not in ws.pending
+
+    ws.ping({"action": "ping"}, count=5)
+    wait_until(lambda: not ws.pending)
+    assert len(log.named("send_message")) == 5
+
+
+def test_failed_first_connect_is_retried_in_the_background(mock_api):
+    environment = Environment()
+    log = RequestLog(environment)
+    port = mock_api.rsplit(":", 1)[1]
+    ws = PipelinedWebSocket(f"ws://127.0.0.1:{port}/no-such-endpoint", environment, initial_backoff=0.01)
+    try:
+        assert ws.connect() is False
+        assert len(log.named("connect", failed=True)) == 1
+        wait_until(lambda: len(log.named("reconnect", failed=True)) >= 2)
+
+        ws.url = mock_api.replace("http", "ws", 1) + "/ws"  # the endpoint comes back
+        wait_until(lambda: ws.connected)
+        ws.ping({"action": "ping"})
+        wait_until(lambda: not ws.pending)
+        assert len(log.named("send_message")) == 1
+    finally:
+        ws.close()
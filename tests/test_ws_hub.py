@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+import websocket
+
+from mock_api.ws_hub import DROPPED, EVICTED, QUEUED, WebSocketHub
+
+
+class SlowWebSocket:
+    """Blocks in ``send_text`` until released, and records whether a send was running when closed."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.sending = False
+        self.sent = []
+        self.closed_while_sending = None
+
+    async def send_text(self, text):
+        self.sending = True
+        try:
+            await self.release.wait()
+            self.sent.append(text)
+        finally:
+            self.sending = False
+
+    async def close(self, code=1000):
+        self.closed_while_sending = self.sending
+
+
+async def connect(hub):
+    client = SlowWebSocket()
+    connection = hub.register(client)
+    await connection.send("first")
+    await asyncio.sleep(0)  # the writer takes "first" and blocks in send_text
+    assert client.sending
+    return client, connection
+
+
+def test_drop_oldest_counts_evictions_separately_from_drops():
+    async def scenario():
+        hub = WebSocketHub(queue_size=2, policy="drop_oldest", ping_interval=0)
+        client, connection = await connect(hub)
+        assert [await connection.send(text) for text in ("a", "b", "c")] == [QUEUED, QUEUED, EVICTED]
+        assert (connection.evicted, connection.dropped) == (1, 0)
+
+        result = await hub.broadcast("d")
+        assert result == {"recipients": 1, "queued": 1, "dropped": 0, "evicted": 1}
+        assert hub.stats()["evicted"] == 2
+
+        client.release.set()
+        await asyncio.sleep(0.01)
+        assert client.sent == ["first", "c", "d"]
+        await hub.unregister(connection)
+
+    asyncio.run(scenario())
+
+
+def test_disconnect_stops_the_writer_before_closing():
+    async def scenario():
+        hub = WebSocketHub(queue_size=1, policy="disconnect", ping_interval=0)
+        client, connection = await connect(hub)
+        assert await connection.send("queued") == QUEUED
+        assert await connection.send("overflow") == DROPPED
+
+        assert client.closed_while_sending is False
+        assert hub.slow_disconnects == 1
+        assert await connection.send("after close") == DROPPED
+        await hub.unregister(connection)
+
+    asyncio.run(scenario())
+
+
+def test_control_messages_without_a_topic_are_rejected(mock_api):
+    ws = websocket.create_connection(mock_api.replace("http", "ws", 1) + "/ws", timeout=5)
+    try:
+        for action in ("subscribe", "publish"):
+            ws.send(json.dumps({"action": action, "message": "hi"}))
+            assert json.loads(ws.recv()) == {"type": "error", "action": action, "error": "topic is required"}
+    finally:
+        ws.close()